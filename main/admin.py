@@ -1,6 +1,23 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+from django.http import HttpResponseBadRequest
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Habilidad, Proyecto, ImagenProyecto, Contacto, Perfil
+from . import busqueda
+from .exportacion import respuesta_csv
+from .models import (
+    ArchivoMedia, Habilidad, Proyecto, ImagenProyecto, Contacto, ContactoArchivado, Perfil, TareaImagen, Tecnologia,
+    NotificacionContacto,
+)
+from .paginacion import ORDEN_BANDEJA, PaginadorEstimado, PaginaKeyset, decodificar_cursor
+
+
+def fecha_local(fecha):
+    return timezone.localtime(fecha).isoformat(timespec='seconds')
 
 
 @admin.register(Perfil)
@@ -47,6 +64,10 @@ class ImagenProyectoInline(admin.TabularInline):
     extra = 1
     fields = ('imagen', 'descripcion', 'orden')
     
+    def get_queryset(self, request):
+        """Trae el proyecto en la misma consulta (lo usa ImagenProyecto.__str__ en cada fila)"""
+        return super().get_queryset(request).select_related('proyecto')
+    
     def has_delete_permission(self, request, obj=None):
         """Evita eliminar imágenes"""
         return False
@@ -64,9 +85,10 @@ class ProyectoAdmin(admin.ModelAdmin):
         'fecha_creacion',
         'acciones'
     )
-    list_filter = ('destacado', 'activo', 'fecha_creacion')
+    list_filter = ('destacado', 'activo', 'tecnologias', 'fecha_creacion')
     list_editable = ('orden',)
-    search_fields = ('titulo', 'descripcion', 'tecnologias')
+    search_fields = ('titulo', 'descripcion', 'tecnologias__nombre')
+    filter_horizontal = ('tecnologias',)
     inlines = [ImagenProyectoInline]
     
     fieldsets = (
@@ -80,7 +102,7 @@ class ProyectoAdmin(admin.ModelAdmin):
         }),
         ('Tecnologías', {
             'fields': ('tecnologias',),
-            'description': '💡 Ingresa las tecnologías separadas por comas. Ej: Python, Django, Bootstrap'
+            'description': '💡 Elige las tecnologías del proyecto. Usa el botón + para agregar una nueva'
         }),
         ('Configuración de Visualización', {
             'fields': ('orden', 'destacado', 'activo'),
@@ -102,13 +124,24 @@ class ProyectoAdmin(admin.ModelAdmin):
         return format_html('<span style="color: #dc2626;">✗ Inactivo</span>')
     estado.short_description = 'Estado'
     
+    def get_queryset(self, request):
+        """Cuenta las imágenes en la misma consulta del listado"""
+        return super().get_queryset(request).annotate(_cantidad_imagenes=Count('imagenes'))
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Busca con el índice de texto completo (main.busqueda), igual que el sitio"""
+        if not search_term.strip():
+            return queryset, False
+        return busqueda.filtrar(queryset, search_term), False
+    
     def cantidad_imagenes(self, obj):
         """Cuenta cuántas imágenes tiene el proyecto"""
-        count = obj.imagenes.count()
+        count = obj._cantidad_imagenes
         if count > 0:
-            return format_html(f'<span style="color: #2563eb;">📸 {count}</span>')
+            return format_html('<span style="color: #2563eb;">📸 {}</span>', count)
         return '0'
     cantidad_imagenes.short_description = 'Imágenes'
+    cantidad_imagenes.admin_order_field = '_cantidad_imagenes'
     
     def acciones(self, obj):
         """Botones de acción rápida"""
@@ -124,6 +157,24 @@ class ProyectoAdmin(admin.ModelAdmin):
         }
 
 
+@admin.register(Tecnologia)
+class TecnologiaAdmin(admin.ModelAdmin):
+    """Administración de tecnologías usadas en los proyectos"""
+    list_display = ('nombre', 'slug', 'cantidad_proyectos')
+    search_fields = ('nombre',)
+    prepopulated_fields = {'slug': ('nombre',)}
+    
+    def get_queryset(self, request):
+        """Cuenta los proyectos en la misma consulta del listado"""
+        return super().get_queryset(request).annotate(_cantidad_proyectos=Count('proyectos'))
+    
+    def cantidad_proyectos(self, obj):
+        """Cantidad de proyectos que usan la tecnología"""
+        return obj._cantidad_proyectos
+    cantidad_proyectos.short_description = 'Proyectos'
+    cantidad_proyectos.admin_order_field = '_cantidad_proyectos'
+
+
 @admin.register(Habilidad)
 class HabilidadAdmin(admin.ModelAdmin):
     """Administración de habilidades técnicas y personales"""
@@ -175,7 +226,11 @@ class ContactoAdmin(admin.ModelAdmin):
     list_filter = ('leido', 'fecha_envio')
     search_fields = ('nombre', 'email', 'mensaje')
     readonly_fields = ('nombre', 'email', 'mensaje', 'fecha_envio', 'mensaje_formateado')
-    date_hierarchy = 'fecha_envio'
+    ordering = ORDEN_BANDEJA
+    # Con muchos mensajes: sin COUNT(*) de la tabla entera ni date_hierarchy
+    # (que agrupa por fecha en cada carga); la bandeja pagina por cursor
+    paginator = PaginadorEstimado
+    show_full_result_count = False
     
     fieldsets = (
         ('Información del Remitente', {
@@ -195,6 +250,33 @@ class ContactoAdmin(admin.ModelAdmin):
         """Los mensajes solo se crean desde el formulario público"""
         return False
     
+    def get_urls(self):
+        bandeja = path('bandeja/', self.admin_site.admin_view(self.bandeja_view), name='main_contacto_bandeja')
+        return [bandeja, *super().get_urls()]
+    
+    def bandeja_view(self, request):
+        """Mensajes del más nuevo al más antiguo, por cursor: sin COUNT ni OFFSET"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            posicion = decodificar_cursor(request.GET.get('cursor', ''), Contacto, ORDEN_BANDEJA)
+        except ValueError:
+            return HttpResponseBadRequest('Cursor inválido')
+        
+        solo_no_leidos = request.GET.get('leido') == '0'
+        contactos = Contacto.objects.all()
+        if solo_no_leidos:
+            contactos = contactos.filter(leido=False)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Bandeja de mensajes',
+            'pagina': PaginaKeyset(contactos, posicion, settings.CONTACTOS_POR_PAGINA, ORDEN_BANDEJA),
+            'solo_no_leidos': solo_no_leidos,
+        }
+        return TemplateResponse(request, 'admin/main/contacto/bandeja.html', context)
+    
     def estado_leido(self, obj):
         """Muestra si el mensaje ha sido leído"""
         if obj.leido:
@@ -220,7 +302,7 @@ class ContactoAdmin(admin.ModelAdmin):
     mensaje_formateado.short_description = 'Mensaje'
     
     # Configurar las acciones personalizadas
-    actions = ['marcar_como_leido', 'marcar_como_no_leido']
+    actions = ['marcar_como_leido', 'marcar_como_no_leido', 'exportar_csv']
     
     def marcar_como_leido(self, request, queryset):
         """Acción masiva para marcar mensajes como leídos"""
@@ -233,6 +315,167 @@ class ContactoAdmin(admin.ModelAdmin):
         updated = queryset.update(leido=False)
         self.message_user(request, f'{updated} mensaje(s) marcado(s) como no leído(s).')
     marcar_como_no_leido.short_description = '✉ Marcar como no leído'
+    
+    def exportar_csv(self, request, queryset):
+        """Descarga los mensajes seleccionados como CSV, leyendo la base por trozos"""
+        filas = queryset.order_by(*ORDEN_BANDEJA).values_list(
+            'id', 'nombre', 'email', 'mensaje', 'fecha_envio', 'leido'
+        ).iterator(chunk_size=2000)
+        return respuesta_csv(
+            f'mensajes-{timezone.localdate():%Y%m%d}.csv',
+            ('id', 'nombre', 'email', 'mensaje', 'fecha_envio', 'leido'),
+            (
+                (pk, nombre, email, mensaje, fecha_local(fecha), 'sí' if leido else 'no')
+                for pk, nombre, email, mensaje, fecha, leido in filas
+            ),
+        )
+    exportar_csv.short_description = '⬇ Exportar a CSV'
+
+
+@admin.register(ContactoArchivado)
+class ContactoArchivadoAdmin(admin.ModelAdmin):
+    """Mensajes leídos antiguos que movió archivar_contactos (solo lectura)"""
+    list_display = ('nombre', 'email', 'fecha_envio', 'fecha_archivado')
+    search_fields = ('nombre', 'email')
+    readonly_fields = ('nombre', 'email', 'fecha_envio', 'fecha_archivado', 'mensaje_formateado')
+    fields = readonly_fields
+    ordering = ORDEN_BANDEJA
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    actions = ['exportar_csv']
+    
+    def has_add_permission(self, request):
+        """Solo se archiva con el comando archivar_contactos"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def mensaje_formateado(self, obj):
+        """Muestra el mensaje descomprimido"""
+        return format_html(
+            '<div style="background: #f3f4f6; padding: 16px; border-radius: 8px; '
+            'border-left: 4px solid #6b7280; white-space: pre-wrap;">{}</div>',
+            obj.mensaje
+        )
+    mensaje_formateado.short_description = 'Mensaje'
+    
+    def exportar_csv(self, request, queryset):
+        """Descarga los mensajes archivados seleccionados como CSV, por trozos"""
+        filas = queryset.order_by(*ORDEN_BANDEJA).values_list(
+            'id', 'nombre', 'email', 'mensaje_comprimido', 'fecha_envio'
+        ).iterator(chunk_size=2000)
+        return respuesta_csv(
+            f'mensajes-archivados-{timezone.localdate():%Y%m%d}.csv',
+            ('id', 'nombre', 'email', 'mensaje', 'fecha_envio'),
+            (
+                (pk, nombre, email, ContactoArchivado.descomprimir(comprimido), fecha_local(fecha))
+                for pk, nombre, email, comprimido, fecha in filas
+            ),
+        )
+    exportar_csv.short_description = '⬇ Exportar a CSV'
+
+
+@admin.register(TareaImagen)
+class TareaImagenAdmin(admin.ModelAdmin):
+    """Seguimiento de la cola de procesamiento de imágenes"""
+    list_display = ('__str__', 'estado_badge', 'intentos', 'disponible_desde', 'fecha_actualizacion')
+    list_filter = ('estado', 'modelo')
+    readonly_fields = (
+        'modelo', 'objeto_id', 'estado', 'intentos', 'error',
+        'disponible_desde', 'fecha_creacion', 'fecha_actualizacion'
+    )
+    actions = ['reintentar']
+    
+    def has_add_permission(self, request):
+        """Las tareas solo se crean al guardar imágenes"""
+        return False
+    
+    def estado_badge(self, obj):
+        """Muestra el estado de la tarea con color"""
+        colores = {
+            'pendiente': '#6b7280',
+            'procesando': '#2563eb',
+            'completada': '#16a34a',
+            'fallida': '#dc2626',
+        }
+        return format_html(
+            '<span style="color: {};">{}</span>',
+            colores[obj.estado],
+            obj.get_estado_display()
+        )
+    estado_badge.short_description = 'Estado'
+    
+    def reintentar(self, request, queryset):
+        """Devuelve las tareas seleccionadas a la cola"""
+        updated = queryset.exclude(estado='procesando').update(
+            estado='pendiente', intentos=0, error='', disponible_desde=timezone.now()
+        )
+        self.message_user(request, f'{updated} tarea(s) devuelta(s) a la cola.')
+    reintentar.short_description = '↻ Reintentar'
+
+
+@admin.register(ArchivoMedia)
+class ArchivoMediaAdmin(admin.ModelAdmin):
+    """Imágenes subidas por contenido y cuántas filas las usan (solo lectura)"""
+    list_display = ('nombre', 'referencias', 'tamano_legible', 'fecha_creacion')
+    search_fields = ('nombre',)
+    readonly_fields = ('nombre', 'referencias', 'tamano', 'fecha_creacion', 'fecha_actualizacion')
+    
+    def has_add_permission(self, request):
+        """Los registros los mantienen las señales de main.media"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def tamano_legible(self, obj):
+        return f'{obj.tamano / 1024:.0f} KiB'
+    tamano_legible.short_description = 'Tamaño'
+    tamano_legible.admin_order_field = 'tamano'
+
+
+@admin.register(NotificacionContacto)
+class NotificacionContactoAdmin(admin.ModelAdmin):
+    """Seguimiento de los avisos por email de mensajes de contacto"""
+    list_display = ('__str__', 'contacto', 'estado_badge', 'intentos', 'disponible_desde', 'fecha_actualizacion')
+    list_filter = ('estado',)
+    list_select_related = ('contacto',)
+    readonly_fields = (
+        'contacto', 'estado', 'intentos', 'error',
+        'disponible_desde', 'fecha_creacion', 'fecha_actualizacion'
+    )
+    actions = ['reintentar']
+    
+    def has_add_permission(self, request):
+        """Los avisos solo se crean al llegar un mensaje"""
+        return False
+    
+    def estado_badge(self, obj):
+        """Muestra el estado del aviso con color"""
+        colores = {
+            'pendiente': '#6b7280',
+            'procesando': '#2563eb',
+            'enviada': '#16a34a',
+            'fallida': '#dc2626',
+        }
+        return format_html(
+            '<span style="color: {};">{}</span>',
+            colores[obj.estado],
+            obj.get_estado_display()
+        )
+    estado_badge.short_description = 'Estado'
+    
+    def reintentar(self, request, queryset):
+        """Devuelve los avisos seleccionados a la cola"""
+        updated = queryset.exclude(estado='procesando').update(
+            estado='pendiente', intentos=0, error='', disponible_desde=timezone.now()
+        )
+        self.message_user(request, f'{updated} aviso(s) devuelto(s) a la cola.')
+    reintentar.short_description = '↻ Reintentar'
 
 
 # Personalización del sitio de administración
@@ -0,0 +1,107 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+# Campo oculto que una persona nunca completa (los bots rellenan todo)
+CAMPO_TRAMPA = 'sitio_web'
+CAMPO_MARCA = 'marca'
+SAL_MARCA = 'main.contacto.marca'
+
+# Motivos para descartar un envío sin guardarlo
+TRAMPA = 'trampa'
+MUY_RAPIDO = 'muy_rapido'
+DUPLICADO = 'duplicado'
+
+
+def _resumen(valor):
+    return hashlib.sha256(valor.encode('utf-8')).hexdigest()[:32]
+
+
+def ip_cliente(request):
+    """IP del cliente; detrás de un proxy confiable se lee de CONTACTO_IP_CABECERA"""
+    if settings.CONTACTO_IP_CABECERA:
+        cabecera = request.META.get(settings.CONTACTO_IP_CABECERA, '')
+        if cabecera:
+            # X-Forwarded-For: "cliente, proxy1, proxy2"
+            return cabecera.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def supera_limite(tipo, valor, limite):
+    """
+    Cuenta un intento en una ventana fija y avisa si se pasó del límite.
+    `limite` es (intentos, segundos). Devuelve los segundos que faltan para
+    volver a intentar, o 0 si todavía está permitido.
+    """
+    intentos, ventana = limite
+    ahora = int(timezone.now().timestamp())
+    numero = ahora // ventana
+    clave = f'contacto:limite:{tipo}:{_resumen(valor)}:{numero}'
+
+    # add + incr sin leer y escribir por separado. Solo es atómico entre
+    # procesos en Redis o Memcached: con LocMemCache cada worker cuenta por
+    # su lado, y FileBasedCache/DatabaseCache pierden incrementos concurrentes
+    if cache.add(clave, 1, ventana):
+        contador = 1
+    else:
+        try:
+            contador = cache.incr(clave)
+        except ValueError:  # expiró entre add e incr
+            cache.add(clave, 1, ventana)
+            contador = 1
+
+    if contador > intentos:
+        return (numero + 1) * ventana - ahora
+    return 0
+
+
+def crear_marca(ahora=None):
+    """Momento en que se cargó el formulario, firmado para que no se pueda inventar"""
+    ahora = timezone.now().timestamp() if ahora is None else ahora
+    return signing.dumps(int(ahora), salt=SAL_MARCA, compress=True)
+
+
+def periodo_marca():
+    """
+    Número que cambia cada media CONTACTO_MARCA_MAX_EDAD. Va en el ETag del
+    index para que un 304 no reutilice una página cuya marca ya expiró.
+    """
+    return int(timezone.now().timestamp()) // max(settings.CONTACTO_MARCA_MAX_EDAD // 2, 1)
+
+
+def edad_marca(marca):
+    """Segundos desde que se entregó la marca, o None si falta o fue alterada"""
+    try:
+        return timezone.now().timestamp() - signing.loads(marca or '', salt=SAL_MARCA)
+    except (signing.BadSignature, TypeError):
+        return None
+
+
+def revisar_trampas(datos):
+    """
+    Motivo para no guardar el envío (TRAMPA se descarta en silencio,
+    MUY_RAPIDO se puede reintentar), None si pasa, o ValueError si la marca
+    falta, es falsa o expiró.
+    """
+    if datos.get(CAMPO_TRAMPA):
+        return TRAMPA
+    edad = edad_marca(datos.get(CAMPO_MARCA))
+    if edad is None or edad > settings.CONTACTO_MARCA_MAX_EDAD:
+        raise ValueError('Marca de formulario inválida o expirada')
+    if edad < settings.CONTACTO_TIEMPO_MINIMO:
+        return MUY_RAPIDO
+    return None
+
+
+def es_duplicado(datos):
+    """
+    Registra la huella del mensaje (email + texto normalizados) y avisa si ya
+    llegó uno igual dentro de CONTACTO_DUPLICADOS_VENTANA.
+    """
+    texto = re.sub(r'\s+', ' ', datos['mensaje']).strip().lower()
+    huella = _resumen(f"{datos['email'].lower()}\n{texto}")
+    return not cache.add(f'contacto:huella:{huella}', 1, settings.CONTACTO_DUPLICADOS_VENTANA)
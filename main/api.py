@@ -0,0 +1,218 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .cache import obtener_version
+from .imagenes import fuentes
+from .models import Habilidad, ImagenProyecto, Perfil, Proyecto, Tecnologia
+
+VERSION_API = 'v1'
+# Clave de un recurso serializado; con la versión de contenido, guardar en el
+# admin (main.signals) deja viejas todas las entradas sin borrarlas una por una
+CLAVE_API = 'portafolio:api:{version_api}:{recurso}:{version}'
+
+
+# -------------------------
+# Serialización
+# -------------------------
+
+def _imagen(instancia, campo, variantes=None):
+    archivo = getattr(instancia, campo)
+    if not archivo:
+        return None
+    field = archivo.field
+    return {
+        'url': archivo.url,
+        'ancho': getattr(instancia, field.width_field),
+        'alto': getattr(instancia, field.height_field),
+        'lqip': getattr(instancia, field.campo_lqip) or None,
+        'fuentes': fuentes(variantes or {}, archivo.storage),
+    }
+
+
+def serializar_proyecto(proyecto):
+    return {
+        'id': proyecto.pk,
+        'titulo': proyecto.titulo,
+        'descripcion': proyecto.descripcion,
+        'imagen': _imagen(proyecto, 'imagen_principal', proyecto.variantes_imagen),
+        'url_codigo': proyecto.url_codigo,
+        'url_demo': proyecto.url_demo,
+        'tecnologias': [
+            {'nombre': tecnologia.nombre, 'slug': tecnologia.slug}
+            for tecnologia in proyecto.get_tecnologias_list()
+        ],
+        'capturas': [
+            {
+                'descripcion': captura.descripcion,
+                'orden': captura.orden,
+                **(_imagen(captura, 'imagen', captura.variantes) or {}),
+            }
+            for captura in proyecto.imagenes.all()
+        ],
+        'destacado': proyecto.destacado,
+        'orden': proyecto.orden,
+        'fecha_creacion': proyecto.fecha_creacion,
+        'fecha_actualizacion': proyecto.fecha_actualizacion,
+    }
+
+
+def _proyectos_publicos():
+    # Dos consultas más en total, no por proyecto
+    return Proyecto.objects.filter(activo=True).order_by('orden', '-fecha_creacion', 'id').prefetch_related(
+        Prefetch('tecnologias', queryset=Tecnologia.objects.order_by()),
+        Prefetch('imagenes', queryset=ImagenProyecto.objects.order_by('orden', 'id')),
+    )
+
+
+def datos_proyectos():
+    return {'proyectos': [serializar_proyecto(proyecto) for proyecto in _proyectos_publicos()]}
+
+
+def datos_proyecto(pk):
+    proyecto = _proyectos_publicos().filter(pk=pk).first()
+    return serializar_proyecto(proyecto) if proyecto else None
+
+
+def datos_habilidades():
+    habilidades = Habilidad.objects.filter(activo=True).order_by('tipo', 'orden', 'id')
+    return {'habilidades': [
+        {
+            'id': habilidad.pk,
+            'nombre': habilidad.nombre,
+            'tipo': habilidad.tipo,
+            'icono': habilidad.icono,
+            'orden': habilidad.orden,
+        }
+        for habilidad in habilidades
+    ]}
+
+
+def datos_perfil():
+    perfil = Perfil.objects.first()
+    if perfil is None:
+        return None
+    return {
+        'nombre_completo': perfil.nombre_completo,
+        'apodo': perfil.apodo,
+        'titulo': perfil.titulo,
+        'descripcion': perfil.descripcion,
+        'github_url': perfil.github_url,
+        'linkedin_url': perfil.linkedin_url,
+        'email': perfil.email,
+        'ilustracion_contacto': _imagen(perfil, 'ilustracion_contacto'),
+    }
+
+
+def codificar(datos):
+    return json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def etag(cuerpo):
+    """ETag fuerte a partir del JSON: no cambia si un guardado no tocó estos datos"""
+    return '"{}"'.format(hashlib.sha256(cuerpo).hexdigest()[:32])
+
+
+def recurso_cacheado(recurso, calcular):
+    """
+    (datos, cuerpo JSON, ETag) de un recurso: se serializa una vez por versión
+    de contenido y las peticiones siguientes solo leen la caché.
+    """
+    clave = CLAVE_API.format(version_api=VERSION_API, recurso=recurso, version=obtener_version())
+    guardado = cache.get(clave)
+    if guardado is None:
+        datos = calcular()
+        if datos is None:
+            # Los inexistentes no se guardan: cualquier id llenaría la caché
+            return None, None, None
+        cuerpo = codificar(datos)
+        guardado = (datos, cuerpo, etag(cuerpo))
+        cache.set(clave, guardado, settings.CACHE_CONTENIDO_TIMEOUT)
+    return guardado
+
+
+# -------------------------
+# Selección de campos (?campos=titulo,imagen)
+# -------------------------
+
+def campos_pedidos(request):
+    valor = request.GET.get('campos', '')
+    return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+
+def seleccionar(objeto, campos):
+    desconocidos = [campo for campo in campos if campo not in objeto]
+    if desconocidos:
+        raise ValueError(f'Campos desconocidos: {", ".join(desconocidos)}')
+    return {campo: objeto[campo] for campo in campos}
+
+
+# -------------------------
+# Vistas
+# -------------------------
+
+def _error(mensaje, status):
+    return JsonResponse({'error': mensaje}, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def responder(request, recurso, calcular, lista=None):
+    """
+    Respuesta JSON de un recurso cacheado, con ETag (304 si el cliente ya lo
+    tiene) y ?campos= para recortar cada objeto. `lista` es la clave de la
+    lista en los recursos que son colecciones.
+    """
+    datos, cuerpo, etiqueta = recurso_cacheado(recurso, calcular)
+    if datos is None:
+        return _error('No encontrado', 404)
+
+    campos = campos_pedidos(request)
+    if campos:
+        try:
+            if lista:
+                datos = {lista: [seleccionar(objeto, campos) for objeto in datos[lista]]}
+            else:
+                datos = seleccionar(datos, campos)
+        except ValueError as error:
+            return _error(str(error), 400)
+        cuerpo = codificar(datos)
+        etiqueta = etag(cuerpo)
+
+    respuesta = get_conditional_response(request, etag=etiqueta)
+    if respuesta is None:
+        respuesta = HttpResponse(cuerpo, content_type='application/json')
+    respuesta['ETag'] = etiqueta
+    patch_cache_control(respuesta, public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+    if settings.API_ORIGEN_PERMITIDO:
+        respuesta['Access-Control-Allow-Origin'] = settings.API_ORIGEN_PERMITIDO
+        respuesta['Access-Control-Expose-Headers'] = 'ETag'
+        if settings.API_ORIGEN_PERMITIDO != '*':
+            patch_vary_headers(respuesta, ['Origin'])
+    return respuesta
+
+
+@require_safe
+def proyectos(request):
+    """Proyectos activos con tecnologías y capturas"""
+    return responder(request, 'proyectos', datos_proyectos, lista='proyectos')
+
+
+@require_safe
+def proyecto(request, pk):
+    return responder(request, f'proyecto:{pk}', lambda: datos_proyecto(pk))
+
+
+@require_safe
+def habilidades(request):
+    return responder(request, 'habilidades', datos_habilidades, lista='habilidades')
+
+
+@require_safe
+def perfil(request):
+    return responder(request, 'perfil', datos_perfil)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        """Conecta las señales que invalidan la caché de contenido y registra los checks"""
+        from . import checks, signals  # noqa: F401
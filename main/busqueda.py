@@ -0,0 +1,217 @@
+import re
+from functools import cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Proyecto, Tecnologia
+
+# Tabla FTS5 de SQLite (la crea la migración 0011; rowid = id del proyecto)
+TABLA_FTS = 'main_proyecto_busqueda'
+# Palabras de una consulta que se consideran (el resto se ignora)
+MAX_PALABRAS = 8
+# Proyectos por lote al reindexar
+LOTE_INDEXAR = 500
+
+
+def palabras(texto):
+    """
+    Palabras de una consulta, en minúsculas. Solo letras y números: el texto del
+    usuario nunca llega al motor como sintaxis de búsqueda.
+    """
+    return re.findall(r'\w+', (texto or '').lower())[:MAX_PALABRAS]
+
+
+def documentos(ids):
+    """(id, título, tecnologías, descripción) de los proyectos dados"""
+    proyectos = Proyecto.objects.filter(pk__in=ids).only('titulo', 'descripcion').prefetch_related('tecnologias')
+    return [
+        (proyecto.pk, proyecto.titulo, ' '.join(t.nombre for t in proyecto.tecnologias.all()), proyecto.descripcion)
+        for proyecto in proyectos
+    ]
+
+
+class BusquedaSimple:
+    """Sin índice: LIKE sobre los tres campos. Funciona con cualquier base"""
+
+    nombre = 'simple'
+
+    def indexar(self, ids):
+        pass
+
+    def eliminar(self, ids):
+        pass
+
+    def coincidencias(self, lista):
+        """Cada palabra debe aparecer en el título, la descripción o una tecnología"""
+        condicion = Q()
+        for palabra in lista:
+            condicion &= (
+                Q(titulo__icontains=palabra) | Q(descripcion__icontains=palabra)
+                | Exists(Tecnologia.objects.filter(proyectos=OuterRef('pk'), nombre__icontains=palabra))
+            )
+        return condicion
+
+    def filtrar(self, queryset, lista):
+        return queryset.filter(self.coincidencias(lista))
+
+    def buscar(self, lista, limite):
+        # Relevancia aproximada: las palabras en el título cuentan más
+        relevancia = sum(
+            (
+                Case(When(titulo__icontains=palabra, then=Value(3)), default=Value(0))
+                + Case(When(descripcion__icontains=palabra, then=Value(1)), default=Value(0))
+                for palabra in lista
+            ),
+            Value(0),
+        )
+        return list(
+            Proyecto.objects.filter(self.coincidencias(lista), activo=True)
+            .annotate(relevancia=relevancia)
+            .order_by('-relevancia', 'orden', 'id')
+            .values_list('pk', flat=True)[:limite]
+        )
+
+
+class BusquedaSqlite(BusquedaSimple):
+    """FTS5 con ranking bm25; sin acentos ni mayúsculas (unicode61 remove_diacritics)"""
+
+    nombre = 'sqlite_fts5'
+    # Peso de título, tecnologías y descripción en bm25 (mismo orden que las columnas)
+    PESOS = (10.0, 5.0, 1.0)
+
+    def consulta(self, lista):
+        # Cada palabra como prefijo: "djan" encuentra "Django"
+        return ' '.join(f'"{palabra}"*' for palabra in lista)
+
+    def indexar(self, ids):
+        filas = documentos(ids)
+        self.eliminar(ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {TABLA_FTS} (rowid, titulo, tecnologias, descripcion) VALUES (%s, %s, %s, %s)', filas
+            )
+
+    def eliminar(self, ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_FTS} WHERE rowid IN ({", ".join(["%s"] * len(ids))})', list(ids))
+
+    def filtrar(self, queryset, lista):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', [self.consulta(lista)]
+        ))
+
+    def buscar(self, lista, limite):
+        pesos = ', '.join(str(peso) for peso in self.PESOS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {TABLA_FTS}.rowid FROM {TABLA_FTS} '
+                f'JOIN main_proyecto ON main_proyecto.id = {TABLA_FTS}.rowid '
+                f'WHERE {TABLA_FTS} MATCH %s AND main_proyecto.activo '
+                f'ORDER BY bm25({TABLA_FTS}, {pesos}), main_proyecto.id LIMIT %s',
+                [self.consulta(lista), limite],
+            )
+            return [fila[0] for fila in cursor.fetchall()]
+
+
+class BusquedaPostgres(BusquedaSimple):
+    """Columna tsvector con índice GIN; pesos A (título), B (tecnologías) y C (descripción)"""
+
+    nombre = 'postgresql'
+
+    def consulta(self, lista):
+        return ' & '.join(f'{palabra}:*' for palabra in lista)
+
+    def indexar(self, ids):
+        configuracion = settings.BUSQUEDA_CONFIGURACION
+        filas = [
+            (configuracion, titulo, configuracion, tecnologias, configuracion, descripcion, pk)
+            for pk, titulo, tecnologias, descripcion in documentos(ids)
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'UPDATE main_proyecto SET vector_busqueda = '
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'C') "
+                'WHERE id = %s',
+                filas,
+            )
+
+    def coincide(self, lista):
+        return RawSQL(
+            'main_proyecto.vector_busqueda @@ to_tsquery(%s::regconfig, %s)',
+            [settings.BUSQUEDA_CONFIGURACION, self.consulta(lista)],
+            output_field=BooleanField(),
+        )
+
+    def filtrar(self, queryset, lista):
+        return queryset.filter(self.coincide(lista))
+
+    def buscar(self, lista, limite):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id FROM main_proyecto, to_tsquery(%s::regconfig, %s) consulta '
+                'WHERE activo AND vector_busqueda @@ consulta '
+                'ORDER BY ts_rank_cd(vector_busqueda, consulta) DESC, id LIMIT %s',
+                [settings.BUSQUEDA_CONFIGURACION, self.consulta(lista), limite],
+            )
+            return [fila[0] for fila in cursor.fetchall()]
+
+
+@cache
+def _sqlite_con_fts5():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def backend():
+    """Motor de búsqueda de la base actual"""
+    if connection.vendor == 'postgresql':
+        return BusquedaPostgres()
+    if connection.vendor == 'sqlite' and _sqlite_con_fts5():
+        return BusquedaSqlite()
+    return BusquedaSimple()
+
+
+# -------------------------
+# API
+# -------------------------
+
+def buscar(texto, limite=None):
+    """Ids de proyectos activos que coinciden con el texto, del más relevante al menos"""
+    lista = palabras(texto)
+    if not lista:
+        return []
+    return backend().buscar(lista, limite or settings.BUSQUEDA_MAX_RESULTADOS)
+
+
+def filtrar(queryset, texto):
+    """Restringe un queryset de Proyecto a los que coinciden con el texto (sin ordenar)"""
+    lista = palabras(texto)
+    if not lista:
+        return queryset.none()
+    return backend().filtrar(queryset, lista)
+
+
+def indexar_proyectos(ids):
+    """Actualiza el índice de los proyectos dados (tras guardar o cambiar tecnologías)"""
+    ids = list(ids)
+    motor = backend()
+    for inicio in range(0, len(ids), LOTE_INDEXAR):
+        motor.indexar(ids[inicio:inicio + LOTE_INDEXAR])
+
+
+def eliminar_proyectos(ids):
+    """Quita proyectos borrados del índice (en PostgreSQL se van con la fila)"""
+    backend().eliminar(list(ids))
+
+
+def reindexar():
+    """Reconstruye el índice de todos los proyectos; devuelve cuántos se indexaron"""
+    ids = list(Proyecto.objects.order_by().values_list('pk', flat=True))
+    indexar_proyectos(ids)
+    return len(ids)
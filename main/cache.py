@@ -0,0 +1,110 @@
+import hashlib
+import time
+from functools import cache as una_vez
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Max
+from django.utils import timezone
+
+CLAVE_VERSION = 'portafolio:contenido:version'
+CLAVE_MODIFICACION = 'portafolio:contenido:modificacion'
+
+
+def _version_inicial():
+    """Valor único por arranque, para no reutilizar fragmentos tras vaciar la caché"""
+    return int(time.time() * 1000)
+
+
+def obtener_version():
+    """Versión actual del contenido público (se usa como clave de los fragmentos)"""
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        inicial = _version_inicial()
+        cache.add(CLAVE_VERSION, inicial, timeout=None)
+        # Sin caché real (DummyCache) no queda guardada: se usa la recién calculada
+        version = cache.get(CLAVE_VERSION, inicial)
+    return version
+
+
+def incrementar_version():
+    """Invalida todos los fragmentos cacheados del sitio público"""
+    # También cubre cambios sin fecha en la base (eliminaciones, tecnologías, variantes)
+    cache.set(CLAVE_MODIFICACION, timezone.now(), timeout=None)
+    try:
+        return cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, _version_inicial(), timeout=None)
+        return cache.get(CLAVE_VERSION)
+
+
+def _ultima_fecha_en_base():
+    """Mayor fecha_actualizacion entre los modelos que se muestran en el sitio"""
+    from .models import Habilidad, ImagenProyecto, Perfil, Proyecto
+    
+    fechas = [
+        modelo.objects.aggregate(fecha=Max('fecha_actualizacion'))['fecha']
+        for modelo in (Proyecto, ImagenProyecto, Habilidad, Perfil)
+    ]
+    return max((fecha for fecha in fechas if fecha), default=timezone.now())
+
+
+def ultima_modificacion():
+    """
+    Fecha del último cambio en el contenido público (para Last-Modified).
+    Se guarda al incrementar la versión; si la caché está vacía se calcula
+    una vez desde la base.
+    """
+    fecha = cache.get(CLAVE_MODIFICACION)
+    if fecha is None:
+        en_base = _ultima_fecha_en_base()
+        cache.add(CLAVE_MODIFICACION, en_base, timeout=None)
+        fecha = cache.get(CLAVE_MODIFICACION, en_base)
+    return fecha
+
+
+@una_vez
+def huella_build():
+    """
+    Huella del manifiesto de estáticos y los templates (como la de
+    exportar_sitio), calculada una vez por proceso. Un deploy la cambia aunque
+    el contenido sea el mismo: el HTML viejo apunta a CSS con huella que ya no existe.
+    """
+    sha = hashlib.sha256()
+    leer_manifiesto = getattr(staticfiles_storage, 'read_manifest', None)
+    sha.update(((leer_manifiesto and leer_manifiesto()) or '').encode())
+    for directorio in settings.TEMPLATES[0]['DIRS']:
+        for template in sorted(Path(directorio).rglob('*.html')):
+            sha.update(template.read_bytes())
+    return sha.hexdigest()[:12]
+
+
+def etag_contenido(*extra):
+    """ETag de las páginas públicas: cambia con cada versión de contenido, cada deploy (y con `extra`)"""
+    return '"{}"'.format('-'.join(map(str, ('contenido', obtener_version(), huella_build(), *extra))))
+
+
+def contexto_cache():
+    """Variables que necesitan los templates para sus bloques {% cache %}"""
+    return {
+        'version_contenido': obtener_version(),
+        'cache_timeout': settings.CACHE_CONTENIDO_TIMEOUT,
+    }
+
+
+async def afragmentos_en_cache(fragmentos):
+    """
+    Indica si ya están guardados todos los bloques {% cache %} dados como
+    (nombre, [vary_on...]). Si lo están, el template no necesita los datos.
+    """
+    # Misma caché que usa el tag {% cache %}
+    try:
+        cache_fragmentos = caches['template_fragments']
+    except InvalidCacheBackendError:
+        cache_fragmentos = cache
+    # El tag arma la clave con el nombre tal como está escrito: entre comillas
+    claves = [make_template_fragment_key(f"'{nombre}'", vary_on) for nombre, vary_on in fragmentos]
+    return len(await cache_fragmentos.aget_many(claves)) == len(claves)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends que guardan en la memoria de cada proceso
+CACHES_POR_PROCESO = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def cache_compartida(app_configs, **kwargs):
+    """
+    La versión de contenido (main.cache) la incrementan procesos distintos del
+    servidor web: procesar_imagenes y los comandos de importación y media.
+    Con una caché por proceso el sitio nunca se entera y sigue sirviendo los
+    fragmentos y ETags anteriores.
+    """
+    # En desarrollo (runserver) suele haber un solo proceso
+    if settings.DEBUG or settings.CACHES['default']['BACKEND'] not in CACHES_POR_PROCESO:
+        return []
+    return [Warning(
+        'CACHES["default"] es una caché en memoria por proceso',
+        hint=(
+            'Los cambios que hacen procesar_imagenes, los comandos o los otros workers no invalidan '
+            'la caché de este proceso. Definir REDIS_URL o usar Memcached en CACHES.'
+        ),
+        id='main.W001',
+    )]
@@ -0,0 +1,44 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se generan los .gz
+    brotli = None
+
+# Formatos de texto; las imágenes (JPG, PNG, WebP, AVIF) ya vienen comprimidas
+EXTENSIONES_COMPRIMIBLES = ('.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.map')
+
+# Por debajo de este tamaño la versión comprimida no ahorra nada útil
+TAMANO_MINIMO = 256
+
+
+def comprimir_contenido(contenido):
+    """Devuelve {extensión: bytes} con las versiones precomprimidas disponibles"""
+    versiones = {'.gz': gzip.compress(contenido, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versiones['.br'] = brotli.compress(contenido, quality=11)
+    return versiones
+
+
+def comprimir_archivo(ruta):
+    """
+    Escribe ruta.gz (y ruta.br si brotli está instalado) junto al archivo.
+    Devuelve las rutas escritas; no hace nada si ya están al día.
+    """
+    if ruta.suffix not in EXTENSIONES_COMPRIMIBLES or ruta.stat().st_size < TAMANO_MINIMO:
+        return []
+
+    pendientes = [
+        ruta.with_name(ruta.name + extension)
+        for extension in ('.gz', '.br') if extension == '.gz' or brotli is not None
+    ]
+    modificado = ruta.stat().st_mtime
+    if all(destino.exists() and destino.stat().st_mtime >= modificado for destino in pendientes):
+        return []
+
+    escritas = []
+    for extension, datos in comprimir_contenido(ruta.read_bytes()).items():
+        destino = ruta.with_name(ruta.name + extension)
+        destino.write_bytes(datos)
+        escritas.append(destino)
+    return escritas
@@ -0,0 +1,140 @@
+import re
+from html.parser import HTMLParser
+
+from .storage import minificar_css
+
+_COMENTARIOS = re.compile(r'/\*.*?\*/', re.S)
+_PSEUDO = re.compile(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?')
+_ATRIBUTOS = re.compile(r'\[[^\]]*\]')
+_COMBINADORES = re.compile(r'\s*[\s>+~]\s*')
+_ANIMACIONES = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+
+# At-rules cuyo contenido son reglas normales (se filtran por dentro)
+AGRUPADORAS = ('@media', '@supports', '@layer', '@container')
+
+
+class ElementosVisibles(HTMLParser):
+    """
+    Recorre el HTML en orden y guarda (tag, clases, id) de cada elemento hasta
+    que empieza la tarjeta de proyecto número `tarjetas + 1`: navbar, hero,
+    títulos y primeras tarjetas, que es lo que se ve sin hacer scroll.
+    """
+
+    def __init__(self, tarjetas):
+        super().__init__()
+        self.tarjetas = tarjetas
+        self.vistas = 0
+        self.elementos = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.vistas > self.tarjetas:
+            return
+        atributos = dict(attrs)
+        clases = frozenset((atributos.get('class') or '').split())
+        if 'project-card' in clases:
+            self.vistas += 1
+            if self.vistas > self.tarjetas:
+                return
+        self.elementos.append((tag, clases, atributos.get('id')))
+
+
+def elementos_visibles(html, tarjetas=3):
+    lector = ElementosVisibles(tarjetas)
+    lector.feed(html)
+    return lector.elementos
+
+
+def _dividir(texto, separador=','):
+    """Divide por el separador fuera de paréntesis"""
+    partes, nivel, actual = [], 0, ''
+    for caracter in texto:
+        if caracter == '(':
+            nivel += 1
+        elif caracter == ')':
+            nivel -= 1
+        if caracter == separador and nivel == 0:
+            partes.append(actual)
+            actual = ''
+        else:
+            actual += caracter
+    partes.append(actual)
+    return [parte.strip() for parte in partes if parte.strip()]
+
+
+def selector_usado(selector, elementos):
+    """
+    Aproximación conservadora: mira solo el último compuesto del selector (sin
+    pseudo-clases ni atributos) y lo busca en algún elemento visible.
+    """
+    simple = _ATRIBUTOS.sub('', _PSEUDO.sub('', selector)).strip()
+    compuesto = _COMBINADORES.split(simple)[-1] if simple else ''
+    if compuesto in ('', '*'):
+        return True
+    tag = re.match(r'[a-zA-Z][\w-]*', compuesto)
+    clases = set(re.findall(r'\.([\w-]+)', compuesto))
+    ids = set(re.findall(r'#([\w-]+)', compuesto))
+    return any(
+        (tag is None or tag.group().lower() == etiqueta)
+        and clases <= clases_elemento
+        and (not ids or ids == {id_elemento})
+        for etiqueta, clases_elemento, id_elemento in elementos
+    )
+
+
+def bloques(css):
+    """Divide el CSS en (encabezado, cuerpo) de primer nivel; cuerpo es None para @import y similares"""
+    resultado, encabezado, nivel, inicio, comillas = [], '', 0, 0, None
+    for posicion, caracter in enumerate(css):
+        if comillas:
+            if caracter == comillas and css[posicion - 1] != '\\':
+                comillas = None
+        elif caracter in '"\'':
+            comillas = caracter
+        elif caracter == '{':
+            if nivel == 0:
+                encabezado, inicio = css[inicio:posicion].strip(), posicion + 1
+            nivel += 1
+        elif caracter == '}':
+            nivel -= 1
+            if nivel == 0:
+                resultado.append((encabezado, css[inicio:posicion]))
+                inicio = posicion + 1
+        elif caracter == ';' and nivel == 0:
+            resultado.append((css[inicio:posicion].strip(), None))
+            inicio = posicion + 1
+    return resultado
+
+
+def _filtrar(css, elementos, animaciones):
+    """Reglas que afectan a los elementos visibles; junta aparte los @keyframes"""
+    partes = []
+    for encabezado, cuerpo in bloques(css):
+        if cuerpo is None:
+            continue
+        if encabezado.startswith(AGRUPADORAS):
+            interno = _filtrar(cuerpo, elementos, animaciones)
+            if interno:
+                partes.append(f'{encabezado}{{{interno}}}')
+        elif re.match(r'@(-\w+-)?keyframes\s', encabezado):
+            animaciones[encabezado.split()[-1]] = f'{encabezado}{{{cuerpo}}}'
+        elif encabezado.startswith('@font-face'):
+            partes.append(f'{encabezado}{{{cuerpo}}}')
+        elif not encabezado.startswith('@'):
+            if any(selector_usado(selector, elementos) for selector in _dividir(encabezado)):
+                partes.append(f'{encabezado}{{{cuerpo}}}')
+    return ''.join(partes)
+
+
+def extraer_css_critico(css, elementos):
+    """CSS mínimo para pintar los elementos visibles, ya minificado"""
+    animaciones = {}
+    critico = _filtrar(_COMENTARIOS.sub('', css), elementos, animaciones)
+
+    # Solo las animaciones que usa alguna regla conservada
+    usadas = {
+        nombre
+        for valor in _ANIMACIONES.findall(critico)
+        for nombre in re.findall(r'[\w-]+', valor)
+    }
+    critico += ''.join(regla for nombre, regla in animaciones.items() if nombre in usadas)
+    return minificar_css(critico)
@@ -0,0 +1,45 @@
+import csv
+
+from django.http import StreamingHttpResponse
+
+# Filas por trozo de la respuesta (cada trozo es una escritura al socket)
+FILAS_POR_TROZO = 500
+# Una celda que empieza así la interpreta como fórmula una planilla
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Eco:
+    """Archivo falso: csv.writer devuelve la línea en vez de guardarla"""
+
+    def write(self, valor):
+        return valor
+
+
+def _celda(valor):
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def lineas_csv(encabezado, filas):
+    """Genera el CSV por trozos, sin tenerlo entero en memoria"""
+    escritor = csv.writer(_Eco())
+    # BOM: Excel abre el archivo como UTF-8 (acentos y ñ)
+    trozo = ['\ufeff' + escritor.writerow(encabezado)]
+    for fila in filas:
+        trozo.append(escritor.writerow([_celda(valor) for valor in fila]))
+        if len(trozo) >= FILAS_POR_TROZO:
+            yield ''.join(trozo)
+            trozo = []
+    if trozo:
+        yield ''.join(trozo)
+
+
+def respuesta_csv(nombre_archivo, encabezado, filas):
+    """
+    Descarga CSV de cualquier tamaño: las filas se leen y se envían a medida
+    que avanza la respuesta (usar un iterador, p. ej. queryset.iterator()).
+    """
+    respuesta = StreamingHttpResponse(lineas_csv(encabezado, filas), content_type='text/csv; charset=utf-8')
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return respuesta
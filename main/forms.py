@@ -1,10 +1,25 @@
 from django import forms
+from django.conf import settings
+from django.core.validators import MaxLengthValidator
 from .models import Contacto
 
 
 class ContactoForm(forms.ModelForm):
     """Formulario de contacto"""
     
+    # Trampa para bots: oculto con CSS, una persona lo deja vacío
+    sitio_web = forms.CharField(required=False, label='No completar', widget=forms.TextInput(attrs={
+        'tabindex': '-1',
+        'autocomplete': 'off',
+    }))
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # El modelo no limita el largo: se acota aquí para no guardar textos enormes
+        mensaje = self.fields['mensaje']
+        mensaje.validators.append(MaxLengthValidator(settings.CONTACTO_MENSAJE_MAX))
+        mensaje.widget.attrs['maxlength'] = settings.CONTACTO_MENSAJE_MAX
+    
     class Meta:
         model = Contacto
         fields = ['nombre', 'email', 'mensaje']
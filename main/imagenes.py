@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+TIPOS_MIME = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+# Etiqueta EXIF de la orientación; 5 a 8 giran la imagen 90°
+ORIENTACION_EXIF = 0x0112
+
+
+def formatos_disponibles():
+    """Formatos configurados que el Pillow instalado puede escribir"""
+    return [formato for formato in settings.IMAGENES_FORMATOS if features.check(formato)]
+
+
+def _anchos_para(ancho_original):
+    """Anchos a generar: los configurados menores al original, más el original (con tope)"""
+    anchos = {ancho for ancho in settings.IMAGENES_ANCHOS if ancho < ancho_original}
+    anchos.add(min(ancho_original, max(settings.IMAGENES_ANCHOS)))
+    return sorted(anchos)
+
+
+def generar_variantes(storage, nombre):
+    """
+    Crea versiones redimensionadas de la imagen en los formatos configurados.
+    Se guardan junto al original con la huella del contenido en el nombre,
+    por lo que volver a generarlas no duplica archivos.
+    """
+    with storage.open(nombre, 'rb') as original:
+        contenido = original.read()
+
+    huella = hashlib.sha256(contenido).hexdigest()[:12]
+    base, _ = posixpath.splitext(nombre)
+
+    imagen = ImageOps.exif_transpose(Image.open(io.BytesIO(contenido)))
+    if imagen.mode not in ('RGB', 'RGBA'):
+        imagen = imagen.convert('RGBA' if 'transparency' in imagen.info else 'RGB')
+
+    # En MediaPorContenido save() renombraría cada variante por su propio hash
+    guardar = getattr(storage, 'guardar_derivado', storage.save)
+    variantes = {
+        'origen': nombre,
+        'huella': huella,
+        'ancho': imagen.width,
+        'alto': imagen.height,
+        'formatos': {},
+    }
+
+    for ancho in _anchos_para(imagen.width):
+        alto = round(imagen.height * ancho / imagen.width)
+        redimensionada = imagen if ancho == imagen.width else imagen.resize((ancho, alto), Image.LANCZOS)
+
+        for formato in formatos_disponibles():
+            nombre_variante = f'{base}-{huella}-{ancho}w.{formato}'
+            if not storage.exists(nombre_variante):
+                buffer = io.BytesIO()
+                redimensionada.save(buffer, formato.upper(), quality=settings.IMAGENES_CALIDAD[formato])
+                guardar(nombre_variante, ContentFile(buffer.getvalue()))
+            variantes['formatos'].setdefault(formato, {})[str(ancho)] = nombre_variante
+
+    return variantes
+
+
+def generar_variantes_seguro(storage, nombre):
+    """Como generar_variantes, pero sin fallar si el archivo no es una imagen válida"""
+    try:
+        return generar_variantes(storage, nombre)
+    except OSError:
+        # Archivo inexistente o que Pillow no reconoce: se sirve el original
+        logger.warning('No se pudieron generar variantes de %s', nombre, exc_info=True)
+        return {'origen': nombre}
+
+
+def miniatura_lqip(imagen):
+    """
+    Miniatura borrosa como data URI (unos cientos de bytes), o '' si la imagen
+    tiene transparencia: se vería detrás de la imagen ya cargada.
+    """
+    lado = settings.IMAGENES_LQIP_LADO
+    # JPEG: decodifica directamente a escala reducida
+    imagen.draft('RGB', (lado, lado))
+    miniatura = ImageOps.exif_transpose(imagen)
+    miniatura.thumbnail((lado, lado))
+    if miniatura.mode in ('RGBA', 'LA', 'PA') or 'transparency' in miniatura.info:
+        if miniatura.convert('RGBA').getchannel('A').getextrema()[0] < 255:
+            return ''
+    formato = 'webp' if features.check('webp') else 'jpeg'
+    buffer = io.BytesIO()
+    miniatura.convert('RGB').save(buffer, formato.upper(), quality=settings.IMAGENES_LQIP_CALIDAD)
+    return f'data:image/{formato};base64,{base64.b64encode(buffer.getvalue()).decode()}'
+
+
+def medir_imagen(archivo):
+    """
+    (ancho, alto, lqip) de un archivo de imagen abierto, o None si no es una
+    imagen. Ancho y alto ya aplican la orientación EXIF, como la muestra el navegador.
+    """
+    try:
+        archivo.seek(0)
+        imagen = Image.open(archivo)
+        ancho, alto = imagen.size
+        if imagen.getexif().get(ORIENTACION_EXIF, 1) in (5, 6, 7, 8):
+            ancho, alto = alto, ancho
+        return ancho, alto, miniatura_lqip(imagen)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning('No se pudo medir la imagen %s', getattr(archivo, 'name', archivo), exc_info=True)
+        return None
+    finally:
+        archivo.seek(0)
+
+
+def medir_guardada(storage, nombre):
+    """Como medir_imagen, para un archivo del storage (None si no existe)"""
+    try:
+        with storage.open(nombre, 'rb') as archivo:
+            return medir_imagen(archivo)
+    except FileNotFoundError:
+        logger.warning('No existe la imagen %s', nombre)
+        return None
+
+
+def eliminar_variantes(variantes, storage):
+    """Borra del storage los archivos de un registro de variantes"""
+    for anchos in variantes.get('formatos', {}).values():
+        for nombre in anchos.values():
+            storage.delete(nombre)
+
+
+def necesita_variantes(instancia, campo, campo_variantes):
+    """Indica si la imagen de `campo` cambió desde que se generaron sus variantes"""
+    archivo = getattr(instancia, campo)
+    anteriores = getattr(instancia, campo_variantes) or {}
+    return anteriores.get('origen') != (archivo.name or None)
+
+
+def aplicar_variantes(instancia, campo, campo_variantes, nuevas):
+    """
+    Guarda un registro de variantes reemplazando el anterior.
+    Se usa update() para no volver a disparar save() ni las señales, y solo
+    si la imagen sigue siendo la misma con la que se generaron.
+    """
+    archivo = getattr(instancia, campo)
+    anteriores = getattr(instancia, campo_variantes) or {}
+    nombre = nuevas.get('origen') or ''
+
+    actualizadas = type(instancia).objects.filter(
+        pk=instancia.pk, **{campo: nombre}
+    ).update(**{campo_variantes: nuevas})
+    if not actualizadas:
+        return False
+
+    # Con media por contenido las variantes pueden ser de otra fila con la
+    # misma imagen: se borran con el original (main.media), no aquí
+    if anteriores and anteriores.get('origen') != nombre and not getattr(archivo.storage, 'por_contenido', False):
+        eliminar_variantes(anteriores, archivo.storage)
+    setattr(instancia, campo_variantes, nuevas)
+    return True
+
+
+def actualizar_variantes(instancia, campo, campo_variantes):
+    """Regenera en el momento las variantes de `campo` si la imagen cambió"""
+    if not necesita_variantes(instancia, campo, campo_variantes):
+        return
+
+    archivo = getattr(instancia, campo)
+    nuevas = generar_variantes_seguro(archivo.storage, archivo.name) if archivo else {}
+    aplicar_variantes(instancia, campo, campo_variantes, nuevas)
+
+
+def fuentes(variantes, storage):
+    """Lista de <source> (tipo MIME + srcset) lista para usar en un <picture>"""
+    resultado = []
+    for formato in formatos_disponibles():
+        anchos = variantes.get('formatos', {}).get(formato)
+        if not anchos:
+            continue
+        srcset = ', '.join(
+            f'{storage.url(nombre)} {ancho}w'
+            for ancho, nombre in sorted(anchos.items(), key=lambda item: int(item[0]))
+        )
+        resultado.append({'tipo': TIPOS_MIME[formato], 'srcset': srcset})
+    return resultado
@@ -0,0 +1,325 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.base import Template
+from django.template.loader import render_to_string
+from django.utils.cache import add_never_cache_headers, patch_cache_control, patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+# ?rendimiento=1 muestra el panel a un usuario staff
+PARAMETRO_PANEL = 'rendimiento'
+# Plantillas que se detallan en Server-Timing y en el log (las más lentas)
+MAX_PLANTILLAS = 5
+
+_medicion = ContextVar('medicion', default=None)
+_FALTA = object()
+
+
+class Medicion:
+    """Tiempos y contadores de una petición"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total_ms = 0.0
+        self.sql_consultas = 0
+        self.sql_ms = 0.0
+        self.sql_max_ms = 0.0
+        self.plantillas_ms = 0.0  # solo los render de primer nivel (incluyen sus include)
+        self.plantillas = {}  # nombre -> [renders, ms]
+        self.profundidad = 0
+        self.cache_aciertos = 0
+        self.cache_fallos = 0
+        self.bytes = None
+
+    def terminar(self, respuesta):
+        self.total_ms = (time.perf_counter() - self.inicio) * 1000
+        if not respuesta.streaming:
+            self.bytes = len(respuesta.content)
+
+    def plantillas_lentas(self):
+        """[(nombre, renders, ms)] de más lenta a más rápida"""
+        lentas = sorted(self.plantillas.items(), key=lambda item: item[1][1], reverse=True)
+        return [(nombre, veces, ms) for nombre, (veces, ms) in lentas[:MAX_PLANTILLAS]]
+
+    def como_dict(self):
+        return {
+            'total_ms': round(self.total_ms, 2),
+            'sql': {
+                'consultas': self.sql_consultas,
+                'ms': round(self.sql_ms, 2),
+                'max_ms': round(self.sql_max_ms, 2),
+            },
+            'plantillas': {
+                'ms': round(self.plantillas_ms, 2),
+                'detalle': {nombre: {'renders': veces, 'ms': round(ms, 2)} for nombre, veces, ms in self.plantillas_lentas()},
+            },
+            'cache': {'aciertos': self.cache_aciertos, 'fallos': self.cache_fallos},
+            'bytes': self.bytes,
+        }
+
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing (se ve en la pestaña Red del navegador)"""
+        metricas = [
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_consultas} consulta(s)"',
+            f'plantillas;dur={self.plantillas_ms:.1f}',
+            f'cache;desc="{self.cache_aciertos} acierto(s), {self.cache_fallos} fallo(s)"',
+        ]
+        metricas += [
+            f'tpl{posicion};dur={ms:.1f};desc="{nombre} x{veces}"'
+            for posicion, (nombre, veces, ms) in enumerate(self.plantillas_lentas(), start=1)
+        ]
+        metricas.append(f'total;dur={self.total_ms:.1f}')
+        return ', '.join(metricas)
+
+
+# -------------------------
+# Ganchos (solo se instalan mientras hay una medición en curso)
+# -------------------------
+
+def medir_sql(ejecutar, sql, params, many, contexto):
+    """execute_wrapper de las conexiones a la base"""
+    medicion = _medicion.get()
+    if medicion is None:
+        return ejecutar(sql, params, many, contexto)
+    inicio = time.perf_counter()
+    try:
+        return ejecutar(sql, params, many, contexto)
+    finally:
+        duracion = (time.perf_counter() - inicio) * 1000
+        medicion.sql_consultas += 1
+        medicion.sql_ms += duracion
+        medicion.sql_max_ms = max(medicion.sql_max_ms, duracion)
+
+
+def _medir_render(render):
+    # Template.render también corre en cada {% include %}: el tiempo de una
+    # plantilla incluye el de sus parciales
+    @wraps(render)
+    def render_medido(self, context):
+        medicion = _medicion.get()
+        if medicion is None:
+            return render(self, context)
+        medicion.profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            medicion.profundidad -= 1
+            if medicion.profundidad == 0:
+                medicion.plantillas_ms += duracion
+            nombre = (self.origin.template_name or self.origin.name) if self.origin else None
+            acumulado = medicion.plantillas.setdefault(str(nombre or '<en línea>'), [0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += duracion
+
+    return render_medido
+
+
+_render_original = Template.render
+_mediciones_activas = 0
+_candado_render = threading.Lock()
+
+
+@contextmanager
+def medir_plantillas():
+    """
+    Envuelve Template.render solo mientras haya alguna petición medida: sin
+    mediciones en curso (la mayoría del tráfico, los tests y los comandos)
+    se usa el método original.
+    """
+    global _mediciones_activas
+    with _candado_render:
+        if _mediciones_activas == 0:
+            Template.render = _medir_render(_render_original)
+        _mediciones_activas += 1
+    try:
+        yield
+    finally:
+        with _candado_render:
+            _mediciones_activas -= 1
+            if _mediciones_activas == 0:
+                Template.render = _render_original
+
+
+class CacheContada:
+    """Backend de caché que cuenta aciertos y fallos de get/get_many en una medición"""
+
+    def __init__(self, backend, medicion):
+        self._backend = backend
+        self._medicion = medicion
+
+    def __getattr__(self, nombre):
+        return getattr(self._backend, nombre)
+
+    def __contains__(self, key):
+        return key in self._backend
+
+    def get(self, key, default=None, version=None):
+        valor = self._backend.get(key, _FALTA, version)
+        if valor is _FALTA:
+            self._medicion.cache_fallos += 1
+            return default
+        self._medicion.cache_aciertos += 1
+        return valor
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        valores = self._backend.get_many(keys, version)
+        self._medicion.cache_aciertos += len(valores)
+        self._medicion.cache_fallos += len(keys) - len(valores)
+        return valores
+
+
+@contextmanager
+def contar_cache(medicion):
+    """
+    Reemplaza cada alias de CACHES por una CacheContada. `caches` guarda los
+    backends por hilo o contexto async: el cambio no sale de esta petición.
+    """
+    originales = {alias: caches[alias] for alias in settings.CACHES}
+    for alias, backend in originales.items():
+        caches[alias] = CacheContada(backend, medicion)
+    try:
+        yield
+    finally:
+        for alias, backend in originales.items():
+            caches[alias] = backend
+
+
+def envolver_conexiones():
+    """Agrega medir_sql a las conexiones del hilo actual; se quitan al cerrar el ExitStack"""
+    envolturas = ExitStack()
+    for conexion in connections.all():
+        envolturas.enter_context(conexion.execute_wrapper(medir_sql))
+    return envolturas
+
+
+# -------------------------
+# Middleware
+# -------------------------
+
+class InstrumentacionMiddleware:
+    """
+    Mide SQL, templates, caché y tamaño de la respuesta. Una muestra de las
+    peticiones (INSTRUMENTACION_MUESTREO) se registra en el log
+    'main.instrumentacion'; las de staff se miden siempre y llevan Server-Timing,
+    y con ?rendimiento=1 un panel con el detalle.
+    Conviene que sea el primero de MIDDLEWARE, para incluir a los demás.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            # Con ASGI, Django no adapta el middleware con un salto de hilo
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        medir = self.debe_medir(request)
+        if medir is None:
+            return self.get_response(request)
+
+        medicion = Medicion()
+        marca = _medicion.set(medicion)
+        try:
+            with medir_plantillas(), contar_cache(medicion), envolver_conexiones():
+                respuesta = self.get_response(request)
+        finally:
+            _medicion.reset(marca)
+
+        # Sin cookie de sesión no se consulta request.user: las páginas públicas
+        # siguen sin sesión (y sin Vary: Cookie)
+        es_staff = medir['con_sesion'] and getattr(getattr(request, 'user', None), 'is_staff', False)
+        return self.informar(request, respuesta, medicion, es_staff, **medir)
+
+    async def __acall__(self, request):
+        medir = self.debe_medir(request)
+        if medir is None:
+            return await self.get_response(request)
+
+        medicion = Medicion()
+        marca = _medicion.set(medicion)
+        try:
+            with medir_plantillas(), contar_cache(medicion):
+                # El ORM async consulta en el hilo de sync_to_async de esta
+                # petición: las envolturas se agregan y quitan en ese hilo
+                envolturas = await sync_to_async(envolver_conexiones)()
+                try:
+                    respuesta = await self.get_response(request)
+                finally:
+                    await sync_to_async(envolturas.close)()
+        finally:
+            _medicion.reset(marca)
+
+        es_staff = False
+        if medir['con_sesion'] and hasattr(request, 'auser'):
+            es_staff = (await request.auser()).is_staff
+        return self.informar(request, respuesta, medicion, es_staff, **medir)
+
+    def debe_medir(self, request):
+        """None si la petición no se mide; si no, cómo informarla"""
+        con_sesion = settings.SESSION_COOKIE_NAME in request.COOKIES
+        muestreada = random.random() < settings.INSTRUMENTACION_MUESTREO
+        if not (con_sesion or muestreada):
+            return None
+
+        panel = con_sesion and PARAMETRO_PANEL in request.GET
+        if panel:
+            # Las vistas no lo ven (el admin redirige ante parámetros desconocidos)
+            request.GET = request.GET.copy()
+            del request.GET[PARAMETRO_PANEL]
+        return {'con_sesion': con_sesion, 'muestreada': muestreada, 'panel': panel}
+
+    def informar(self, request, respuesta, medicion, es_staff, con_sesion, muestreada, panel):
+        """Log muestreado, Server-Timing y panel de staff"""
+        medicion.terminar(respuesta)
+        if muestreada:
+            logger.info(json.dumps({
+                'metodo': request.method,
+                'ruta': request.path,
+                'vista': request.resolver_match.view_name if request.resolver_match else None,
+                'estado': respuesta.status_code,
+                **medicion.como_dict(),
+            }, ensure_ascii=False))
+
+        if es_staff or settings.INSTRUMENTACION_SERVER_TIMING_PUBLICO:
+            respuesta.headers['Server-Timing'] = medicion.server_timing()
+        if es_staff:
+            # Una página pública con los tiempos de staff no debe quedar en un proxy
+            patch_cache_control(respuesta, private=True)
+            patch_vary_headers(respuesta, ['Cookie'])
+        if es_staff and panel:
+            self.agregar_panel(respuesta, medicion)
+        return respuesta
+
+    def agregar_panel(self, respuesta, medicion):
+        """Inserta el panel antes de </body> en las páginas HTML completas"""
+        if (
+            respuesta.streaming or respuesta.status_code != 200
+            or not respuesta.get('Content-Type', '').startswith('text/html')
+            or b'</body>' not in respuesta.content
+        ):
+            return
+        panel = render_to_string('partials/_panel_rendimiento.html', {'medicion': medicion})
+        respuesta.content = respuesta.content.replace(b'</body>', panel.encode() + b'</body>', 1)
+        if respuesta.has_header('Content-Length'):
+            respuesta.headers['Content-Length'] = str(len(respuesta.content))
+        # Las páginas públicas se cachean en proxies: esta versión no
+        add_never_cache_headers(respuesta)
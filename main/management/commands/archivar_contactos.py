@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from main.models import Contacto, ContactoArchivado
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve los mensajes de contacto leídos y antiguos a ContactoArchivado (texto comprimido), '
+        'por lotes: cada lote es una transacción corta y la bandeja sigue respondiendo mientras tanto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.CONTACTOS_ARCHIVAR_DIAS,
+            help='Archiva los leídos enviados hace más de estos días'
+        )
+        parser.add_argument('--lote', type=int, default=1000, help='Mensajes por transacción')
+        parser.add_argument('--simular', action='store_true', help='Solo cuenta cuántos se archivarían')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 0 or options['lote'] < 1:
+            raise CommandError('--dias no puede ser negativo y --lote debe ser positivo')
+
+        limite = timezone.now() - timedelta(days=options['dias'])
+        antiguos = Contacto.objects.filter(leido=True, fecha_envio__lt=limite)
+        if options['simular']:
+            self.stdout.write(f'Se archivarían {antiguos.count()} mensaje(s) anteriores a {limite:%d/%m/%Y}')
+            return
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                # Del más antiguo al más nuevo, por el índice (fecha_envio, id)
+                lote = list(
+                    antiguos.order_by('fecha_envio', 'id')
+                    .only('nombre', 'email', 'mensaje', 'fecha_envio')[:options['lote']]
+                )
+                if not lote:
+                    break
+                ContactoArchivado.objects.bulk_create([ContactoArchivado.desde_contacto(contacto) for contacto in lote])
+                Contacto.objects.filter(pk__in=[contacto.pk for contacto in lote]).delete()
+            total += len(lote)
+            self.stdout.write(f'  {total} archivado(s)…')
+
+        self.stdout.write(self.style.SUCCESS(f'{total} mensaje(s) archivado(s)'))
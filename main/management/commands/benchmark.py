@@ -0,0 +1,373 @@
+import json
+import platform
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection, RemoteDisconnected
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.antispam import crear_marca
+from main.models import Contacto, Habilidad, ImagenProyecto, Proyecto
+from main.rendimiento import consultas_server_timing, repartir, resumir_tiempos
+
+from .sembrar_datos import DOMINIO_CONTACTOS
+
+USUARIO_ADMIN = 'benchmark'
+
+
+def pedir_pagina(nombre_url, **parametros):
+    def pedir(numero, corrida):
+        ruta = reverse(nombre_url)
+        return 'GET', f'{ruta}?{urlencode(parametros)}' if parametros else ruta, None
+    return pedir
+
+
+def enviar_contacto(numero, corrida):
+    """POST por fetch/JSON como script.js, con una marca que ya pasó el tiempo mínimo"""
+    datos = {
+        'nombre': 'Benchmark',
+        'email': f'post-{corrida}-{numero}@{DOMINIO_CONTACTOS}',
+        'mensaje': f'Mensaje de prueba {corrida} #{numero} para medir el formulario de contacto.',
+        'marca': crear_marca(timezone.now().timestamp() - settings.CONTACTO_TIEMPO_MINIMO - 1),
+    }
+    return 'POST', reverse('contacto'), json.dumps(datos)
+
+
+# Escenario -> (función que arma la petición (método, ruta, cuerpo JSON), requiere sesión de staff)
+ESCENARIOS = {
+    'index': (pedir_pagina('index'), False),
+    'proyectos': (pedir_pagina('todos_proyectos'), False),
+    'busqueda': (pedir_pagina('buscar_proyectos', q='django api'), False),
+    'api_proyectos': (pedir_pagina('api_proyectos'), False),
+    'contacto_post': (enviar_contacto, False),
+    'admin_proyectos': (pedir_pagina('admin:main_proyecto_changelist'), True),
+    'admin_habilidades': (pedir_pagina('admin:main_habilidad_changelist'), True),
+    'admin_contactos': (pedir_pagina('admin:main_contacto_changelist'), True),
+    'admin_contactos_busqueda': (pedir_pagina('admin:main_contacto_changelist', q='inventario'), True),
+    'admin_bandeja': (pedir_pagina('admin:main_contacto_bandeja'), True),
+}
+
+
+def tamano(respuesta):
+    if respuesta.streaming:
+        return sum(len(parte) for parte in respuesta.streaming_content)
+    return len(respuesta.content)
+
+
+class ClienteHttp:
+    """
+    Peticiones HTTP reales (http.client) a un servidor ya levantado (runserver,
+    gunicorn, uvicorn): mide el servidor, los sockets y los bytes que viajan.
+    Las consultas SQL salen de la cabecera Server-Timing de InstrumentacionMiddleware.
+    """
+
+    def __init__(self, url, usuario=None):
+        partes = urlsplit(url)
+        self.clase = HTTPSConnection if partes.scheme == 'https' else HTTPConnection
+        self.host = partes.netloc
+        self.prefijo = partes.path.rstrip('/')
+        self.cabeceras = {'Accept-Encoding': 'gzip, br'}
+        if usuario:
+            # force_login guarda la sesión en SESSION_ENGINE: el servidor la ve si usa la misma base
+            sesion = Client()
+            sesion.force_login(usuario)
+            self.cabeceras['Cookie'] = (
+                f'{settings.SESSION_COOKIE_NAME}={sesion.cookies[settings.SESSION_COOKIE_NAME].value}'
+            )
+        self.conexion = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+    def enviar(self, metodo, ruta, cuerpo, cabeceras):
+        # Reutiliza la conexión (keep-alive); si el servidor ya la cerró, abre otra
+        reutilizada = self.conexion is not None
+        if not reutilizada:
+            self.conexion = self.clase(self.host, timeout=30)
+        try:
+            self.conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+            return self.conexion.getresponse()
+        except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.__exit__()
+            if not reutilizada:
+                raise
+            return self.enviar(metodo, ruta, cuerpo, cabeceras)
+
+    def pedir(self, metodo, ruta, cuerpo):
+        """(segundos, consultas SQL o None, bytes del cuerpo, estado)"""
+        cabeceras = dict(self.cabeceras)
+        if cuerpo is not None:
+            cabeceras['Content-Type'] = 'application/json'
+        inicio = time.perf_counter()
+        respuesta = self.enviar(metodo, self.prefijo + ruta, cuerpo, cabeceras)
+        contenido = respuesta.read()
+        duracion = time.perf_counter() - inicio
+        if respuesta.will_close:
+            self.__exit__()
+        return duracion, consultas_server_timing(respuesta.getheader('Server-Timing')), len(contenido), respuesta.status
+
+
+class ClienteLocal:
+    """django.test.Client en este proceso, sin red ni servidor; cuenta las consultas con execute_wrapper"""
+
+    def __init__(self, usuario=None):
+        self.cliente = Client()
+        if usuario:
+            self.cliente.force_login(usuario)
+        self.consultas = 0
+        self.envoltura = None
+
+    def contar(self, ejecutar, sql, params, many, contexto):
+        self.consultas += 1
+        return ejecutar(sql, params, many, contexto)
+
+    def __enter__(self):
+        # La conexión es propia de cada hilo: solo cuenta las consultas de este cliente
+        self.envoltura = connection.execute_wrapper(self.contar)
+        self.envoltura.__enter__()
+        return self
+
+    def __exit__(self, *error):
+        self.envoltura.__exit__(*error)
+
+    def pedir(self, metodo, ruta, cuerpo):
+        """(segundos, consultas SQL, bytes del cuerpo, estado)"""
+        self.consultas = 0
+        inicio = time.perf_counter()
+        respuesta = self.cliente.generic(metodo, ruta, cuerpo or '', content_type='application/json')
+        contenido = tamano(respuesta)
+        return time.perf_counter() - inicio, self.consultas, contenido, respuesta.status_code
+
+
+def medir(pedir, clientes, tandas, corrida):
+    """
+    Ejecuta las tandas (una por cliente) a la vez y devuelve por petición
+    (segundos, consultas SQL, bytes del cuerpo, estado).
+    """
+
+    def trabajar(cliente, numeros):
+        with cliente:
+            return [cliente.pedir(*pedir(numero, corrida)) for numero in numeros]
+
+    if len(tandas) == 1:
+        # Sin hilos: usa la conexión actual (y ve los datos de una transacción abierta)
+        return trabajar(clientes[0], tandas[0])
+
+    def en_hilo(cliente, numeros):
+        try:
+            return trabajar(cliente, numeros)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(tandas)) as hilos:
+        return [r for parcial in hilos.map(en_hilo, clientes, tandas) for r in parcial]
+
+
+def commit_actual():
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def variacion(actual, anterior):
+    if not actual or not anterior:
+        return ''
+    return f'{(actual - anterior) / anterior * 100:+.1f}%'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide las páginas públicas, el POST de contacto y los listados del admin con clientes '
+        'concurrentes: peticiones por segundo, latencia (p50/p90/p99), consultas SQL y bytes por '
+        'petición. Con --url hace peticiones HTTP reales a un servidor levantado; sin ella, usa '
+        'clientes de prueba en este proceso. El resultado en JSON se puede comparar entre commits '
+        'con --comparar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por escenario')
+        parser.add_argument('--concurrencia', type=int, default=4, help='Clientes simultáneos')
+        parser.add_argument(
+            '--escenarios', nargs='+', choices=ESCENARIOS, default=list(ESCENARIOS),
+            help='Escenarios a medir (por defecto, todos)'
+        )
+        parser.add_argument(
+            '--sin-cache', action='store_true',
+            help='Usa DummyCache: mide las consultas en vez de los fragmentos cacheados'
+        )
+        parser.add_argument(
+            '--url', default=None,
+            help='Servidor a medir por HTTP (p. ej. http://127.0.0.1:8000) con la misma base de datos'
+        )
+        parser.add_argument('--json', default=None, help='Guarda el resultado en este archivo (- para stdout)')
+        parser.add_argument('--comparar', default=None, help='JSON de una corrida anterior para ver la diferencia')
+
+    def handle(self, *args, **options):
+        if options['peticiones'] < 1 or options['concurrencia'] < 1:
+            raise CommandError('--peticiones y --concurrencia deben ser positivos')
+        if options['url']:
+            partes = urlsplit(options['url'])
+            if partes.scheme not in ('http', 'https') or not partes.netloc:
+                raise CommandError('--url debe ser una URL http:// o https://')
+            if options['sin_cache']:
+                raise CommandError('--sin-cache solo aplica en proceso: configurar CACHES en el servidor')
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    anterior = json.load(archivo)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'No se pudo leer {options["comparar"]}: {error}')
+
+        # Solo afectan a los clientes en proceso: con --url valen los del servidor
+        ajustes = {
+            # Los clientes de prueba piden con Host: testserver
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            # El benchmark manda muchos mensajes desde una sola IP
+            'CONTACTO_LIMITE_IP': (10 ** 9, 60),
+            'CONTACTO_LIMITE_EMAIL': (10 ** 9, 60),
+        }
+        if options['sin_cache']:
+            ajustes['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        corrida = uuid.uuid4().hex[:8]
+        usuario, creado = self.usuario_admin(options['escenarios'])
+        try:
+            with override_settings(**ajustes):
+                escenarios = {
+                    nombre: self.medir_escenario(nombre, usuario, corrida, options)
+                    for nombre in options['escenarios']
+                }
+        finally:
+            # Los mensajes enviados y el usuario temporal no quedan para la próxima corrida
+            Contacto.objects.filter(email__startswith=f'post-{corrida}-', email__endswith=f'@{DOMINIO_CONTACTOS}').delete()
+            if creado:
+                usuario.delete()
+
+        resultado = {
+            'fecha': timezone.now().isoformat(timespec='seconds'),
+            'commit': commit_actual(),
+            'entorno': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'base': connection.vendor,
+                # Con --url, la caché es la que tenga configurada el servidor
+                'cache': None if options['url'] else 'dummy' if options['sin_cache'] else settings.CACHES['default']['BACKEND'],
+                'modo': 'http' if options['url'] else 'en_proceso',
+                'url': options['url'],
+            },
+            'datos': {
+                'proyectos': Proyecto.objects.count(),
+                'capturas': ImagenProyecto.objects.count(),
+                'habilidades': Habilidad.objects.count(),
+                'contactos': Contacto.objects.count(),
+            },
+            'parametros': {'peticiones': options['peticiones'], 'concurrencia': options['concurrencia']},
+            'escenarios': escenarios,
+        }
+
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+        self.mostrar(resultado, anterior)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2)
+            self.stdout.write(f'Resultado guardado en {options["json"]}')
+
+    def usuario_admin(self, escenarios):
+        """Usuario staff para los listados del admin; se crea solo si hace falta"""
+        if not any(ESCENARIOS[nombre][1] for nombre in escenarios):
+            return None, False
+        usuario, creado = get_user_model().objects.get_or_create(
+            username=USUARIO_ADMIN, defaults={'is_staff': True, 'is_superuser': True},
+        )
+        if not (usuario.is_staff and usuario.is_superuser):
+            raise CommandError(f'Ya existe un usuario "{USUARIO_ADMIN}" sin permisos de administrador')
+        return usuario, creado
+
+    def medir_escenario(self, nombre, usuario, corrida, options):
+        pedir, requiere_staff = ESCENARIOS[nombre]
+        usuario = usuario if requiere_staff else None
+        if options['url']:
+            clientes = [ClienteHttp(options['url'], usuario) for _ in range(options['concurrencia'])]
+        else:
+            clientes = [ClienteLocal(usuario) for _ in range(options['concurrencia'])]
+
+        # Calentamiento: templates compilados, fragmentos en caché y sesión cargada
+        try:
+            medir(pedir, clientes[:1], [[-1]], corrida)
+        except OSError as error:
+            raise CommandError(f'No se pudo conectar con {options["url"]}: {error}')
+
+        numeros = list(range(options['peticiones']))
+        tandas = [tanda for tanda in repartir(len(numeros), options['concurrencia'], numeros) if tanda]
+        inicio = time.perf_counter()
+        resultados = medir(pedir, clientes, tandas, corrida)
+        duracion = time.perf_counter() - inicio
+
+        # Por HTTP, solo las respuestas con Server-Timing (staff o INSTRUMENTACION_SERVER_TIMING_PUBLICO)
+        consultas = [r[1] for r in resultados if r[1] is not None]
+        cuerpos = [r[2] for r in resultados]
+        return {
+            'peticiones': len(resultados),
+            'errores': sum(1 for r in resultados if r[3] >= 400),
+            'duracion_s': round(duracion, 3),
+            'peticiones_por_segundo': round(len(resultados) / duracion, 1),
+            'latencia': resumir_tiempos([r[0] for r in resultados]),
+            'consultas': {
+                'media': round(sum(consultas) / len(consultas), 2) if consultas else None,
+                'max': max(consultas, default=None),
+            },
+            'bytes': {'media': round(sum(cuerpos) / len(cuerpos)), 'total': sum(cuerpos)},
+        }
+
+    def mostrar(self, resultado, anterior=None):
+        self.stdout.write(
+            f'commit {resultado["commit"] or "?"} · {resultado["entorno"]["base"]} · '
+            f'{resultado["datos"]["proyectos"]} proyectos, {resultado["datos"]["contactos"]} contactos · '
+            f'concurrencia {resultado["parametros"]["concurrencia"]} · '
+            f'{resultado["entorno"].get("url") or "en proceso"}'
+        )
+        self.stdout.write(
+            f'{"escenario":<26} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"consultas":>9} {"KB":>8} {"errores":>7}'
+        )
+        previos = (anterior or {}).get('escenarios', {})
+        for nombre, datos in resultado['escenarios'].items():
+            # Por HTTP sin Server-Timing no se conocen las consultas
+            consultas = '-' if datos['consultas']['media'] is None else datos['consultas']['media']
+            self.stdout.write(
+                f'{nombre:<26} {datos["peticiones_por_segundo"]:>8} {datos["latencia"]["p50_ms"]:>8} '
+                f'{datos["latencia"]["p99_ms"]:>8} {consultas:>9} '
+                f'{datos["bytes"]["media"] / 1024:>8.1f} {datos["errores"]:>7}'
+            )
+            previo = previos.get(nombre)
+            if previo:
+                self.stdout.write(
+                    f'{"  vs. " + str(anterior.get("commit") or "anterior"):<26} '
+                    f'{variacion(datos["peticiones_por_segundo"], previo["peticiones_por_segundo"]):>8} '
+                    f'{variacion(datos["latencia"]["p50_ms"], previo["latencia"]["p50_ms"]):>8} '
+                    f'{variacion(datos["latencia"]["p99_ms"], previo["latencia"]["p99_ms"]):>8} '
+                    f'{variacion(datos["consultas"]["media"], previo["consultas"]["media"]):>9} '
+                    f'{variacion(datos["bytes"]["media"], previo["bytes"]["media"]):>8}'
+                )
@@ -0,0 +1,167 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+
+from main.rendimiento import repartir, resumir_tiempos
+from portafolio.conexiones import MODOS_CONEXION, describir_modo
+
+
+def medir(tandas):
+    """
+    Pide las rutas de cada tanda en su propio hilo (como los hilos de un worker).
+    El cliente de pruebas no cierra conexiones: aquí se cierran como lo hace el
+    handler WSGI, con close_old_connections antes y después de cada request.
+    """
+
+    def trabajar(rutas):
+        cliente = Client()
+        resultados = []
+        for ruta in rutas:
+            inicio = time.perf_counter()
+            close_old_connections()
+            respuesta = cliente.get(ruta)
+            close_old_connections()
+            resultados.append((time.perf_counter() - inicio, respuesta.status_code))
+        return resultados
+
+    if len(tandas) == 1:
+        return trabajar(tandas[0])
+
+    def en_hilo(rutas):
+        try:
+            return trabajar(rutas)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(tandas)) as hilos:
+        return [resultado for parcial in hilos.map(en_hilo, tandas) for resultado in parcial]
+
+
+def conexiones_del_pool():
+    """Conexiones que abrió el pool de psycopg 3 (None si no hay pool)"""
+    pool = getattr(connection, 'pool', None)
+    return pool.get_stats().get('connections_num', 0) if pool else None
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara los modos de conexión a la base (DB_MODO_CONEXION: por_peticion, persistente, pool) '
+        'pidiendo páginas con la caché desactivada. Cada modo corre en su propio proceso; '
+        'tiene sentido contra el PostgreSQL real.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modos', nargs='+', choices=MODOS_CONEXION, default=list(MODOS_CONEXION))
+        parser.add_argument('--peticiones', type=int, default=300, help='Peticiones por modo')
+        parser.add_argument('--concurrencia', type=int, default=4, help='Hilos simultáneos (como los de un worker)')
+        parser.add_argument('--rutas', nargs='+', default=['/', '/proyectos/'], help='Rutas a pedir')
+        parser.add_argument('--json', default=None, help='Guarda el resultado en este archivo (- para stdout)')
+        parser.add_argument(
+            '--medir', action='store_true',
+            help='Mide solo la configuración actual en este proceso (lo usan los procesos de cada modo)'
+        )
+
+    def handle(self, *args, **options):
+        if options['peticiones'] < 1 or options['concurrencia'] < 1:
+            raise CommandError('--peticiones y --concurrencia deben ser positivos')
+
+        if options['medir']:
+            resultados = [self.medir(options)]
+        else:
+            modos = options['modos']
+            if connection.vendor != 'postgresql':
+                modos = [modo for modo in modos if modo != 'pool']
+                self.stderr.write(self.style.WARNING(
+                    f'La base es {connection.vendor}: abrir conexiones cuesta poco y no hay pool, '
+                    'los números no representan a PostgreSQL'
+                ))
+            resultados = [self.medir_en_proceso(modo, options) for modo in modos]
+
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(resultados))
+            return
+        self.mostrar(resultados)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2)
+
+    def medir_en_proceso(self, modo, options):
+        """Los settings leen DB_MODO_CONEXION al cargar: cada modo necesita un proceso nuevo"""
+        comando = [
+            sys.executable, '-m', 'django', 'benchmark_conexiones', '--medir', '--json', '-',
+            '--peticiones', str(options['peticiones']), '--concurrencia', str(options['concurrencia']),
+            '--rutas', *options['rutas'],
+        ]
+        entorno = {
+            **os.environ,
+            'DB_MODO_CONEXION': modo,
+            'PYTHONPATH': os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')])),
+        }
+        proceso = subprocess.run(comando, env=entorno, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            raise CommandError(f'Falló la medición {modo}:\n{proceso.stderr}')
+        resultado = json.loads(proceso.stdout)[0]
+        if resultado['modo'] != modo:
+            raise CommandError(
+                f'El proceso de {modo} quedó en modo {resultado["modo"]}: '
+                'los settings deben pasar DATABASES por configurar_conexiones'
+            )
+        return resultado
+
+    def medir(self, options):
+        abiertas = []
+
+        def contar(sender, connection, **kwargs):
+            abiertas.append(connection.alias)
+
+        connection_created.connect(contar)
+        try:
+            # Sin caché cada request consulta la base; testserver es el host del cliente
+            with override_settings(
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                # Calentamiento: templates compilados (y el pool abierto, si hay)
+                medir([options['rutas']])
+                abiertas.clear()
+                pool_antes = conexiones_del_pool()
+                tandas = repartir(options['peticiones'], options['concurrencia'], options['rutas'])
+                inicio = time.perf_counter()
+                resultados = medir([tanda for tanda in tandas if tanda])
+                duracion = time.perf_counter() - inicio
+        finally:
+            connection_created.disconnect(contar)
+
+        # Con pool, connection_created se emite en cada préstamo: se usan las
+        # estadísticas del pool para contar conexiones reales
+        pool_despues = conexiones_del_pool()
+        return {
+            'modo': describir_modo(connection.settings_dict),
+            'base': connection.vendor,
+            'concurrencia': options['concurrencia'],
+            'peticiones_por_segundo': round(len(resultados) / duracion, 1),
+            'errores': sum(1 for _, estado in resultados if estado >= 400),
+            'conexiones_abiertas': len(abiertas) if pool_despues is None else pool_despues - pool_antes,
+            'latencia': resumir_tiempos([tiempo for tiempo, _ in resultados]),
+        }
+
+    def mostrar(self, resultados):
+        self.stdout.write(
+            f'{"modo":<14} {"req/s":>8} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"conexiones":>10} {"errores":>7}'
+        )
+        for resultado in resultados:
+            latencia = resultado['latencia']
+            self.stdout.write(
+                f'{resultado["modo"]:<14} {resultado["peticiones_por_segundo"]:>8} {latencia["p50_ms"]:>8} '
+                f'{latencia["p90_ms"]:>8} {latencia["p99_ms"]:>8} {resultado["conexiones_abiertas"]:>10} '
+                f'{resultado["errores"]:>7}'
+            )
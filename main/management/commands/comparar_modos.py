@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+
+from main.rendimiento import repartir, resumir_tiempos
+
+MODOS = ('wsgi', 'asgi')
+
+
+def medir_wsgi(tandas):
+    """Un hilo por trabajador, cada uno con su Client (WSGIHandler)"""
+
+    def trabajar(rutas):
+        cliente = Client()
+        resultados = []
+        try:
+            for ruta in rutas:
+                inicio = time.perf_counter()
+                respuesta = cliente.get(ruta)
+                resultados.append((ruta, time.perf_counter() - inicio, respuesta.status_code))
+        finally:
+            connections.close_all()
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=len(tandas)) as hilos:
+        return [resultado for parcial in hilos.map(trabajar, tandas) for resultado in parcial]
+
+
+def medir_asgi(tandas):
+    """Una tarea por trabajador en el mismo event loop, con AsyncClient (ASGIHandler)"""
+
+    async def trabajar(rutas):
+        cliente = AsyncClient()
+        resultados = []
+        for ruta in rutas:
+            inicio = time.perf_counter()
+            respuesta = await cliente.get(ruta)
+            resultados.append((ruta, time.perf_counter() - inicio, respuesta.status_code))
+        return resultados
+
+    async def todas():
+        parciales = await asyncio.gather(*(trabajar(rutas) for rutas in tandas))
+        return [resultado for parcial in parciales for resultado in parcial]
+
+    return asyncio.run(todas())
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara latencia (p50/p90/p99) y peticiones por segundo de las páginas públicas '
+        'sirviéndolas con el handler WSGI (vistas sync) y con el ASGI (vistas async). '
+        'Cada modo corre en su propio proceso, contra la base configurada.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por modo')
+        parser.add_argument('--concurrencia', type=int, default=10, help='Clientes simultáneos')
+        parser.add_argument('--rutas', nargs='+', default=['/', '/proyectos/'], help='Rutas a pedir')
+        parser.add_argument(
+            '--sin-cache', action='store_true',
+            help='Usa DummyCache: mide las consultas en vez de los fragmentos cacheados'
+        )
+        parser.add_argument('--json', default=None, help='Guarda el resultado en este archivo (- para stdout)')
+        parser.add_argument('--modo', choices=MODOS, default=None, help='Mide un solo modo en este proceso')
+
+    def handle(self, *args, **options):
+        if options['peticiones'] < 1 or options['concurrencia'] < 1:
+            raise CommandError('--peticiones y --concurrencia deben ser positivos')
+
+        if options['modo']:
+            resultado = self.medir(options['modo'], options)
+            resultados = {options['modo']: resultado}
+        else:
+            resultados = {modo: self.medir_en_proceso(modo, options) for modo in MODOS}
+
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(resultados))
+            return
+        self.mostrar(resultados)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2)
+
+    def medir_en_proceso(self, modo, options):
+        """Lanza el modo en un proceso nuevo: VISTAS_ASINCRONAS se lee al cargar las URLs"""
+        comando = [
+            sys.executable, '-m', 'django', 'comparar_modos', '--modo', modo, '--json', '-',
+            '--peticiones', str(options['peticiones']), '--concurrencia', str(options['concurrencia']),
+            '--rutas', *options['rutas'],
+        ]
+        if options['sin_cache']:
+            comando.append('--sin-cache')
+        entorno = {
+            **os.environ,
+            'VISTAS_ASINCRONAS': '1' if modo == 'asgi' else '0',
+            'PYTHONPATH': os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')])),
+        }
+        proceso = subprocess.run(comando, env=entorno, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            raise CommandError(f'Falló la medición {modo}:\n{proceso.stderr}')
+        return json.loads(proceso.stdout)[modo]
+
+    def medir(self, modo, options):
+        # Los clientes de prueba piden con Host: testserver, como en los tests
+        ajustes = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['sin_cache']:
+            ajustes['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        medir = medir_asgi if modo == 'asgi' else medir_wsgi
+
+        with override_settings(**ajustes):
+            # Calentamiento: templates compilados y fragmentos en caché
+            medir([options['rutas']])
+            tandas = repartir(options['peticiones'], options['concurrencia'], options['rutas'])
+            inicio = time.perf_counter()
+            resultados = medir(tandas)
+            duracion = time.perf_counter() - inicio
+
+        return {
+            'vistas_async': settings.VISTAS_ASINCRONAS,
+            'concurrencia': options['concurrencia'],
+            'duracion_s': round(duracion, 3),
+            'peticiones_por_segundo': round(len(resultados) / duracion, 1),
+            'errores': sum(1 for _, _, estado in resultados if estado >= 400),
+            'total': resumir_tiempos([tiempo for _, tiempo, _ in resultados]),
+            'rutas': {
+                ruta: resumir_tiempos([tiempo for r, tiempo, _ in resultados if r == ruta])
+                for ruta in options['rutas']
+            },
+        }
+
+    def mostrar(self, resultados):
+        self.stdout.write(f'{"modo":<6} {"ruta":<24} {"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9} {"req/s":>9}')
+        for modo, resultado in resultados.items():
+            for ruta, resumen in {'(total)': resultado['total'], **resultado['rutas']}.items():
+                rps = resultado['peticiones_por_segundo'] if ruta == '(total)' else ''
+                self.stdout.write(
+                    f'{modo:<6} {ruta:<24} {resumen["p50_ms"]:>9} {resumen["p90_ms"]:>9} '
+                    f'{resumen["p99_ms"]:>9} {rps:>9}'
+                )
+            if resultado['errores']:
+                self.stdout.write(self.style.WARNING(f'{modo}: {resultado["errores"]} respuesta(s) con error'))
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from main.cache import incrementar_version
+from main.media import CAMPOS_MEDIA
+from main.tareas import inicializar_proceso, medir_en_proceso
+
+
+class Command(BaseCommand):
+    help = (
+        'Guarda ancho, alto y miniatura borrosa (LQIP) de las imágenes subidas antes de que '
+        'se midieran al subirlas. Cada archivo se lee una sola vez aunque lo usen varias filas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos', type=int, default=os.cpu_count() or 1,
+            help='Procesos en paralelo para Pillow (0 = en este mismo proceso)'
+        )
+        parser.add_argument('--forzar', action='store_true', help='Vuelve a medir también las que ya tienen medidas')
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 0:
+            raise CommandError('--procesos no puede ser negativo')
+
+        # Los procesos hijos no deben heredar conexiones abiertas
+        connections.close_all()
+        ejecutor = None
+        if options['procesos'] > 0:
+            ejecutor = ProcessPoolExecutor(max_workers=options['procesos'], initializer=inicializar_proceso)
+        try:
+            total = sum(
+                self.completar(modelo, campo, ejecutor, options['forzar']) for modelo, campo, _ in CAMPOS_MEDIA
+            )
+        finally:
+            if ejecutor is not None:
+                ejecutor.shutdown()
+
+        # update() no dispara las señales que invalidan la caché
+        incrementar_version()
+        self.stdout.write(self.style.SUCCESS(f'{total} imagen(es) medida(s)'))
+
+    def completar(self, modelo, campo, ejecutor, forzar):
+        field = modelo._meta.get_field(campo)
+        pendientes = modelo.objects.exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True})
+        if not forzar:
+            pendientes = pendientes.filter(**{f'{field.width_field}__isnull': True})
+        nombres = list(pendientes.order_by().values_list(campo, flat=True).distinct())
+
+        medir = partial(medir_en_proceso, modelo._meta.model_name, campo)
+        resultados = ejecutor.map(medir, nombres, chunksize=8) if ejecutor else map(medir, nombres)
+        medidas_ok = 0
+        for nombre, medidas in resultados:
+            if medidas is None:
+                self.stderr.write(f'  No se pudo medir {nombre}')
+                continue
+            ancho, alto, lqip = medidas
+            cambios = {field.width_field: ancho, field.height_field: alto}
+            if field.campo_lqip:
+                cambios[field.campo_lqip] = lqip
+            modelo.objects.filter(**{campo: nombre}).update(**cambios)
+            medidas_ok += 1
+
+        self.stdout.write(f'{modelo._meta.verbose_name_plural}: {medidas_ok}/{len(nombres)} archivo(s) medido(s)')
+        return medidas_ok
@@ -0,0 +1,127 @@
+import posixpath
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.cache import incrementar_version
+from main.imagenes import eliminar_variantes
+from main.media import CAMPOS_MEDIA, borrar_si_huerfano, contar_referencias, recontar
+from main.storage import media_por_contenido
+from main.tareas import encolar_variantes
+
+
+class Command(BaseCommand):
+    help = (
+        'Pasa la media subida antes de MediaPorContenido a nombres por contenido: las copias '
+        'de una misma imagen quedan en un solo archivo. Borra también los archivos por '
+        'contenido que ya nadie usa. Se puede volver a ejecutar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--simular', action='store_true', help='Solo informa qué se unificaría')
+        parser.add_argument(
+            '--conservar', action='store_true',
+            help='No borra los archivos con el nombre anterior (ni sus variantes)'
+        )
+
+    def handle(self, *args, **options):
+        self.storage = media_por_contenido()
+        heredados = self.nombres_heredados()
+        destinos, tamanos = self.calcular_destinos(heredados, guardar=not options['simular'])
+
+        distintos = len(set(destinos.values()))
+        ahorro = sum(tamanos.values()) - sum({destinos[nombre]: tamanos[nombre] for nombre in destinos}.values())
+        resumen = (
+            f'{len(destinos)} archivo(s) con nombre anterior, {distintos} contenido(s) distinto(s): '
+            f'{len(destinos) - distintos} duplicado(s), {ahorro / 1024:.0f} KiB'
+        )
+        if options['simular']:
+            self.stdout.write(f'Se unificarían {resumen}')
+            return
+
+        variantes_viejas = self.reasignar(destinos)
+        if not options['conservar']:
+            for nombre in destinos:
+                self.storage.delete(nombre)
+            for registro in variantes_viejas:
+                eliminar_variantes(registro, self.storage)
+        huerfanos = self.borrar_huerfanos()
+
+        incrementar_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Unificados {resumen}. Archivos sin uso borrados: {huerfanos}.'
+        ))
+
+    # -------------------------
+    # Pasos
+    # -------------------------
+
+    def nombres_heredados(self):
+        """Nombres referenciados que todavía no son por contenido"""
+        nombres = set()
+        for modelo, campo, _ in CAMPOS_MEDIA:
+            nombres.update(
+                modelo.objects.exclude(**{campo: ''}).order_by()
+                .values_list(campo, flat=True).distinct()
+            )
+        return sorted(nombre for nombre in nombres if not self.storage.es_por_contenido(nombre))
+
+    def calcular_destinos(self, nombres, guardar):
+        """{nombre anterior: nombre por contenido} y el tamaño de cada archivo"""
+        destinos, tamanos = {}, {}
+        for nombre in nombres:
+            try:
+                with self.storage.open(nombre, 'rb') as archivo:
+                    if guardar:
+                        destinos[nombre] = self.storage.save(nombre, archivo)
+                    else:
+                        destinos[nombre] = self.storage.nombre_para(self.storage.huella(archivo), nombre)
+                tamanos[nombre] = self.storage.size(nombre)
+            except FileNotFoundError:
+                self.stderr.write(f'  Falta {nombre}: se deja como está')
+        return destinos, tamanos
+
+    def reasignar(self, destinos):
+        """
+        Cambia las referencias de las filas al nombre nuevo y vuelve a programar
+        sus variantes. Devuelve los registros de variantes que quedaron sin uso.
+        """
+        variantes_viejas = []
+        with transaction.atomic():
+            for modelo, campo, campo_variantes in CAMPOS_MEDIA:
+                afectados = defaultdict(list)
+                filas = modelo.objects.filter(**{f'{campo}__in': list(destinos)})
+                columnas = ('pk', campo, campo_variantes) if campo_variantes else ('pk', campo)
+                for fila in filas.values_list(*columnas):
+                    afectados[fila[1]].append(fila[0])
+                    if campo_variantes and fila[2]:
+                        variantes_viejas.append(fila[2])
+
+                cambios = {campo_variantes: {}} if campo_variantes else {}
+                for nombre, pks in afectados.items():
+                    modelo.objects.filter(pk__in=pks).update(**{campo: destinos[nombre]}, **cambios)
+
+                if campo_variantes:
+                    pks = [pk for lista in afectados.values() for pk in lista]
+                    for instancia in modelo.objects.filter(pk__in=pks):
+                        encolar_variantes(instancia)
+            # update() no pasa por las señales que cuentan las referencias
+            recontar(set(destinos.values()))
+        return variantes_viejas
+
+    def borrar_huerfanos(self):
+        """Archivos por contenido que ninguna fila usa (p. ej. de un borrado interrumpido)"""
+        try:
+            carpetas, _ = self.storage.listdir(self.storage.carpeta)
+        except FileNotFoundError:
+            return 0
+        nombres = []
+        for carpeta in carpetas:
+            _, archivos = self.storage.listdir(posixpath.join(self.storage.carpeta, carpeta))
+            nombres += [
+                nombre for nombre in (posixpath.join(self.storage.carpeta, carpeta, archivo) for archivo in archivos)
+                if self.storage.es_por_contenido(nombre)
+            ]
+        sin_uso = [nombre for nombre, referencias in contar_referencias(nombres).items() if not referencias]
+        return sum(borrar_si_huerfano(nombre) for nombre in sin_uso)
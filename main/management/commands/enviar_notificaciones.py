@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from main.notificaciones import enviar_lote, reclamar_notificaciones, recuperar_notificaciones_colgadas
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker que envía por email los avisos de mensajes de contacto, agrupados en '
+        'resúmenes y con reintentos. El formulario nunca espera a este envío.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=settings.NOTIFICACIONES_MAX_POR_RESUMEN,
+            help='Mensajes como máximo por resumen'
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera cuando no hay nada que enviar'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Envía lo pendiente y termina en vez de quedar escuchando'
+        )
+
+    def handle(self, *args, **options):
+        # enviar_lote abre la conexión SMTP por resumen: no queda abierta mientras se espera
+        conexion = get_connection()
+        self.stdout.write(f'Enviando avisos de contacto a {", ".join(settings.NOTIFICACIONES_DESTINATARIOS) or "nadie"}')
+        try:
+            while True:
+                recuperar_notificaciones_colgadas()
+                notificaciones = reclamar_notificaciones(options['lote'])
+                if not notificaciones:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                enviados = enviar_lote(notificaciones, conexion)
+                self.stdout.write(f'{enviados}/{len(notificaciones)} aviso(s) enviado(s)')
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
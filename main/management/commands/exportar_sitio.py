@@ -0,0 +1,262 @@
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max, Sum
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+from django.utils.module_loading import import_string
+
+from main.antispam import periodo_marca
+from main.compresion import comprimir_archivo
+from main.models import Habilidad, ImagenProyecto, Perfil, Proyecto, Tecnologia
+
+ESTADO = '.exportacion.json'
+STATIC_CON_HUELLA = 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+
+
+def huella(valor):
+    """SHA-256 de cualquier estructura serializable a JSON"""
+    return hashlib.sha256(json.dumps(valor, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def resumen(queryset, fecha=True):
+    """Cantidad, suma de ids y última actualización: cambia con altas, bajas y ediciones"""
+    agregados = {'cantidad': Count('pk'), 'ids': Sum('pk')}
+    if fecha:
+        agregados['fecha'] = Max('fecha_actualizacion')
+    return queryset.order_by().aggregate(**agregados)
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta el sitio público a HTML estático (index, proyectos y modales) con estáticos '
+        'y media con huella y versiones .gz/.br. Solo vuelve a generar las páginas cuyo '
+        'contenido cambió desde la última exportación. No se exportan /proyectos/buscar/ ni las '
+        'páginas filtradas con ?tech=. El formulario de contacto sigue enviando a /contacto/ (necesita '
+        'el backend Django) y su marca firmada vence: hay que volver a exportar antes de '
+        'CONTACTO_MARCA_MAX_EDAD.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('destino', help='Directorio de salida (se sirve tal cual con cualquier servidor)')
+        parser.add_argument(
+            '--completo', action='store_true',
+            help='Ignora la exportación anterior y genera todas las páginas'
+        )
+
+    def handle(self, *args, **options):
+        self.destino = Path(options['destino']).resolve()
+        self.destino.mkdir(parents=True, exist_ok=True)
+        anterior = {} if options['completo'] else self.leer_estado()
+
+        # Caché propia: los fragmentos de la exportación (sin paginar) no deben
+        # mezclarse con los del sitio en vivo. Con DEBUG activo el storage con
+        # huella devuelve las URLs sin hash, así que se exporta siempre sin DEBUG
+        ajustes = override_settings(
+            DEBUG=False,
+            STATIC_ROOT=self.destino / 'static',
+            STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': self.backend_static()}},
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'exportacion',
+            }},
+            PROYECTOS_POR_PAGINA=10 ** 6,
+        )
+        with ajustes:
+            # Vacía lo que haya quedado de una exportación anterior en el mismo proceso
+            cache.clear()
+            call_command('collectstatic', interactive=False, verbosity=0)
+            resumen_exportacion = self.exportar(anterior)
+
+        for archivo in (self.destino / 'static').rglob('*'):
+            if archivo.is_file():
+                comprimir_archivo(archivo)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Páginas: {generadas} generada(s), {sin_cambios} sin cambios, {eliminadas} eliminada(s). '
+            'Archivos media: {media}.'.format(**resumen_exportacion)
+        ))
+        self.stdout.write(
+            f'El formulario de contacto de index.html envía a /contacto/ (backend Django) y su marca '
+            f'vence en {settings.CONTACTO_MARCA_MAX_EDAD // 60} min: volver a exportar antes, por '
+            f'ejemplo con cron cada {settings.CONTACTO_MARCA_MAX_EDAD // 120} min.'
+        )
+
+    def backend_static(self):
+        """El storage de estáticos configurado si ya agrega huellas; si no, el de Django"""
+        backend = settings.STORAGES['staticfiles']['BACKEND']
+        if issubclass(import_string(backend), ManifestFilesMixin):
+            return backend
+        return STATIC_CON_HUELLA
+
+    # -------------------------
+    # Estado de la exportación anterior
+    # -------------------------
+
+    def leer_estado(self):
+        try:
+            return json.loads((self.destino / ESTADO).read_text(encoding='utf-8'))['paginas']
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def guardar_estado(self, paginas):
+        (self.destino / ESTADO).write_text(json.dumps({'paginas': paginas}, indent=2), encoding='utf-8')
+
+    # -------------------------
+    # Páginas
+    # -------------------------
+
+    def huella_codigo(self):
+        """Templates y manifiesto de estáticos: si cambian, cambian todas las páginas"""
+        sha = hashlib.sha256((self.destino / 'static' / 'staticfiles.json').read_bytes())
+        for directorio in settings.TEMPLATES[0]['DIRS']:
+            for template in sorted(Path(directorio).rglob('*.html')):
+                sha.update(template.read_bytes())
+        return sha.hexdigest()
+
+    def paginas(self):
+        """{url: datos de los que depende la página}, con pocas consultas agregadas"""
+        contenido = {
+            'proyectos': resumen(Proyecto.objects.all()),
+            'imagenes': resumen(ImagenProyecto.objects.all()),
+            'habilidades': resumen(Habilidad.objects.all()),
+            'perfil': resumen(Perfil.objects.all()),
+            'tecnologias': list(Tecnologia.objects.order_by('pk').values_list('pk', 'nombre', 'slug')),
+            'relaciones': resumen(Proyecto.tecnologias.through.objects.all(), fecha=False),
+        }
+        paginas = {
+            # El index lleva la marca del formulario de contacto: se regenera
+            # cada media CONTACTO_MARCA_MAX_EDAD aunque el contenido sea el mismo
+            reverse('index'): {**contenido, 'marca': periodo_marca()},
+            reverse('todos_proyectos'): contenido,
+        }
+
+        # Un modal por proyecto con capturas: depende solo del proyecto y sus imágenes
+        modales = Proyecto.objects.filter(activo=True).order_by().annotate(
+            cantidad=Count('imagenes'), ids=Sum('imagenes__pk'), fecha=Max('imagenes__fecha_actualizacion'),
+        ).filter(cantidad__gt=0).values('pk', 'fecha_actualizacion', 'cantidad', 'ids', 'fecha')
+        for modal in modales:
+            paginas[reverse('proyecto_modal', args=[modal['pk']])] = modal
+        return paginas
+
+    def exportar(self, anterior):
+        codigo = self.huella_codigo()
+        self.fabrica = RequestFactory()
+        self.media_exportada = {}
+
+        actuales = {}
+        generadas = 0
+        for url, datos in self.paginas().items():
+            firma = huella([codigo, datos])
+            previa = anterior.get(url)
+            if previa and previa['firma'] == firma and self.ruta_pagina(url).exists():
+                actuales[url] = previa
+                continue
+
+            html, media = self.exportar_media(self.renderizar(url))
+            ruta = self.ruta_pagina(url)
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(html, encoding='utf-8')
+            comprimir_archivo(ruta)
+            actuales[url] = {'firma': firma, 'media': sorted(media)}
+            generadas += 1
+
+        eliminadas = [url for url in anterior if url not in actuales]
+        for url in eliminadas:
+            self.eliminar_pagina(url)
+
+        en_uso = {nombre for pagina in actuales.values() for nombre in pagina['media']}
+        self.limpiar_media(en_uso)
+        self.guardar_estado(actuales)
+
+        return {
+            'generadas': generadas,
+            'sin_cambios': len(actuales) - generadas,
+            'eliminadas': len(eliminadas),
+            'media': len(en_uso),
+        }
+
+    def ruta_pagina(self, url):
+        return self.destino / url.strip('/') / 'index.html'
+
+    def renderizar(self, url):
+        """Ejecuta la vista de la URL sin pasar por el servidor"""
+        coincidencia = resolve(url)
+        vista = coincidencia.func
+        if iscoroutinefunction(vista):  # VISTAS_ASINCRONAS
+            vista = async_to_sync(vista)
+        respuesta = vista(self.fabrica.get(url), *coincidencia.args, **coincidencia.kwargs)
+        if respuesta.status_code != 200:
+            raise CommandError(f'{url} respondió {respuesta.status_code}')
+        return respuesta.content.decode(respuesta.charset)
+
+    def eliminar_pagina(self, url):
+        ruta = self.ruta_pagina(url)
+        for archivo in (ruta, ruta.with_name(ruta.name + '.gz'), ruta.with_name(ruta.name + '.br')):
+            archivo.unlink(missing_ok=True)
+        # Borra los directorios que quedaron vacíos (proyectos/<id>/modal/)
+        directorio = ruta.parent
+        while directorio != self.destino and not any(directorio.iterdir()):
+            directorio.rmdir()
+            directorio = directorio.parent
+
+    # -------------------------
+    # Media
+    # -------------------------
+
+    def exportar_media(self, html):
+        """Copia los archivos media citados en el HTML con su huella en el nombre y reescribe las URLs"""
+        usados = set()
+
+        def reemplazar(coincidencia):
+            nombre = unquote(coincidencia.group(1))
+            exportado = self.copiar_media(nombre)
+            if exportado is None:
+                return coincidencia.group(0)
+            usados.add(exportado)
+            return settings.MEDIA_URL + quote(exportado)
+
+        patron = re.compile(re.escape(settings.MEDIA_URL) + r'([^\s"\'<>)]+)')
+        return patron.sub(reemplazar, html), usados
+
+    def copiar_media(self, nombre):
+        if nombre not in self.media_exportada:
+            origen = Path(settings.MEDIA_ROOT) / nombre
+            if not origen.is_file():
+                self.stderr.write(f'No existe el archivo media {nombre}, se deja la URL original')
+                self.media_exportada[nombre] = None
+            else:
+                digest = hashlib.sha256(origen.read_bytes()).hexdigest()[:12]
+                ruta = Path(nombre)
+                exportado = str(ruta.with_name(f'{ruta.stem}.{digest}{ruta.suffix}'))
+                destino = self.destino / 'media' / exportado
+                if not destino.exists():
+                    destino.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(origen, destino)
+                    comprimir_archivo(destino)
+                self.media_exportada[nombre] = exportado
+        return self.media_exportada[nombre]
+
+    def limpiar_media(self, en_uso):
+        """Borra los archivos media exportados que ya no cita ninguna página"""
+        raiz = self.destino / 'media'
+        if not raiz.exists():
+            return
+        for archivo in raiz.rglob('*'):
+            if not archivo.is_file():
+                continue
+            nombre = archivo.relative_to(raiz).as_posix()
+            for extension in ('.gz', '.br'):
+                nombre = nombre.removesuffix(extension)
+            if nombre not in en_uso:
+                archivo.unlink()
@@ -0,0 +1,131 @@
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from main.css_critico import elementos_visibles, extraer_css_critico
+
+PARCIAL = Path('partials') / '_css_critico.html'
+ENCABEZADO = (
+    '{% load static %}'
+    '{# Generado por "python manage.py generar_css_critico": no editar a mano #}\n'
+)
+CARGA_DIFERIDA = (
+    '<link rel="preload" as="style" href="{href}" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+)
+
+
+def es_url(fuente):
+    return fuente.startswith(('http://', 'https://', '//'))
+
+
+def href(fuente):
+    return fuente if es_url(fuente) else f"{{% static '{fuente}' %}}"
+
+
+class Command(BaseCommand):
+    help = (
+        'Extrae el CSS que usan la navbar, el hero y las primeras tarjetas de proyectos, '
+        'lo deja en línea en partials/_css_critico.html y carga el resto de las hojas '
+        'de estilo sin bloquear el primer pintado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tarjetas', type=int, default=settings.CSS_CRITICO_TARJETAS,
+            help='Tarjetas de proyecto que se consideran visibles sin hacer scroll'
+        )
+        parser.add_argument(
+            '--salida', default=None,
+            help='Archivo a escribir (por defecto: templates/partials/_css_critico.html)'
+        )
+        parser.add_argument(
+            '--comprobar', action='store_true',
+            help='No escribe nada; termina con error si el archivo está desactualizado'
+        )
+
+    def handle(self, *args, **options):
+        salida = Path(options['salida'] or Path(settings.TEMPLATES[0]['DIRS'][0]) / PARCIAL)
+
+        # base.html incluye el parcial: si no existe, uno con todas las hojas bloqueantes
+        # permite renderizar las páginas para analizarlas
+        por_defecto = Path(settings.TEMPLATES[0]['DIRS'][0]) / PARCIAL
+        if not por_defecto.exists():
+            por_defecto.parent.mkdir(parents=True, exist_ok=True)
+            por_defecto.write_text(
+                self.generar(settings.CSS_CRITICO_FUENTES + settings.CSS_DIFERIDAS, '', []), encoding='utf-8'
+            )
+
+        elementos = []
+        for url in (reverse('index'), reverse('todos_proyectos')):
+            elementos += elementos_visibles(self.renderizar(url), options['tarjetas'])
+
+        procesadas, bloqueantes, criticos = [], [], []
+        for fuente in settings.CSS_CRITICO_FUENTES:
+            css = self.leer(fuente)
+            if css is None:
+                bloqueantes.append(fuente)
+                continue
+            procesadas.append(fuente)
+            criticos.append(extraer_css_critico(css, elementos))
+
+        critico = ''.join(criticos)
+        diferidas = procesadas + list(settings.CSS_DIFERIDAS)
+        contenido = self.generar(bloqueantes, critico, diferidas)
+
+        if options['comprobar']:
+            if not salida.exists() or salida.read_text(encoding='utf-8') != contenido:
+                raise CommandError(f'{salida} está desactualizado: ejecuta generar_css_critico')
+            self.stdout.write(self.style.SUCCESS(f'{salida} está al día.'))
+            return
+
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(contenido, encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f'CSS crítico: {len(critico)} caracteres en línea. '
+            f'Hojas diferidas: {len(diferidas)}, bloqueantes: {len(bloqueantes)}.'
+        ))
+
+    def renderizar(self, url):
+        """Ejecuta la vista de la URL sin pasar por el servidor"""
+        coincidencia = resolve(url)
+        vista = coincidencia.func
+        if iscoroutinefunction(vista):  # VISTAS_ASINCRONAS
+            vista = async_to_sync(vista)
+        respuesta = vista(RequestFactory().get(url), *coincidencia.args, **coincidencia.kwargs)
+        if respuesta.status_code != 200:
+            raise CommandError(f'{url} respondió {respuesta.status_code}')
+        return respuesta.content.decode(respuesta.charset)
+
+    def leer(self, fuente):
+        """Contenido de una hoja de estilo local o remota; None si no se pudo leer"""
+        if es_url(fuente):
+            try:
+                with urlopen(fuente if not fuente.startswith('//') else 'https:' + fuente, timeout=10) as respuesta:
+                    return respuesta.read().decode('utf-8')
+            except (URLError, OSError, UnicodeDecodeError) as error:
+                self.stderr.write(f'No se pudo descargar {fuente} ({error}): se deja como hoja bloqueante')
+                return None
+
+        ruta = finders.find(fuente)
+        if ruta is None:
+            raise CommandError(f'No se encontró el estático {fuente}')
+        return Path(ruta).read_text(encoding='utf-8')
+
+    def generar(self, bloqueantes, critico, diferidas):
+        partes = [ENCABEZADO]
+        # Las que no se pudieron procesar van primero, como antes: su CSS no está en línea
+        partes += [f'<link rel="stylesheet" href="{href(fuente)}">\n' for fuente in bloqueantes]
+        if critico:
+            partes.append(f'<style>{{% verbatim %}}{critico}{{% endverbatim %}}</style>\n')
+        partes += [CARGA_DIFERIDA.format(href=href(fuente)) for fuente in diferidas]
+        if diferidas:
+            enlaces = ''.join(f'<link rel="stylesheet" href="{href(fuente)}">' for fuente in diferidas)
+            partes.append(f'<noscript>{enlaces}</noscript>\n')
+        return ''.join(partes)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from main.cache import incrementar_version
+from main.imagenes import actualizar_variantes
+from main.models import ImagenProyecto, Proyecto
+
+
+class Command(BaseCommand):
+    help = 'Genera las versiones WebP/AVIF redimensionadas de las imágenes existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forzar', action='store_true',
+            help='Regenera también las imágenes que ya tienen variantes'
+        )
+
+    def handle(self, *args, **options):
+        objetivos = (
+            (Proyecto, 'imagen_principal', 'variantes_imagen'),
+            (ImagenProyecto, 'imagen', 'variantes'),
+        )
+        for modelo, campo, campo_variantes in objetivos:
+            total = 0
+            for instancia in modelo.objects.only('pk', campo, campo_variantes).iterator():
+                if options['forzar']:
+                    setattr(instancia, campo_variantes, {})
+                actualizar_variantes(instancia, campo, campo_variantes)
+                total += 1
+            self.stdout.write(f'{modelo._meta.verbose_name_plural}: {total} revisadas')
+        # update() no dispara señales: se invalida la caché a mano
+        incrementar_version()
+        self.stdout.write(self.style.SUCCESS('Variantes generadas'))
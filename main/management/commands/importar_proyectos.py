@@ -0,0 +1,312 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from main.busqueda import indexar_proyectos
+from main.cache import incrementar_version
+from main.imagenes import actualizar_variantes, medir_imagen
+from main.media import borrar_si_huerfano, recontar
+from main.models import ImagenProyecto, Proyecto, TareaImagen, Tecnologia, slug_tecnologia
+
+MANIFIESTOS = ('manifiesto.json', 'manifiesto.yaml', 'manifiesto.yml')
+CAMPOS_OBLIGATORIOS = ('titulo', 'descripcion', 'imagen_principal', 'url_codigo', 'tecnologias')
+CAMPOS_PROYECTO = ('descripcion', 'url_codigo', 'url_demo', 'orden', 'destacado', 'activo')
+
+
+def huella_archivo(abrir):
+    """SHA-256 del contenido, leyendo por bloques"""
+    sha = hashlib.sha256()
+    with abrir() as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def huella_guardada(campo_archivo):
+    """Huella de un archivo ya subido, o None si no existe en el storage"""
+    try:
+        return huella_archivo(lambda: campo_archivo.storage.open(campo_archivo.name, 'rb'))
+    except FileNotFoundError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa proyectos y sus capturas desde un manifiesto JSON/YAML y un directorio de imágenes. '
+        'Se puede volver a ejecutar: los proyectos se buscan por título y las imágenes por su huella.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'ruta',
+            help=f'Archivo de manifiesto, o directorio que contiene {" / ".join(MANIFIESTOS)}'
+        )
+        parser.add_argument(
+            '--media', default=None,
+            help='Directorio base de las imágenes (por defecto: el del manifiesto)'
+        )
+        parser.add_argument(
+            '--hilos', type=int, default=8,
+            help='Copias de archivos en paralelo'
+        )
+
+    def handle(self, *args, **options):
+        manifiesto, directorio = self.ubicar_manifiesto(Path(options['ruta']))
+        directorio = Path(options['media']) if options['media'] else directorio
+        proyectos = self.leer_manifiesto(manifiesto)
+
+        with ThreadPoolExecutor(max_workers=options['hilos']) as hilos:
+            self.ejecutor = hilos
+            resumen = self.importar(proyectos, directorio)
+
+        incrementar_version()
+        self.stdout.write(self.style.SUCCESS(
+            'Proyectos: {creados} creado(s), {actualizados} actualizado(s). '
+            'Capturas: {capturas} nueva(s). Tecnologías reasignadas en {tecnologias} proyecto(s). '
+            'Archivos copiados: {copiados}.'.format(**resumen)
+        ))
+
+    # -------------------------
+    # Lectura del manifiesto
+    # -------------------------
+
+    def ubicar_manifiesto(self, ruta):
+        """Devuelve (archivo de manifiesto, directorio de imágenes)"""
+        if ruta.is_dir():
+            for nombre in MANIFIESTOS:
+                if (ruta / nombre).exists():
+                    return ruta / nombre, ruta
+            raise CommandError(f'No se encontró {" / ".join(MANIFIESTOS)} en {ruta}')
+        if not ruta.exists():
+            raise CommandError(f'No existe {ruta}')
+        return ruta, ruta.parent
+
+    def leer_manifiesto(self, manifiesto):
+        """Carga y valida la lista de proyectos"""
+        with open(manifiesto, encoding='utf-8') as archivo:
+            if manifiesto.suffix in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError:
+                    raise CommandError('Para manifiestos YAML instala PyYAML (pip install pyyaml)')
+                datos = yaml.safe_load(archivo)
+            else:
+                datos = json.load(archivo)
+
+        proyectos = datos.get('proyectos', []) if isinstance(datos, dict) else datos
+        titulos = set()
+        for posicion, proyecto in enumerate(proyectos, start=1):
+            faltantes = [campo for campo in CAMPOS_OBLIGATORIOS if not proyecto.get(campo)]
+            if faltantes:
+                raise CommandError(f'Proyecto #{posicion}: faltan {", ".join(faltantes)}')
+            if proyecto['titulo'] in titulos:
+                raise CommandError(f'Proyecto #{posicion}: título repetido "{proyecto["titulo"]}"')
+            titulos.add(proyecto['titulo'])
+            if isinstance(proyecto['tecnologias'], str):
+                proyecto['tecnologias'] = proyecto['tecnologias'].split(',')
+        return proyectos
+
+    # -------------------------
+    # Archivos
+    # -------------------------
+
+    def huellas_origen(self, proyectos, directorio):
+        """Huella de cada imagen referenciada en el manifiesto (en paralelo)"""
+        rutas = {directorio / proyecto['imagen_principal'] for proyecto in proyectos}
+        rutas |= {
+            directorio / captura['imagen']
+            for proyecto in proyectos
+            for captura in proyecto.get('capturas', [])
+        }
+        for ruta in rutas:
+            if not ruta.is_file():
+                raise CommandError(f'No existe la imagen {ruta}')
+        rutas = sorted(rutas)
+        huellas = self.ejecutor.map(lambda ruta: huella_archivo(lambda: open(ruta, 'rb')), rutas)
+        return dict(zip(rutas, huellas))
+
+    def copiar(self, ruta, campo):
+        """Sube un archivo al storage del campo; devuelve el nombre guardado y sus medidas"""
+        with open(ruta, 'rb') as archivo:
+            nombre = campo.generate_filename(None, ruta.name)
+            medidas = medir_imagen(archivo)
+            return campo.storage.save(nombre, File(archivo), max_length=campo.max_length), medidas
+
+    # -------------------------
+    # Importación
+    # -------------------------
+
+    def importar(self, proyectos, directorio):
+        huellas = self.huellas_origen(proyectos, directorio)
+        existentes = {
+            proyecto.titulo: proyecto
+            for proyecto in Proyecto.objects.filter(
+                titulo__in=[datos['titulo'] for datos in proyectos]
+            ).prefetch_related('imagenes', 'tecnologias')
+        }
+
+        # Huellas de lo que ya está subido, para no repetir imágenes
+        guardadas = list(existentes.values()) + [
+            imagen for proyecto in existentes.values() for imagen in proyecto.imagenes.all()
+        ]
+        huellas_guardadas = dict(zip(
+            [(type(obj), obj.pk) for obj in guardadas],
+            self.ejecutor.map(
+                lambda obj: huella_guardada(obj.imagen_principal if isinstance(obj, Proyecto) else obj.imagen),
+                guardadas
+            )
+        ))
+
+        campo_principal = Proyecto._meta.get_field('imagen_principal')
+        campo_captura = ImagenProyecto._meta.get_field('imagen')
+        copias = {}
+
+        def copiar_una_vez(ruta, campo):
+            # Una misma imagen usada en varios lugares se copia una sola vez
+            clave = (ruta, campo.name)
+            if clave not in copias:
+                copias[clave] = self.ejecutor.submit(self.copiar, ruta, campo)
+            return copias[clave]
+
+        # Todas las tecnologías del manifiesto en una sola pasada
+        tecnologias = {
+            tecnologia.slug: tecnologia
+            for tecnologia in Tecnologia.desde_nombres(
+                nombre for datos in proyectos for nombre in datos['tecnologias']
+            )
+        }
+
+        nuevos, actualizados, capturas, asignaciones = [], [], [], []
+        for datos in proyectos:
+            ruta_principal = directorio / datos['imagen_principal']
+            proyecto = existentes.get(datos['titulo'])
+
+            if proyecto is None:
+                proyecto = Proyecto(titulo=datos['titulo'])
+                nuevos.append(proyecto)
+                huellas_actuales = set()
+                cambios = True
+            else:
+                huellas_actuales = {
+                    huellas_guardadas[(ImagenProyecto, imagen.pk)] for imagen in proyecto.imagenes.all()
+                }
+                cambios = False
+
+            for campo in CAMPOS_PROYECTO:
+                if campo in datos and getattr(proyecto, campo) != datos[campo]:
+                    setattr(proyecto, campo, datos[campo])
+                    cambios = True
+
+            if huellas_guardadas.get((Proyecto, proyecto.pk)) != huellas[ruta_principal]:
+                proyecto._copia_principal = copiar_una_vez(ruta_principal, campo_principal)
+                cambios = True
+
+            if cambios and proyecto.pk:
+                actualizados.append(proyecto)
+
+            deseadas = {slug_tecnologia(nombre) for nombre in datos['tecnologias'] if nombre.strip()}
+            actuales = {tecnologia.slug for tecnologia in proyecto.tecnologias.all()} if proyecto.pk else set()
+            if deseadas != actuales:
+                asignaciones.append((proyecto, [tecnologias[slug] for slug in deseadas]))
+
+            for orden, captura in enumerate(datos.get('capturas', [])):
+                ruta = directorio / captura['imagen']
+                if huellas[ruta] in huellas_actuales:
+                    continue
+                huellas_actuales.add(huellas[ruta])
+                capturas.append((proyecto, ImagenProyecto(
+                    descripcion=captura.get('descripcion', ''),
+                    orden=captura.get('orden', orden),
+                ), copiar_una_vez(ruta, campo_captura)))
+
+        try:
+            # Espera a que terminen las copias antes de tocar la base de datos
+            media = set()
+            for proyecto in nuevos + actualizados:
+                if hasattr(proyecto, '_copia_principal'):
+                    media.add(proyecto.imagen_principal.name)
+                    proyecto.imagen_principal, medidas = proyecto._copia_principal.result()
+                    campo_principal.asignar_medidas(proyecto, medidas)
+                    media.add(proyecto.imagen_principal.name)
+            for _, imagen, copia in capturas:
+                imagen.imagen, medidas = copia.result()
+                campo_captura.asignar_medidas(imagen, medidas)
+                media.add(imagen.imagen.name)
+
+            with transaction.atomic():
+                Proyecto.objects.bulk_create(nuevos)
+                if actualizados:
+                    # bulk_update no aplica auto_now: la fecha se asigna a mano
+                    ahora = timezone.now()
+                    for proyecto in actualizados:
+                        proyecto.fecha_actualizacion = ahora
+                    Proyecto.objects.bulk_update(
+                        actualizados,
+                        ('imagen_principal', 'imagen_ancho', 'imagen_alto', 'imagen_lqip', 'fecha_actualizacion')
+                        + CAMPOS_PROYECTO
+                    )
+                for proyecto, imagen, _ in capturas:
+                    imagen.proyecto = proyecto
+                imagenes = ImagenProyecto.objects.bulk_create([imagen for _, imagen, _ in capturas])
+                self.asignar_tecnologias(asignaciones)
+                # bulk_create/bulk_update no pasan por las señales que mantienen el índice
+                # (tampoco las de m2m: un cambio solo de tecnologías también reindexa)
+                indexar_proyectos(
+                    {proyecto.pk for proyecto in nuevos + actualizados}
+                    | {proyecto.pk for proyecto, _ in asignaciones}
+                )
+                # Ni las referencias de la media por contenido
+                recontar(media)
+                self.programar_variantes(
+                    [p for p in nuevos + actualizados if hasattr(p, '_copia_principal')] + imagenes
+                )
+        except BaseException:
+            # Lo ya copiado quedaría en media sin filas que lo usen ni referencias
+            self.borrar_copias(copias)
+            raise
+
+        return {
+            'creados': len(nuevos),
+            'actualizados': len(actualizados),
+            'capturas': len(capturas),
+            'tecnologias': len(asignaciones),
+            'copiados': len(copias),
+        }
+
+    def borrar_copias(self, copias):
+        """Tras un error, borra los archivos copiados que ninguna fila usa (con sus variantes)"""
+        for copia in copias.values():
+            if not copia.cancelled() and copia.exception() is None:
+                nombre, _ = copia.result()
+                borrar_si_huerfano(nombre)
+
+    def asignar_tecnologias(self, asignaciones):
+        """Reemplaza las tecnologías de varios proyectos con dos consultas"""
+        if not asignaciones:
+            return
+        Relacion = Proyecto.tecnologias.through
+        Relacion.objects.filter(proyecto__in=[proyecto for proyecto, _ in asignaciones]).delete()
+        Relacion.objects.bulk_create([
+            Relacion(proyecto=proyecto, tecnologia=tecnologia)
+            for proyecto, lista in asignaciones
+            for tecnologia in lista
+        ])
+
+    def programar_variantes(self, instancias):
+        """bulk_create no dispara señales: se encolan las variantes a mano"""
+        if not settings.IMAGENES_EN_SEGUNDO_PLANO:
+            for instancia in instancias:
+                for campo, campo_variantes in instancia.CAMPOS_VARIANTES:
+                    actualizar_variantes(instancia, campo, campo_variantes)
+            return
+        TareaImagen.objects.bulk_create([
+            TareaImagen(modelo=instancia._meta.model_name, objeto_id=instancia.pk)
+            for instancia in instancias
+        ])
@@ -0,0 +1,64 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from main.cache import incrementar_version
+from main.tareas import inicializar_proceso, procesar_lote, reclamar_tareas, recuperar_tareas_colgadas
+
+
+class Command(BaseCommand):
+    help = 'Worker que procesa la cola de imágenes (variantes WebP/AVIF) con un pool de procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos', type=int, default=os.cpu_count() or 1,
+            help='Procesos en paralelo para Pillow (0 = en este mismo proceso)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=None,
+            help='Tareas que se reclaman por vuelta (por defecto: 4 por proceso)'
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Procesa lo pendiente y termina en vez de quedar escuchando'
+        )
+
+    def handle(self, *args, **options):
+        procesos = options['procesos']
+        lote = options['lote'] or max(procesos, 1) * 4
+
+        # Los procesos hijos no deben heredar conexiones abiertas
+        connections.close_all()
+        ejecutor = None
+        if procesos > 0:
+            ejecutor = ProcessPoolExecutor(max_workers=procesos, initializer=inicializar_proceso)
+
+        self.stdout.write(f'Procesando imágenes con {procesos or "ningún"} proceso(s) auxiliar(es)')
+        try:
+            while True:
+                recuperar_tareas_colgadas()
+                tareas = reclamar_tareas(lote)
+                if not tareas:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                completadas = procesar_lote(tareas, ejecutor)
+                if completadas:
+                    # aplicar_variantes usa update(): se invalida la caché a mano. La
+                    # versión vive en CACHES, compartida con el sitio (ver main.checks)
+                    incrementar_version()
+                self.stdout.write(f'{completadas}/{len(tareas)} tarea(s) completada(s)')
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
+        finally:
+            if ejecutor is not None:
+                ejecutor.shutdown()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.busqueda import backend, reindexar
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de búsqueda de proyectos (tras cargas con bulk_create o SQL directo, '
+        'o al cambiar BUSQUEDA_CONFIGURACION)'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = reindexar()
+        self.stdout.write(self.style.SUCCESS(f'{total} proyecto(s) indexados ({backend().nombre})'))
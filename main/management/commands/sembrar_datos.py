@@ -0,0 +1,135 @@
+import io
+import random
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from PIL import Image
+
+from main.busqueda import indexar_proyectos
+from main.cache import incrementar_version
+from main.models import Contacto, Habilidad, ImagenProyecto, Perfil, Proyecto, Tecnologia
+
+# Marcas para reconocer (y borrar con --limpiar) solo lo que sembró este comando
+PREFIJO = 'Benchmark'
+DOMINIO_CONTACTOS = 'benchmark.invalid'
+IMAGEN = 'proyectos/benchmark.png'
+
+TECNOLOGIAS = (
+    'Python', 'Django', 'Flask', 'FastAPI', 'PostgreSQL', 'SQLite', 'Redis', 'Celery', 'Docker',
+    'JavaScript', 'TypeScript', 'React', 'Vue', 'Bootstrap', 'HTML', 'CSS', 'Sass', 'Git', 'Linux', 'Nginx',
+)
+PALABRAS = (
+    'aplicación web para gestionar inventario con reportes y panel de administración '
+    'api rest autenticación usuarios roles permisos búsqueda filtros carrito pagos '
+    'dashboard gráficos exportación csv notificaciones tiempo real despliegue contenedores'
+).split()
+
+
+def texto(rng, palabras):
+    return ' '.join(rng.choice(PALABRAS) for _ in range(palabras)).capitalize() + '.'
+
+
+def imagen_compartida():
+    """Una sola imagen real para todas las filas: los templates leen su URL, no el archivo"""
+    if not default_storage.exists(IMAGEN):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 750), (168, 0, 0)).save(buffer, 'PNG')
+        default_storage.save(IMAGEN, ContentFile(buffer.getvalue()))
+    return IMAGEN
+
+
+def limpiar():
+    """Borra lo sembrado antes (las capturas caen en cascada con su proyecto)"""
+    return {
+        'proyectos': Proyecto.objects.filter(titulo__startswith=f'{PREFIJO} ').delete()[1].get('main.Proyecto', 0),
+        'habilidades': Habilidad.objects.filter(nombre__startswith=f'{PREFIJO} ').delete()[0],
+        'contactos': Contacto.objects.filter(email__endswith=f'@{DOMINIO_CONTACTOS}').delete()[1].get('main.Contacto', 0),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Llena la base con datos de prueba para medir rendimiento (ver el comando benchmark). '
+        'Los datos quedan marcados y --limpiar los borra sin tocar el resto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyectos', type=int, default=100)
+        parser.add_argument('--capturas', type=int, default=3, help='Capturas (ImagenProyecto) por proyecto')
+        parser.add_argument('--habilidades', type=int, default=30)
+        parser.add_argument('--contactos', type=int, default=5000)
+        parser.add_argument('--destacados', type=float, default=0.1, help='Fracción de proyectos destacados')
+        parser.add_argument('--semilla', type=int, default=1, help='Semilla aleatoria (mismos datos en cada corrida)')
+        parser.add_argument('--limpiar', action='store_true', help='Borra lo sembrado antes de sembrar de nuevo')
+
+    def handle(self, *args, **options):
+        cantidades = ('proyectos', 'capturas', 'habilidades', 'contactos')
+        if any(options[nombre] < 0 for nombre in cantidades):
+            raise CommandError('Las cantidades no pueden ser negativas')
+
+        rng = random.Random(options['semilla'])
+        imagen = imagen_compartida()
+
+        # bulk_create no dispara señales: no se encolan variantes ni avisos de contacto
+        with transaction.atomic():
+            if options['limpiar']:
+                borrados = limpiar()
+                self.stdout.write('Borrado: ' + ', '.join(f'{n} {modelo}' for modelo, n in borrados.items()))
+            if not Perfil.objects.exists():
+                Perfil.objects.create(descripcion=texto(rng, 30))
+            proyectos = self.sembrar_proyectos(rng, options, imagen)
+            capturas = self.sembrar_capturas(rng, proyectos, options['capturas'], imagen)
+            habilidades = Habilidad.objects.bulk_create([
+                Habilidad(
+                    nombre=f'{PREFIJO} {i:05d}', tipo=rng.choice(('tecnica', 'personal')),
+                    icono='fas fa-star', orden=rng.randint(0, 20),
+                )
+                for i in range(options['habilidades'])
+            ], batch_size=500)
+            contactos = Contacto.objects.bulk_create([
+                Contacto(
+                    nombre=f'{PREFIJO} {i}', email=f'persona{i}@{DOMINIO_CONTACTOS}',
+                    mensaje=texto(rng, rng.randint(10, 80)), leido=rng.random() < 0.7,
+                )
+                for i in range(options['contactos'])
+            ], batch_size=1000)
+
+        incrementar_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Sembrado: {len(proyectos)} proyecto(s), {capturas} captura(s), '
+            f'{len(habilidades)} habilidad(es), {len(contactos)} mensaje(s) de contacto'
+        ))
+
+    def sembrar_proyectos(self, rng, options, imagen):
+        tecnologias = Tecnologia.desde_nombres(TECNOLOGIAS)
+        inicio = Proyecto.objects.filter(titulo__startswith=f'{PREFIJO} ').count()
+        proyectos = Proyecto.objects.bulk_create([
+            Proyecto(
+                titulo=f'{PREFIJO} {inicio + i:05d}', descripcion=texto(rng, rng.randint(20, 60)),
+                imagen_principal=imagen, url_codigo=f'https://github.com/too0oori/benchmark-{inicio + i}',
+                url_demo=f'https://benchmark-{inicio + i}.example.com' if rng.random() < 0.5 else None,
+                orden=rng.randint(0, 9), destacado=rng.random() < options['destacados'],
+            )
+            for i in range(options['proyectos'])
+        ], batch_size=500)
+
+        Relacion = Proyecto.tecnologias.through
+        Relacion.objects.bulk_create([
+            Relacion(proyecto_id=proyecto.pk, tecnologia_id=tecnologia.pk)
+            for proyecto in proyectos
+            for tecnologia in rng.sample(tecnologias, rng.randint(2, 5))
+        ], batch_size=1000)
+        # Sin señales tampoco se indexan para la búsqueda
+        indexar_proyectos(proyecto.pk for proyecto in proyectos)
+        return proyectos
+
+    def sembrar_capturas(self, rng, proyectos, por_proyecto, imagen):
+        capturas = ImagenProyecto.objects.bulk_create([
+            ImagenProyecto(proyecto=proyecto, imagen=imagen, descripcion=texto(rng, 5), orden=orden)
+            for proyecto in proyectos
+            for orden in range(por_proyecto)
+        ], batch_size=1000)
+        return len(capturas)
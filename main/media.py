@@ -0,0 +1,81 @@
+import posixpath
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ArchivoMedia, ImagenProyecto, Perfil, Proyecto
+from .storage import media_por_contenido
+
+# (modelo, campo de imagen, campo con su registro de variantes o None)
+CAMPOS_MEDIA = (
+    (Proyecto, 'imagen_principal', 'variantes_imagen'),
+    (ImagenProyecto, 'imagen', 'variantes'),
+    (Perfil, 'ilustracion_contacto', None),
+)
+
+
+def contar_referencias(nombres):
+    """{nombre: filas que lo usan}, sumando todos los campos de CAMPOS_MEDIA"""
+    conteo = dict.fromkeys(nombres, 0)
+    for modelo, campo, _ in CAMPOS_MEDIA:
+        filas = (
+            modelo.objects.filter(**{f'{campo}__in': list(conteo)})
+            .values(campo).annotate(filas=Count('pk')).order_by()
+        )
+        for fila in filas:
+            conteo[fila[campo]] += fila['filas']
+    return conteo
+
+
+def archivos_derivados(storage, nombre):
+    """Variantes generadas a partir de un original (comparten su nombre como prefijo)"""
+    carpeta, archivo = posixpath.split(nombre)
+    base = posixpath.splitext(archivo)[0]
+    try:
+        _, archivos = storage.listdir(carpeta)
+    except FileNotFoundError:
+        return []
+    return [posixpath.join(carpeta, otro) for otro in archivos if otro.startswith(f'{base}-')]
+
+
+def borrar_si_huerfano(nombre):
+    """Borra un archivo por contenido y sus variantes si ninguna fila lo usa"""
+    # Se vuelve a contar: entre el recuento y el commit alguien pudo subir lo mismo
+    if contar_referencias([nombre])[nombre]:
+        return False
+    storage = media_por_contenido()
+    for derivado in archivos_derivados(storage, nombre):
+        storage.delete(derivado)
+    storage.delete(nombre)
+    return True
+
+
+def _tamano(storage, nombre):
+    try:
+        return storage.size(nombre)
+    except FileNotFoundError:
+        # Una fila que apunta a un archivo perdido no debe impedir guardarla
+        return 0
+
+
+def recontar(nombres):
+    """
+    Actualiza las referencias de los archivos por contenido dados (los demás
+    nombres se ignoran). Los que quedan sin uso se borran, con sus variantes,
+    recién al confirmar la transacción.
+    """
+    storage = media_por_contenido()
+    nombres = {nombre for nombre in nombres if storage.es_por_contenido(nombre)}
+    if not nombres:
+        return
+    for nombre, referencias in contar_referencias(nombres).items():
+        if referencias:
+            ArchivoMedia.objects.update_or_create(
+                nombre=nombre,
+                defaults={'referencias': referencias},
+                create_defaults={'referencias': referencias, 'tamano': _tamano(storage, nombre)},
+            )
+        else:
+            ArchivoMedia.objects.filter(nombre=nombre).delete()
+            transaction.on_commit(partial(borrar_si_huerfano, nombre))
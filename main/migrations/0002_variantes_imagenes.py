@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagenproyecto',
+            name='variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versiones WebP/AVIF redimensionadas'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='variantes_imagen',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versiones WebP/AVIF redimensionadas'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_variantes_imagenes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaImagen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(help_text='Nombre del modelo: proyecto o imagenproyecto', max_length=50)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now, help_text='No se procesa antes de esta fecha (reintentos)')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea de Imagen',
+                'verbose_name_plural': 'Tareas de Imágenes',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'disponible_desde'], name='tarea_imagen_cola_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_tarea_imagen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tecnologia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50)),
+                ('slug', models.SlugField(help_text='Se usa en el filtro /proyectos/?tech=', max_length=60, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Tecnología',
+                'verbose_name_plural': 'Tecnologías',
+                'ordering': ['nombre'],
+            },
+        ),
+        # El texto original se conserva hasta copiarlo a la nueva relación
+        migrations.RenameField(
+            model_name='proyecto',
+            old_name='tecnologias',
+            new_name='tecnologias_texto',
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='tecnologias',
+            field=models.ManyToManyField(blank=True, related_name='proyectos', to='main.tecnologia'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def slug_tecnologia(nombre):
+    """Copia de main.models.slug_tecnologia (las migraciones no usan el código del modelo)"""
+    return slugify(nombre.replace('+', ' plus ').replace('#', ' sharp '))
+
+
+def texto_a_relacion(apps, schema_editor):
+    """Convierte 'Python, Django, Bootstrap' en filas de Tecnologia"""
+    Proyecto = apps.get_model('main', 'Proyecto')
+    Tecnologia = apps.get_model('main', 'Tecnologia')
+    Relacion = Proyecto.tecnologias.through
+
+    tecnologias = {}
+    relaciones = []
+    for proyecto in Proyecto.objects.only('pk', 'tecnologias_texto'):
+        slugs = []
+        for nombre in proyecto.tecnologias_texto.split(','):
+            nombre = nombre.strip()
+            slug = slug_tecnologia(nombre)
+            if not slug or slug in slugs:
+                continue
+            if slug not in tecnologias:
+                tecnologias[slug] = Tecnologia.objects.create(nombre=nombre, slug=slug)
+            slugs.append(slug)
+            relaciones.append(Relacion(proyecto_id=proyecto.pk, tecnologia_id=tecnologias[slug].pk))
+    Relacion.objects.bulk_create(relaciones)
+
+
+def relacion_a_texto(apps, schema_editor):
+    """Vuelve a escribir las tecnologías como texto separado por comas"""
+    Proyecto = apps.get_model('main', 'Proyecto')
+    for proyecto in Proyecto.objects.prefetch_related('tecnologias'):
+        proyecto.tecnologias_texto = ', '.join(t.nombre for t in proyecto.tecnologias.all())
+        proyecto.save(update_fields=['tecnologias_texto'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_tecnologia'),
+    ]
+
+    operations = [
+        migrations.RunPython(texto_a_relacion, relacion_a_texto),
+    ]
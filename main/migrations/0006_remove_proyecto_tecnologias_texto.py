@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_migrar_tecnologias'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='proyecto',
+            name='tecnologias_texto',
+            field=models.CharField(blank=True, default='', max_length=300),
+        ),
+        migrations.RemoveField(
+            model_name='proyecto',
+            name='tecnologias_texto',
+        ),
+    ]
@@ -0,0 +1,28 @@
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_remove_proyecto_tecnologias_texto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='habilidad',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['tipo', 'orden'], name='habilidad_publica_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagenproyecto',
+            index=models.Index(fields=['proyecto', 'orden'], name='imagen_proyecto_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(condition=models.Q(('activo', True), ('destacado', True)), fields=['orden', '-fecha_creacion'], name='proyecto_destacado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(condition=models.Q(('activo', True), ('destacado', False)), fields=['orden', '-fecha_creacion'], name='proyecto_otros_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_indices_publicos'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='proyecto',
+            name='proyecto_destacado_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='proyecto',
+            name='proyecto_otros_idx',
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(condition=models.Q(('activo', True), ('destacado', True)), fields=['orden', '-fecha_creacion', 'id'], name='proyecto_destacado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(condition=models.Q(('activo', True), ('destacado', False)), fields=['orden', '-fecha_creacion', 'id'], name='proyecto_otros_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_fecha_actualizacion_precisa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionContacto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('enviada', 'Enviada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now, help_text='No se envía antes de esta fecha (reintentos)')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('contacto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notificacion', to='main.contacto')),
+            ],
+            options={
+                'verbose_name': 'Notificación de Contacto',
+                'verbose_name_plural': 'Notificaciones de Contacto',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'disponible_desde'], name='notificacion_cola_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Índice de texto completo de los proyectos (ver main.busqueda). Depende de la
+# base, por eso no es un campo del modelo: en PostgreSQL una columna tsvector
+# con índice GIN, en SQLite una tabla FTS5; otras bases buscan sin índice.
+
+POSTGRES_CREAR = [
+    'ALTER TABLE main_proyecto ADD COLUMN vector_busqueda tsvector',
+    'CREATE INDEX proyecto_busqueda_idx ON main_proyecto USING GIN (vector_busqueda)',
+    """
+    UPDATE main_proyecto p SET vector_busqueda =
+        setweight(to_tsvector('spanish', p.titulo), 'A') ||
+        setweight(to_tsvector('spanish', coalesce((
+            SELECT string_agg(t.nombre, ' ') FROM main_proyecto_tecnologias r
+            JOIN main_tecnologia t ON t.id = r.tecnologia_id WHERE r.proyecto_id = p.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('spanish', p.descripcion), 'C')
+    """,
+]
+POSTGRES_BORRAR = [
+    'DROP INDEX IF EXISTS proyecto_busqueda_idx',
+    'ALTER TABLE main_proyecto DROP COLUMN IF EXISTS vector_busqueda',
+]
+
+SQLITE_CREAR = [
+    """
+    CREATE VIRTUAL TABLE main_proyecto_busqueda USING fts5(
+        titulo, tecnologias, descripcion, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO main_proyecto_busqueda (rowid, titulo, tecnologias, descripcion)
+    SELECT p.id, p.titulo, coalesce((
+        SELECT group_concat(t.nombre, ' ') FROM main_proyecto_tecnologias r
+        JOIN main_tecnologia t ON t.id = r.tecnologia_id WHERE r.proyecto_id = p.id
+    ), ''), p.descripcion
+    FROM main_proyecto p
+    """,
+]
+SQLITE_BORRAR = [
+    'DROP TABLE IF EXISTS main_proyecto_busqueda',
+]
+
+
+def sqlite_con_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def ejecutar(sentencias_postgres, sentencias_sqlite):
+    def operacion(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            sentencias = sentencias_postgres
+        elif vendor == 'sqlite' and sqlite_con_fts5(schema_editor):
+            sentencias = sentencias_sqlite
+        else:
+            return
+        for sentencia in sentencias:
+            schema_editor.execute(sentencia)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_notificacion_contacto'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            ejecutar(POSTGRES_CREAR, SQLITE_CREAR),
+            ejecutar(POSTGRES_BORRAR, SQLITE_BORRAR),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_busqueda_proyectos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Mismo id que tenía en Contacto', primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('mensaje_comprimido', models.BinaryField()),
+                ('fecha_envio', models.DateTimeField()),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Mensaje Archivado',
+                'verbose_name_plural': 'Mensajes Archivados',
+                'ordering': ['-fecha_envio'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contacto',
+            index=models.Index(fields=['-fecha_envio', '-id'], name='contacto_bandeja_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacto',
+            index=models.Index(condition=models.Q(('leido', False)), fields=['-fecha_envio', '-id'], name='contacto_no_leidos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactoarchivado',
+            index=models.Index(fields=['-fecha_envio', '-id'], name='archivado_fecha_idx'),
+        ),
+    ]
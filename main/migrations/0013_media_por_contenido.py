@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:48
+
+import main.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_contactos_bandeja_archivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivoMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, unique=True)),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('tamano', models.PositiveBigIntegerField(default=0, help_text='Bytes')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Archivo de Media',
+                'verbose_name_plural': 'Archivos de Media',
+                'ordering': ['-referencias', 'nombre'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='imagenproyecto',
+            name='imagen',
+            field=models.ImageField(storage=main.storage.media_por_contenido, upload_to='proyectos/capturas/'),
+        ),
+        migrations.AlterField(
+            model_name='perfil',
+            name='ilustracion_contacto',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.media_por_contenido, upload_to='perfil/'),
+        ),
+        migrations.AlterField(
+            model_name='proyecto',
+            name='imagen_principal',
+            field=models.ImageField(help_text='Imagen principal del proyecto', storage=main.storage.media_por_contenido, upload_to='proyectos/'),
+        ),
+    ]
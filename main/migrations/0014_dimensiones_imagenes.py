@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:56
+
+import main.models
+import main.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_media_por_contenido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagenproyecto',
+            name='alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='imagenproyecto',
+            name='ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='imagenproyecto',
+            name='lqip',
+            field=models.TextField(blank=True, editable=False, help_text='Miniatura borrosa (data URI) mientras carga'),
+        ),
+        migrations.AddField(
+            model_name='perfil',
+            name='ilustracion_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='perfil',
+            name='ilustracion_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='perfil',
+            name='ilustracion_lqip',
+            field=models.TextField(blank=True, editable=False, help_text='Miniatura borrosa (data URI) mientras carga'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_lqip',
+            field=models.TextField(blank=True, editable=False, help_text='Miniatura borrosa (data URI) mientras carga'),
+        ),
+        migrations.AlterField(
+            model_name='imagenproyecto',
+            name='imagen',
+            field=main.models.ImagenMedida(campo_lqip='lqip', height_field='alto', storage=main.storage.media_por_contenido, upload_to='proyectos/capturas/', width_field='ancho'),
+        ),
+        migrations.AlterField(
+            model_name='perfil',
+            name='ilustracion_contacto',
+            field=main.models.ImagenMedida(blank=True, campo_lqip='ilustracion_lqip', height_field='ilustracion_alto', null=True, storage=main.storage.media_por_contenido, upload_to='perfil/', width_field='ilustracion_ancho'),
+        ),
+        migrations.AlterField(
+            model_name='proyecto',
+            name='imagen_principal',
+            field=main.models.ImagenMedida(campo_lqip='imagen_lqip', height_field='imagen_alto', help_text='Imagen principal del proyecto', storage=main.storage.media_por_contenido, upload_to='proyectos/', width_field='imagen_ancho'),
+        ),
+    ]
@@ -1,5 +1,50 @@
+import zlib
+
 from django.db import models
 from django.core.validators import URLValidator
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .imagenes import fuentes, medir_imagen
+from .storage import media_por_contenido
+
+
+class ImagenMedida(models.ImageField):
+    """
+    ImageField que guarda ancho, alto (width_field/height_field) y una miniatura
+    borrosa (campo_lqip) al subir la imagen. A diferencia de ImageField, no abre
+    el archivo al cargar o refrescar una fila: las medidas se leen de la base.
+    """
+    
+    def __init__(self, *args, campo_lqip=None, **kwargs):
+        self.campo_lqip = campo_lqip
+        super().__init__(*args, **kwargs)
+    
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.campo_lqip:
+            kwargs['campo_lqip'] = self.campo_lqip
+        return name, path, args, kwargs
+    
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        # Solo con un archivo recién subido (todavía sin guardar) o al quitarlo;
+        # un nombre ya guardado conserva las medidas que tiene la fila
+        if self.attname not in instance.__dict__:
+            return
+        archivo = getattr(instance, self.attname)
+        if archivo and not archivo._committed:
+            self.asignar_medidas(instance, medir_imagen(archivo))
+        elif not archivo and force:
+            self.asignar_medidas(instance, None)
+    
+    def asignar_medidas(self, instance, medidas):
+        """Copia (ancho, alto, lqip) de medir_imagen a los campos de la fila"""
+        ancho, alto, lqip = medidas or (None, None, '')
+        setattr(instance, self.width_field, ancho)
+        setattr(instance, self.height_field, alto)
+        if self.campo_lqip:
+            setattr(instance, self.campo_lqip, lqip)
+
 
 class Habilidad(models.Model):
     """Modelo para habilidades técnicas y personales"""
@@ -13,63 +58,159 @@ class Habilidad(models.Model):
     icono = models.CharField(max_length=50, blank=True, help_text="Clase de Font Awesome o símbolo")
     orden = models.IntegerField(default=0, help_text="Orden de aparición")
     activo = models.BooleanField(default=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Habilidad"
         verbose_name_plural = "Habilidades"
         ordering = ['tipo', 'orden']
+        indexes = [
+            # Sección de habilidades: filter(tipo=..., activo=True) ordenado por orden
+            models.Index(
+                fields=['tipo', 'orden'], condition=models.Q(activo=True), name='habilidad_publica_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_display()})"
 
 
+def slug_tecnologia(nombre):
+    """Slug estable para una tecnología (C++ y C# no deben quedar como 'c')"""
+    return slugify(nombre.replace('+', ' plus ').replace('#', ' sharp '))
+
+
+class Tecnologia(models.Model):
+    """Tecnología usada en uno o más proyectos"""
+    nombre = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=60, unique=True, help_text="Se usa en el filtro /proyectos/?tech=")
+    
+    class Meta:
+        verbose_name = "Tecnología"
+        verbose_name_plural = "Tecnologías"
+        ordering = ['nombre']
+    
+    def __str__(self):
+        return self.nombre
+    
+    def save(self, *args, **kwargs):
+        """Genera el slug a partir del nombre"""
+        if not self.slug:
+            self.slug = slug_tecnologia(self.nombre)
+        return super().save(*args, **kwargs)
+    
+    @classmethod
+    def desde_nombres(cls, nombres):
+        """Obtiene (o crea) las tecnologías de una lista de nombres, sin repetir"""
+        por_slug = {}
+        for nombre in nombres:
+            nombre = nombre.strip()
+            if nombre:
+                por_slug.setdefault(slug_tecnologia(nombre), nombre)
+        
+        existentes = {t.slug: t for t in cls.objects.filter(slug__in=por_slug)}
+        nuevas = [cls(nombre=nombre, slug=slug) for slug, nombre in por_slug.items() if slug not in existentes]
+        cls.objects.bulk_create(nuevas, ignore_conflicts=True)
+        if nuevas:
+            existentes = {t.slug: t for t in cls.objects.filter(slug__in=por_slug)}
+        return [existentes[slug] for slug in por_slug]
+
+
 class Proyecto(models.Model):
     """Modelo para proyectos del portafolio"""
     titulo = models.CharField(max_length=200)
     descripcion = models.TextField()
-    imagen_principal = models.ImageField(upload_to='proyectos/', help_text="Imagen principal del proyecto")
+    imagen_principal = ImagenMedida(
+        upload_to='proyectos/', storage=media_por_contenido, help_text="Imagen principal del proyecto",
+        width_field='imagen_ancho', height_field='imagen_alto', campo_lqip='imagen_lqip',
+    )
+    imagen_ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    imagen_alto = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    imagen_lqip = models.TextField(blank=True, editable=False, help_text="Miniatura borrosa (data URI) mientras carga")
+    variantes_imagen = models.JSONField(default=dict, blank=True, editable=False, help_text="Versiones WebP/AVIF redimensionadas")
     
     # URLs
     url_codigo = models.URLField(validators=[URLValidator()], help_text="Link a GitHub")
     url_demo = models.URLField(blank=True, null=True, help_text="Link al sitio desplegado (opcional)")
     
     # Tecnologías
-    tecnologias = models.CharField(max_length=300, help_text="Separadas por coma: Python, Django, Bootstrap")
+    tecnologias = models.ManyToManyField(Tecnologia, related_name='proyectos', blank=True)
     
     # Metadata
     orden = models.IntegerField(default=0, help_text="Orden de aparición (menor = primero)")
     destacado = models.BooleanField(default=False, help_text="Mostrar en la sección principal")
     activo = models.BooleanField(default=True)
     fecha_creacion = models.DateField(auto_now_add=True)
-    fecha_actualizacion = models.DateField(auto_now=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    # Pares (imagen, registro de variantes) que procesa main.tareas
+    CAMPOS_VARIANTES = [('imagen_principal', 'variantes_imagen')]
     
     class Meta:
         verbose_name = "Proyecto"
         verbose_name_plural = "Proyectos"
         ordering = ['orden', '-fecha_creacion']
+        indexes = [
+            # Vistas públicas: filter(activo=True, destacado=...) con el orden por defecto
+            # (más el id, que desempata en la paginación por cursor).
+            # Un índice parcial por sección, porque los booleanos se filtran sin "= 1"
+            # y el motor no los puede usar como columna de búsqueda
+            models.Index(
+                fields=['orden', '-fecha_creacion', 'id'],
+                condition=models.Q(activo=True, destacado=True),
+                name='proyecto_destacado_idx'
+            ),
+            models.Index(
+                fields=['orden', '-fecha_creacion', 'id'],
+                condition=models.Q(activo=True, destacado=False),
+                name='proyecto_otros_idx'
+            ),
+        ]
     
     def __str__(self):
         return self.titulo
     
     def get_tecnologias_list(self):
-        """Retorna lista de tecnologías para el template"""
-        return [tech.strip() for tech in self.tecnologias.split(',')]
+        """Retorna lista de tecnologías para el template (usa el prefetch si existe)"""
+        return sorted(self.tecnologias.all(), key=lambda tecnologia: tecnologia.nombre.lower())
+    
+    def fuentes_imagen_principal(self):
+        """Fuentes con srcset para el <picture> de la imagen principal"""
+        return fuentes(self.variantes_imagen, self.imagen_principal.storage)
 
 
 class ImagenProyecto(models.Model):
     """Imágenes adicionales para el carrusel de cada proyecto"""
     proyecto = models.ForeignKey(Proyecto, on_delete=models.CASCADE, related_name='imagenes')
-    imagen = models.ImageField(upload_to='proyectos/capturas/')
+    imagen = ImagenMedida(
+        upload_to='proyectos/capturas/', storage=media_por_contenido,
+        width_field='ancho', height_field='alto', campo_lqip='lqip',
+    )
+    ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    alto = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    lqip = models.TextField(blank=True, editable=False, help_text="Miniatura borrosa (data URI) mientras carga")
+    variantes = models.JSONField(default=dict, blank=True, editable=False, help_text="Versiones WebP/AVIF redimensionadas")
     descripcion = models.CharField(max_length=200, help_text="Descripción de la captura")
     orden = models.IntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    CAMPOS_VARIANTES = [('imagen', 'variantes')]
     
     class Meta:
         verbose_name = "Imagen de Proyecto"
         verbose_name_plural = "Imágenes de Proyectos"
         ordering = ['orden']
+        indexes = [
+            # prefetch_related('imagenes'): proyecto_id IN (...) ordenado por orden
+            models.Index(fields=['proyecto', 'orden'], name='imagen_proyecto_orden_idx'),
+        ]
     
     def __str__(self):
         return f"{self.proyecto.titulo} - {self.descripcion}"
+    
+    def fuentes(self):
+        """Fuentes con srcset para el <picture> de la captura"""
+        return fuentes(self.variantes, self.imagen.storage)
 
 
 class Contacto(models.Model):
@@ -84,9 +225,53 @@ class Contacto(models.Model):
         verbose_name = "Mensaje de Contacto"
         verbose_name_plural = "Mensajes de Contacto"
         ordering = ['-fecha_envio']
+        indexes = [
+            # Bandeja del admin (cursor sobre fecha_envio, id) y archivar_contactos
+            models.Index(fields=['-fecha_envio', '-id'], name='contacto_bandeja_idx'),
+            models.Index(
+                fields=['-fecha_envio', '-id'], condition=models.Q(leido=False), name='contacto_no_leidos_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.nombre} - {self.fecha_envio.strftime('%d/%m/%Y')}"
+
+
+class ContactoArchivado(models.Model):
+    """Mensaje leído y antiguo que archivar_contactos sacó de Contacto (texto comprimido)"""
+    id = models.BigIntegerField(primary_key=True, help_text="Mismo id que tenía en Contacto")
+    nombre = models.CharField(max_length=100)
+    email = models.EmailField()
+    mensaje_comprimido = models.BinaryField()
+    fecha_envio = models.DateTimeField()
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Mensaje Archivado"
+        verbose_name_plural = "Mensajes Archivados"
+        ordering = ['-fecha_envio']
+        indexes = [models.Index(fields=['-fecha_envio', '-id'], name='archivado_fecha_idx')]
     
     def __str__(self):
         return f"{self.nombre} - {self.fecha_envio.strftime('%d/%m/%Y')}"
+    
+    @classmethod
+    def desde_contacto(cls, contacto):
+        return cls(
+            id=contacto.pk,
+            nombre=contacto.nombre,
+            email=contacto.email,
+            mensaje_comprimido=zlib.compress(contacto.mensaje.encode()),
+            fecha_envio=contacto.fecha_envio,
+        )
+    
+    @staticmethod
+    def descomprimir(mensaje_comprimido):
+        return zlib.decompress(mensaje_comprimido).decode()
+    
+    @property
+    def mensaje(self):
+        return self.descomprimir(self.mensaje_comprimido)
 
 
 class Perfil(models.Model):
@@ -102,7 +287,15 @@ class Perfil(models.Model):
     email = models.EmailField(default="sofia.lagos.cesped@gmail.com")
     
     # Ilustración de contacto
-    ilustracion_contacto = models.ImageField(upload_to='perfil/', blank=True, null=True)
+    ilustracion_contacto = ImagenMedida(
+        upload_to='perfil/', storage=media_por_contenido, blank=True, null=True,
+        width_field='ilustracion_ancho', height_field='ilustracion_alto', campo_lqip='ilustracion_lqip',
+    )
+    ilustracion_ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    ilustracion_alto = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    ilustracion_lqip = models.TextField(blank=True, editable=False, help_text="Miniatura borrosa (data URI) mientras carga")
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Perfil"
@@ -115,4 +308,80 @@ class Perfil(models.Model):
         """Asegura que solo exista un perfil"""
         if not self.pk and Perfil.objects.exists():
             raise ValueError('Solo puede existir un perfil. Edita el existente.')
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
+
+
+class TareaImagen(models.Model):
+    """Trabajo pendiente de procesamiento de imágenes (lo ejecuta procesar_imagenes)"""
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completada', 'Completada'),
+        ('fallida', 'Fallida'),
+    ]
+    
+    modelo = models.CharField(max_length=50, help_text="Nombre del modelo: proyecto o imagenproyecto")
+    objeto_id = models.PositiveBigIntegerField()
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    disponible_desde = models.DateTimeField(default=timezone.now, help_text="No se procesa antes de esta fecha (reintentos)")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Tarea de Imagen"
+        verbose_name_plural = "Tareas de Imágenes"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='tarea_imagen_cola_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} ({self.get_estado_display()})"
+
+
+class ArchivoMedia(models.Model):
+    """Archivo del storage por contenido y cuántas filas lo usan (lo mantiene main.media)"""
+    nombre = models.CharField(max_length=255, unique=True)
+    referencias = models.PositiveIntegerField(default=0)
+    tamano = models.PositiveBigIntegerField(default=0, help_text="Bytes")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Archivo de Media"
+        verbose_name_plural = "Archivos de Media"
+        ordering = ['-referencias', 'nombre']
+    
+    def __str__(self):
+        return self.nombre
+
+
+class NotificacionContacto(models.Model):
+    """Aviso pendiente de un mensaje de contacto (lo envía enviar_notificaciones)"""
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('enviada', 'Enviada'),
+        ('fallida', 'Fallida'),
+    ]
+    
+    contacto = models.OneToOneField(Contacto, on_delete=models.CASCADE, related_name='notificacion')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    disponible_desde = models.DateTimeField(default=timezone.now, help_text="No se envía antes de esta fecha (reintentos)")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Notificación de Contacto"
+        verbose_name_plural = "Notificaciones de Contacto"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='notificacion_cola_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Aviso del mensaje #{self.contacto_id} ({self.get_estado_display()})"
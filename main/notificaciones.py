@@ -0,0 +1,116 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Min
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import NotificacionContacto
+from .tareas import calcular_reintento, marcar_procesando
+
+logger = logging.getLogger(__name__)
+
+
+def encolar_notificacion(contacto):
+    """
+    Deja el aviso en la tabla de salida, en la misma transacción que el
+    mensaje: el envío por email lo hace enviar_notificaciones, fuera del request.
+    """
+    if settings.NOTIFICACIONES_DESTINATARIOS:
+        NotificacionContacto.objects.create(contacto=contacto)
+
+
+def recuperar_notificaciones_colgadas():
+    """Devuelve a la cola los avisos de un envío que murió a mitad de camino"""
+    limite = timezone.now() - timedelta(seconds=settings.NOTIFICACIONES_TIMEOUT)
+    return NotificacionContacto.objects.filter(
+        estado='procesando', fecha_actualizacion__lt=limite
+    ).update(estado='pendiente', fecha_actualizacion=timezone.now())
+
+
+def reclamar_notificaciones(limite):
+    """
+    Marca como 'procesando' hasta `limite` avisos listos y los devuelve.
+    El más antiguo espera hasta NOTIFICACIONES_ESPERA segundos para juntar
+    varios mensajes en un solo resumen (salvo que ya haya `limite`).
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        pendientes = NotificacionContacto.objects.filter(estado='pendiente', disponible_desde__lte=ahora)
+        primero = pendientes.aggregate(desde=Min('disponible_desde'))['desde']
+        if primero is None:
+            return []
+        if primero > ahora - timedelta(seconds=settings.NOTIFICACIONES_ESPERA):
+            if pendientes.count() < limite:
+                return []
+
+        pendientes = pendientes.order_by('disponible_desde')
+        if connection.features.has_select_for_update_skip_locked:
+            pendientes = pendientes.select_for_update(skip_locked=True)
+        ids = marcar_procesando(NotificacionContacto, pendientes.values_list('pk', flat=True)[:limite])
+    return list(
+        NotificacionContacto.objects.filter(pk__in=ids)
+        .select_related('contacto').order_by('contacto__fecha_envio')
+    )
+
+
+def crear_resumen(notificaciones):
+    """Un solo email con todos los mensajes nuevos"""
+    contactos = [notificacion.contacto for notificacion in notificaciones]
+    cantidad = len(contactos)
+    email = EmailMessage(
+        subject=f'{settings.EMAIL_SUBJECT_PREFIX}{cantidad} mensaje(s) nuevo(s) de contacto',
+        body=render_to_string('emails/resumen_contacto.txt', {'contactos': contactos}),
+        to=settings.NOTIFICACIONES_DESTINATARIOS,
+    )
+    if cantidad == 1:
+        # Con un solo mensaje, "Responder" le contesta directamente al remitente
+        email.reply_to = [contactos[0].email]
+    return email
+
+
+def registrar_fallo(notificaciones, error):
+    """Reprograma los avisos con espera exponencial o los marca como fallidos"""
+    ahora = timezone.now()
+    for notificacion in notificaciones:
+        notificacion.error = str(error)
+        notificacion.fecha_actualizacion = ahora
+        if notificacion.intentos >= settings.NOTIFICACIONES_MAX_INTENTOS:
+            notificacion.estado = 'fallida'
+        else:
+            notificacion.estado = 'pendiente'
+            notificacion.disponible_desde = calcular_reintento(
+                notificacion.intentos, settings.NOTIFICACIONES_REINTENTO_BASE
+            )
+    NotificacionContacto.objects.bulk_update(
+        notificaciones, ['estado', 'error', 'disponible_desde', 'fecha_actualizacion']
+    )
+
+
+def enviar_lote(notificaciones, conexion=None):
+    """Envía el resumen de un lote; devuelve cuántos avisos quedaron enviados"""
+    if not notificaciones:
+        return 0
+    conexion = conexion or get_connection()
+    try:
+        # Abrir la conexión también puede fallar: entra en el mismo reintento
+        abierta = conexion.open()
+        try:
+            email = crear_resumen(notificaciones)
+            email.connection = conexion
+            email.send()
+        finally:
+            if abierta:
+                conexion.close()
+    except Exception as error:
+        logger.warning('Falló el envío de %s aviso(s) de contacto', len(notificaciones), exc_info=True)
+        registrar_fallo(notificaciones, error)
+        return 0
+
+    NotificacionContacto.objects.filter(pk__in=[n.pk for n in notificaciones]).update(
+        estado='enviada', error='', fecha_actualizacion=timezone.now()
+    )
+    return len(notificaciones)
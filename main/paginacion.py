@@ -0,0 +1,128 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+# Orden estable de las listas públicas (coincide con los índices parciales de Proyecto)
+ORDEN_PROYECTOS = ('orden', '-fecha_creacion', 'id')
+# Bandeja de mensajes del admin (índice contacto_bandeja_idx)
+ORDEN_BANDEJA = ('-fecha_envio', '-id')
+
+
+def codificar_cursor(objeto, orden=ORDEN_PROYECTOS):
+    """Cursor opaco con la posición del último objeto de una página"""
+    valores = [getattr(objeto, campo.lstrip('-')) for campo in orden]
+    valores = [valor if isinstance(valor, (int, str)) else valor.isoformat() for valor in valores]
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, modelo, orden=ORDEN_PROYECTOS):
+    """Devuelve los valores de los campos de orden o None si no hay cursor; ValueError si es inválido"""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if len(valores) != len(orden):
+            raise ValueError
+        return tuple(
+            modelo._meta.get_field(campo.lstrip('-')).to_python(valor)
+            for campo, valor in zip(orden, valores)
+        )
+    except Exception as error:
+        raise ValueError('Cursor inválido') from error
+
+
+def despues_de(orden, valores):
+    """
+    Condición "viene después de esta posición" en el orden dado:
+    (a > x) o (a = x y b < y) o ... según la dirección de cada campo
+    """
+    condicion = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+        iguales[nombre] = valor
+    return condicion
+
+
+class PaginaKeyset:
+    """
+    Página por cursor sobre un orden estable que termina en el id (por defecto
+    el de los proyectos: orden, -fecha_creacion, id).
+    Es perezosa: la consulta se hace recién cuando el template la usa, así
+    que no cuesta nada si el fragmento está en caché.
+    """
+
+    def __init__(self, queryset, cursor, tamano, orden=ORDEN_PROYECTOS):
+        self.queryset = queryset
+        self.cursor = cursor
+        self.tamano = tamano
+        self.orden = orden
+
+    def _consulta(self):
+        queryset = self.queryset.order_by(*self.orden)
+        if self.cursor is not None:
+            queryset = queryset.filter(despues_de(self.orden, self.cursor))
+        # Se pide uno extra para saber si hay otra página sin hacer COUNT
+        return queryset[:self.tamano + 1]
+
+    @cached_property
+    def _filas(self):
+        return list(self._consulta())
+
+    async def acargar(self):
+        """Hace la consulta con el ORM async (para las vistas async); devuelve la página"""
+        self.__dict__['_filas'] = [proyecto async for proyecto in self._consulta()]
+        return self
+
+    @property
+    def objetos(self):
+        return self._filas[:self.tamano]
+
+    @property
+    def siguiente_cursor(self):
+        if len(self._filas) > self.tamano:
+            return codificar_cursor(self._filas[self.tamano - 1], self.orden)
+        return None
+
+    def __bool__(self):
+        return bool(self._filas)
+
+
+def conteo_estimado(queryset):
+    """Cantidad aproximada de filas sin recorrer la tabla (None si no se puede estimar)"""
+    if connections[queryset.db].vendor == 'postgresql':
+        # Estimación del planificador: sirve también con filtros y búsquedas
+        plan = json.loads(queryset.explain(format='json'))
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan['Plan']['Plan Rows'])
+    if queryset.query.where:
+        return None
+    # Sin estadísticas: el rango de ids (dos lecturas del índice de la clave)
+    rango = queryset.aggregate(menor=Min('pk'), mayor=Max('pk'))
+    if rango['mayor'] is None:
+        return 0
+    return rango['mayor'] - rango['menor'] + 1
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginator del admin para tablas grandes: si la estimación supera
+    ADMIN_CONTEO_EXACTO_HASTA no hace COUNT(*). La cantidad y la última
+    página son aproximadas.
+    """
+
+    @cached_property
+    def count(self):
+        estimado = conteo_estimado(self.object_list)
+        if estimado is None or estimado < settings.ADMIN_CONTEO_EXACTO_HASTA:
+            return super().count
+        return estimado
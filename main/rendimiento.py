@@ -0,0 +1,35 @@
+import math
+import re
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano; None si no hay valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(math.ceil(p / 100 * len(ordenados)) - 1, 0)]
+
+
+def repartir(peticiones, concurrencia, rutas):
+    """Lista de rutas para cada trabajador, alternando las rutas pedidas"""
+    cola = [rutas[i % len(rutas)] for i in range(peticiones)]
+    return [cola[i::concurrencia] for i in range(concurrencia)]
+
+
+def resumir_tiempos(tiempos):
+    """Latencias en segundos -> resumen en milisegundos"""
+    return {
+        'peticiones': len(tiempos),
+        'media_ms': round(sum(tiempos) / len(tiempos) * 1000, 2) if tiempos else None,
+        **{
+            f'p{p}_ms': round(percentil(tiempos, p) * 1000, 2) if tiempos else None
+            for p in (50, 90, 99)
+        },
+        'max_ms': round(max(tiempos) * 1000, 2) if tiempos else None,
+    }
+
+
+def consultas_server_timing(cabecera):
+    """Consultas SQL informadas en Server-Timing (InstrumentacionMiddleware); None si no vienen"""
+    coincidencia = re.search(r'(?:^|,)\s*sql;[^,]*desc="(\d+) consulta', cabecera or '')
+    return int(coincidencia.group(1)) if coincidencia else None
@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from .busqueda import eliminar_proyectos, indexar_proyectos
+from .cache import incrementar_version
+from .media import CAMPOS_MEDIA, recontar
+from .models import Contacto, Habilidad, ImagenProyecto, Perfil, Proyecto, Tecnologia
+from .notificaciones import encolar_notificacion
+from .tareas import encolar_variantes
+
+
+def invalidar_cache_contenido(sender, **kwargs):
+    """Cualquier cambio en el contenido público invalida los fragmentos cacheados"""
+    # Se espera al commit para no cachear datos viejos con la versión nueva
+    transaction.on_commit(incrementar_version)
+
+
+for modelo in (Proyecto, ImagenProyecto, Habilidad, Perfil, Tecnologia):
+    post_save.connect(
+        invalidar_cache_contenido, sender=modelo,
+        dispatch_uid=f'invalidar_cache_{modelo._meta.model_name}_save'
+    )
+    post_delete.connect(
+        invalidar_cache_contenido, sender=modelo,
+        dispatch_uid=f'invalidar_cache_{modelo._meta.model_name}_delete'
+    )
+
+m2m_changed.connect(
+    invalidar_cache_contenido, sender=Proyecto.tecnologias.through,
+    dispatch_uid='invalidar_cache_proyecto_tecnologias'
+)
+
+
+def programar_variantes(sender, instance, **kwargs):
+    """Las variantes de imagen se generan fuera del request del admin"""
+    encolar_variantes(instance)
+
+
+for modelo in (Proyecto, ImagenProyecto):
+    post_save.connect(
+        programar_variantes, sender=modelo,
+        dispatch_uid=f'programar_variantes_{modelo._meta.model_name}'
+    )
+
+
+def notificar_contacto(sender, instance, created, **kwargs):
+    """Los mensajes nuevos se avisan por email desde la tabla de salida, no aquí"""
+    if created:
+        encolar_notificacion(instance)
+
+
+post_save.connect(notificar_contacto, sender=Contacto, dispatch_uid='notificar_contacto')
+
+
+# -------------------------
+# Índice de búsqueda (main.busqueda)
+# -------------------------
+
+def indexar_proyecto(sender, instance, **kwargs):
+    # En la misma transacción que el guardado: el índice nunca queda adelantado
+    indexar_proyectos([instance.pk])
+
+
+def desindexar_proyecto(sender, instance, **kwargs):
+    eliminar_proyectos([instance.pk])
+
+
+def indexar_por_tecnologias(sender, instance, action, reverse, pk_set, **kwargs):
+    """Cambios en Proyecto.tecnologias, desde el proyecto o desde la tecnología"""
+    if reverse and action == 'pre_clear':
+        instance._proyectos_busqueda = list(instance.proyectos.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            indexar_proyectos([instance.pk])
+        elif action == 'post_clear':
+            indexar_proyectos(instance.__dict__.pop('_proyectos_busqueda', []))
+        else:
+            indexar_proyectos(pk_set)
+
+
+def indexar_tecnologia_renombrada(sender, instance, created, **kwargs):
+    """El nombre de una tecnología es parte del texto de sus proyectos"""
+    if not created:
+        indexar_proyectos(instance.proyectos.values_list('pk', flat=True))
+
+
+def recordar_proyectos_tecnologia(sender, instance, **kwargs):
+    # Al borrar una tecnología sus relaciones se van en cascada, sin m2m_changed
+    instance._proyectos_busqueda = list(instance.proyectos.values_list('pk', flat=True))
+
+
+def indexar_tecnologia_borrada(sender, instance, **kwargs):
+    indexar_proyectos(instance.__dict__.pop('_proyectos_busqueda', []))
+
+
+post_save.connect(indexar_proyecto, sender=Proyecto, dispatch_uid='indexar_proyecto')
+post_delete.connect(desindexar_proyecto, sender=Proyecto, dispatch_uid='desindexar_proyecto')
+m2m_changed.connect(
+    indexar_por_tecnologias, sender=Proyecto.tecnologias.through,
+    dispatch_uid='indexar_proyecto_tecnologias'
+)
+post_save.connect(indexar_tecnologia_renombrada, sender=Tecnologia, dispatch_uid='indexar_tecnologia_save')
+pre_delete.connect(recordar_proyectos_tecnologia, sender=Tecnologia, dispatch_uid='recordar_tecnologia_delete')
+post_delete.connect(indexar_tecnologia_borrada, sender=Tecnologia, dispatch_uid='indexar_tecnologia_delete')
+
+
+# -------------------------
+# Referencias de media por contenido (main.media)
+# -------------------------
+
+def _campo_media(sender):
+    return next(campo for modelo, campo, _ in CAMPOS_MEDIA if modelo is sender)
+
+
+def recordar_media_anterior(sender, instance, update_fields=None, **kwargs):
+    # El archivo que la fila deja de usar solo se conoce antes de guardar
+    campo = _campo_media(sender)
+    if update_fields is not None and campo not in update_fields:
+        return
+    instance._media_anterior = (
+        sender.objects.filter(pk=instance.pk).values_list(campo, flat=True).first() if instance.pk else None
+    )
+
+
+def contar_media_guardada(sender, instance, **kwargs):
+    if '_media_anterior' not in instance.__dict__:
+        return
+    anterior = instance.__dict__.pop('_media_anterior')
+    recontar({anterior, getattr(instance, _campo_media(sender)).name})
+
+
+def contar_media_borrada(sender, instance, **kwargs):
+    recontar({getattr(instance, _campo_media(sender)).name})
+
+
+for modelo, _, _ in CAMPOS_MEDIA:
+    nombre_modelo = modelo._meta.model_name
+    pre_save.connect(recordar_media_anterior, sender=modelo, dispatch_uid=f'recordar_media_{nombre_modelo}')
+    post_save.connect(contar_media_guardada, sender=modelo, dispatch_uid=f'contar_media_{nombre_modelo}_save')
+    post_delete.connect(contar_media_borrada, sender=modelo, dispatch_uid=f'contar_media_{nombre_modelo}_delete')
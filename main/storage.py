@@ -0,0 +1,184 @@
+import hashlib
+import posixpath
+import re
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage, storages
+
+from .compresion import comprimir_archivo
+
+try:
+    import rcssmin
+except ImportError:  # opcional: sin rcssmin se usa el minificador conservador de abajo
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # opcional: ídem para JavaScript
+    rjsmin = None
+
+_TOKENS_CSS = re.compile(
+    r'''(?P<texto>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')'''
+    r'|(?P<comentario>/\*.*?\*/)'
+    r'|(?P<espacio>\s+)'
+    r'|(?P<otro>[^"\'/\s]+|/)',
+    re.S,
+)
+_SEPARADORES_CSS = '{};,>'
+
+
+def minificar_css(css):
+    """Quita comentarios y espacios sobrantes sin tocar los textos entre comillas"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+
+    partes = []
+    espacio = False
+    for token in _TOKENS_CSS.finditer(css):
+        if token.lastgroup == 'comentario':
+            # /*! ... */ se conserva (licencias)
+            if token.group().startswith('/*!'):
+                partes.append(token.group())
+            continue
+        if token.lastgroup == 'espacio':
+            espacio = True
+            continue
+        valor = token.group()
+        if espacio and partes and partes[-1][-1] not in _SEPARADORES_CSS and valor[0] not in _SEPARADORES_CSS:
+            partes.append(' ')
+        espacio = False
+        partes.append(valor)
+    return ''.join(partes)
+
+
+def minificar_js(js):
+    """
+    Minificación conservadora: quita sangría, líneas vacías y comentarios de
+    línea completa, pero mantiene los saltos de línea (ASI) y el contenido de
+    los template literals de varias líneas.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+
+    lineas = []
+    en_template = False
+    for linea in js.splitlines():
+        if en_template:
+            lineas.append(linea)
+        else:
+            limpia = linea.strip()
+            if limpia and not limpia.startswith('//'):
+                lineas.append(limpia)
+        # Un número impar de ` sin escapar abre o cierra un template literal
+        if len(re.findall(r'(?<!\\)`', linea)) % 2:
+            en_template = not en_template
+    return '\n'.join(lineas) + '\n'
+
+
+MINIFICADORES = {'.css': minificar_css, '.js': minificar_js}
+
+
+class _OrigenMinificado:
+    """Envuelve el storage de origen para entregar CSS y JS ya minificados"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def open(self, path, mode='rb'):
+        minificar = MINIFICADORES.get(Path(path).suffix)
+        with self.storage.open(path, mode) as archivo:
+            contenido = archivo.read()
+        if minificar is None or path.endswith(('.min.css', '.min.js')):
+            return ContentFile(contenido, name=path)
+        return ContentFile(minificar(contenido.decode('utf-8')).encode('utf-8'), name=path)
+
+    def __getattr__(self, nombre):
+        return getattr(self.storage, nombre)
+
+
+class EstaticosComprimidos(ManifestStaticFilesStorage):
+    """
+    Estáticos para producción: al hacer collectstatic minifica CSS y JS,
+    agrega la huella del contenido al nombre y escribe versiones .gz/.br.
+    """
+
+    # Sin manifiesto (p. ej. antes del primer collectstatic) se usa el nombre original
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        # La huella se calcula sobre el contenido minificado
+        origenes = {
+            ruta: (_OrigenMinificado(storage), ruta_origen)
+            for ruta, (storage, ruta_origen) in paths.items()
+        }
+        yield from super().post_process(origenes, dry_run, **options)
+
+        if dry_run:
+            return
+        for nombre in set(self.hashed_files.values()):
+            comprimir_archivo(Path(self.path(nombre)))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Ni en el manifiesto ni en STATIC_ROOT: mejor el nombre sin huella que un error 500
+            return name
+
+
+class MediaPorContenido(FileSystemStorage):
+    """
+    Media direccionada por contenido: el nombre es el SHA-256 del archivo
+    (contenido/ab/ab12….jpg), sin importar el upload_to ni el nombre subido.
+    Subir dos veces la misma imagen guarda un solo archivo, y una URL nunca
+    cambia de contenido, así que se puede cachear para siempre. Como los
+    archivos se comparten, los borra main.media cuando nadie los usa.
+    """
+
+    carpeta = 'contenido'
+    # Las variantes (nombre-huella-640w.webp) también se comparten: no se borran
+    # al cambiar la imagen de una fila, sino junto con el original
+    por_contenido = True
+    _NOMBRE = re.compile(r'^contenido/([0-9a-f]{2})/\1[0-9a-f]{62}(\.[a-z0-9]{1,10})?$')
+
+    def nombre_para(self, huella, nombre):
+        extension = posixpath.splitext(nombre)[1].lower()
+        if not re.fullmatch(r'\.[a-z0-9]{1,10}', extension):
+            extension = ''
+        return f'{self.carpeta}/{huella[:2]}/{huella}{extension}'
+
+    def es_por_contenido(self, nombre):
+        return bool(nombre and self._NOMBRE.match(nombre))
+
+    def huella(self, content):
+        """SHA-256 del contenido, leído por bloques"""
+        sha = hashlib.sha256()
+        for bloque in content.chunks():
+            sha.update(bloque)
+        return sha.hexdigest()
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        nombre = self.nombre_para(self.huella(content), name)
+        if self.exists(nombre):
+            return nombre
+        content.seek(0)
+        guardado = self._save(nombre, content)
+        if guardado != nombre:
+            # Otro proceso subió lo mismo entre medio: se queda la copia que ya estaba
+            self.delete(guardado)
+        return nombre
+
+    def guardar_derivado(self, name, content):
+        """Guarda con el nombre dado (variantes: su nombre ya lleva la huella del original)"""
+        return super().save(name, content)
+
+
+def media_por_contenido():
+    """Storage de las imágenes subidas (STORAGES['media'])"""
+    return storages['media']
@@ -0,0 +1,169 @@
+import logging
+from concurrent.futures import Future
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .imagenes import actualizar_variantes, aplicar_variantes, generar_variantes, medir_guardada, necesita_variantes
+from .models import TareaImagen
+
+logger = logging.getLogger(__name__)
+
+
+def encolar_variantes(instancia):
+    """Programa la generación de variantes para las imágenes que cambiaron"""
+    campos = [
+        (campo, campo_variantes)
+        for campo, campo_variantes in instancia.CAMPOS_VARIANTES
+        if necesita_variantes(instancia, campo, campo_variantes)
+    ]
+    if not campos:
+        return
+
+    if not settings.IMAGENES_EN_SEGUNDO_PLANO:
+        for campo, campo_variantes in campos:
+            actualizar_variantes(instancia, campo, campo_variantes)
+        return
+
+    # La tarea se crea en la misma transacción que el guardado: si este
+    # se revierte, la tarea también
+    modelo = instancia._meta.model_name
+    ya_pendiente = TareaImagen.objects.filter(
+        modelo=modelo, objeto_id=instancia.pk, estado='pendiente'
+    ).exists()
+    if not ya_pendiente:
+        TareaImagen.objects.create(modelo=modelo, objeto_id=instancia.pk)
+
+
+def calcular_reintento(intentos, base):
+    """Espera exponencial antes del siguiente intento"""
+    return timezone.now() + timedelta(seconds=base * 2 ** max(intentos - 1, 0))
+
+
+def recuperar_tareas_colgadas():
+    """Devuelve a la cola las tareas de un worker que murió a mitad de camino"""
+    limite = timezone.now() - timedelta(seconds=settings.IMAGENES_TAREA_TIMEOUT)
+    return TareaImagen.objects.filter(
+        estado='procesando', fecha_actualizacion__lt=limite
+    ).update(estado='pendiente', fecha_actualizacion=timezone.now())
+
+
+def marcar_procesando(modelo, ids):
+    """
+    Pasa a 'procesando' las filas de `ids` que siguen pendientes y devuelve
+    las que movió esta llamada. Sin skip_locked (SQLite) otro worker pudo
+    reclamar alguna entre la lectura y el update: la condición sobre el
+    estado hace que cada fila la gane uno solo.
+    """
+    reclamadas = []
+    for pk in ids:
+        movidas = modelo.objects.filter(pk=pk, estado='pendiente').update(
+            estado='procesando', intentos=F('intentos') + 1, fecha_actualizacion=timezone.now()
+        )
+        if movidas == 1:
+            reclamadas.append(pk)
+    return reclamadas
+
+
+def reclamar_tareas(limite):
+    """Marca como 'procesando' hasta `limite` tareas listas y las devuelve"""
+    with transaction.atomic():
+        pendientes = TareaImagen.objects.filter(
+            estado='pendiente', disponible_desde__lte=timezone.now()
+        ).order_by('disponible_desde')
+        if connection.features.has_select_for_update_skip_locked:
+            pendientes = pendientes.select_for_update(skip_locked=True)
+        ids = marcar_procesando(TareaImagen, pendientes.values_list('pk', flat=True)[:limite])
+    return list(TareaImagen.objects.filter(pk__in=ids).order_by('disponible_desde'))
+
+
+def registrar_fallo(tarea, error):
+    """Reprograma la tarea con espera exponencial o la marca como fallida"""
+    tarea.error = str(error)
+    if tarea.intentos >= settings.IMAGENES_MAX_INTENTOS:
+        tarea.estado = 'fallida'
+    else:
+        tarea.estado = 'pendiente'
+        tarea.disponible_desde = calcular_reintento(tarea.intentos, settings.IMAGENES_REINTENTO_BASE)
+    tarea.save(update_fields=['estado', 'error', 'disponible_desde', 'fecha_actualizacion'])
+
+
+def inicializar_proceso():
+    """Prepara Django en los procesos hijos del pool (necesario con 'spawn')"""
+    if not apps.ready:
+        django.setup()
+
+
+def generar_en_proceso(modelo, campo, nombre):
+    """Trabajo que corre en un proceso del pool: solo Pillow y storage, sin base de datos"""
+    storage = apps.get_model('main', modelo)._meta.get_field(campo).storage
+    return generar_variantes(storage, nombre)
+
+
+def medir_en_proceso(modelo, campo, nombre):
+    """Ancho, alto y LQIP de una imagen guardada (para completar_dimensiones)"""
+    storage = apps.get_model('main', modelo)._meta.get_field(campo).storage
+    return nombre, medir_guardada(storage, nombre)
+
+
+def _enviar(ejecutor, funcion, *args):
+    """Envía el trabajo al pool, o lo ejecuta aquí mismo si no hay pool"""
+    if ejecutor is not None:
+        return ejecutor.submit(funcion, *args)
+    futuro = Future()
+    try:
+        futuro.set_result(funcion(*args))
+    except Exception as error:
+        futuro.set_exception(error)
+    return futuro
+
+
+def procesar_lote(tareas, ejecutor=None):
+    """
+    Genera en paralelo las variantes de un lote de tareas y guarda los
+    resultados. Devuelve la cantidad de tareas completadas.
+    """
+    trabajos = []
+    for tarea in tareas:
+        modelo = apps.get_model('main', tarea.modelo)
+        instancia = modelo.objects.filter(pk=tarea.objeto_id).first()
+        campos = [] if instancia is None else [
+            (campo, campo_variantes)
+            for campo, campo_variantes in modelo.CAMPOS_VARIANTES
+            if necesita_variantes(instancia, campo, campo_variantes)
+        ]
+        futuros = []
+        for campo, campo_variantes in campos:
+            archivo = getattr(instancia, campo)
+            if archivo:
+                futuro = _enviar(ejecutor, generar_en_proceso, tarea.modelo, campo, archivo.name)
+            else:
+                # Imagen eliminada: solo hay que limpiar las variantes
+                futuro = _enviar(None, dict)
+            futuros.append((campo, campo_variantes, futuro))
+        trabajos.append((tarea, instancia, futuros))
+
+    completadas = 0
+    for tarea, instancia, futuros in trabajos:
+        error = None
+        for campo, campo_variantes, futuro in futuros:
+            try:
+                aplicar_variantes(instancia, campo, campo_variantes, futuro.result())
+            except Exception as exc:
+                logger.warning('Falló la tarea de imagen %s', tarea, exc_info=True)
+                error = exc
+
+        if error is None:
+            tarea.estado = 'completada'
+            tarea.error = ''
+            tarea.save(update_fields=['estado', 'error', 'fecha_actualizacion'])
+            completadas += 1
+        else:
+            registrar_fallo(tarea, error)
+
+    return completadas
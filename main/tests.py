@@ -1,3 +1,1929 @@
-from django.test import TestCase
+import gzip
+import html
+import io
+import json
+import re
+import shutil
+import tempfile
+from html.parser import HTMLParser
+from pathlib import Path
+from datetime import time, timedelta
 
-# Create your tests here.
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.template.base import Template
+from django.templatetags.static import static
+from django.core.exceptions import ImproperlyConfigured
+from django.test import (
+    AsyncRequestFactory, Client, LiveServerTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from PIL import Image
+
+from . import busqueda, instrumentacion, views
+from .antispam import crear_marca, edad_marca, periodo_marca
+from .models import (
+    ArchivoMedia, Contacto, ContactoArchivado, Habilidad, ImagenProyecto, NotificacionContacto, Perfil, Proyecto,
+    TareaImagen, Tecnologia,
+)
+from .management.commands.generar_css_critico import href
+from .paginacion import PaginadorEstimado, PaginaKeyset, codificar_cursor, conteo_estimado
+from .rendimiento import consultas_server_timing, percentil, resumir_tiempos
+from .storage import minificar_css, minificar_js
+from .cache import huella_build, incrementar_version, obtener_version
+from .checks import cache_compartida
+from .notificaciones import reclamar_notificaciones
+from .tareas import inicializar_proceso, marcar_procesando, procesar_lote, reclamar_tareas
+from portafolio.conexiones import configurar_conexiones
+
+
+def imagen_de_prueba(nombre='captura.png', ancho=800, alto=500, color='red'):
+    """Genera un PNG en memoria listo para subir"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, alto), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(nombre, buffer.getvalue(), content_type='image/png')
+
+
+class MediaTemporalMixin:
+    """Usa un MEDIA_ROOT temporal (y una caché vacía) en cada prueba"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        ajustes = override_settings(MEDIA_ROOT=self.media_root)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+
+def crear_proyecto(tecnologias=('Python', 'Django'), **kwargs):
+    """Crea un proyecto mínimo para las pruebas"""
+    datos = {
+        'titulo': 'Proyecto de prueba',
+        'descripcion': 'Descripción de prueba',
+        'imagen_principal': imagen_de_prueba('prueba.png', 40, 30),
+        'url_codigo': 'https://github.com/too0oori/prueba',
+    }
+    datos.update(kwargs)
+    proyecto = Proyecto.objects.create(**datos)
+    proyecto.tecnologias.set(Tecnologia.desde_nombres(tecnologias))
+    return proyecto
+
+
+class CacheContenidoTests(MediaTemporalMixin, TestCase):
+    """Caché de fragmentos versionada por contenido"""
+
+    def setUp(self):
+        super().setUp()
+        Perfil.objects.create(descripcion='Hola')
+        crear_proyecto(titulo='Destacado', destacado=True)
+        crear_proyecto(titulo='Secundario')
+        Habilidad.objects.create(nombre='Django', tipo='tecnica')
+        Habilidad.objects.create(nombre='Paciencia', tipo='personal')
+
+    def test_index_con_cache_no_consulta_la_base(self):
+        self.client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('index'))
+        self.assertContains(respuesta, 'Destacado')
+        self.assertContains(respuesta, 'Paciencia')
+
+    def test_proyectos_con_cache_no_consulta_la_base(self):
+        self.client.get(reverse('todos_proyectos'))
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('todos_proyectos'))
+        self.assertContains(respuesta, 'Secundario')
+
+    def test_guardar_invalida_la_cache(self):
+        self.client.get(reverse('index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Habilidad.objects.create(nombre='Bootstrap', tipo='tecnica')
+        self.assertContains(self.client.get(reverse('index')), 'Bootstrap')
+
+    def test_la_version_se_comparte_entre_procesos(self):
+        # Como un worker de gunicorn o procesar_imagenes: otro proceso guarda
+        # y este debe dejar de servir los fragmentos anteriores
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        compartida = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directorio,
+        }}
+        with override_settings(CACHES=compartida):
+            anterior = obtener_version()
+            with ProcessPoolExecutor(max_workers=1, initializer=inicializar_proceso) as ejecutor:
+                nueva = ejecutor.submit(incrementar_version).result()
+            self.assertEqual(obtener_version(), nueva)
+        self.assertNotEqual(nueva, anterior)
+
+    def test_check_avisa_si_la_cache_es_por_proceso(self):
+        # Los tests corren con LocMemCache y DEBUG apagado, como un deploy sin REDIS_URL
+        aviso, = cache_compartida(None)
+        self.assertEqual(aviso.id, 'main.W001')
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(cache_compartida(None), [])
+        with override_settings(DEBUG=True):
+            self.assertEqual(cache_compartida(None), [])
+
+    def test_eliminar_invalida_la_cache(self):
+        self.client.get(reverse('todos_proyectos'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Proyecto.objects.get(titulo='Secundario').delete()
+        self.assertNotContains(self.client.get(reverse('todos_proyectos')), 'Secundario')
+
+
+class GetCondicionalTests(MediaTemporalMixin, TestCase):
+    """ETag y Last-Modified de las páginas públicas"""
+
+    def setUp(self):
+        super().setUp()
+        Perfil.objects.create(descripcion='Hola')
+        self.proyecto = crear_proyecto(titulo='Destacado', destacado=True)
+        self.habilidad = Habilidad.objects.create(nombre='Django', tipo='tecnica')
+
+    def test_respuesta_incluye_validadores(self):
+        for url in (reverse('index'), reverse('todos_proyectos')):
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertTrue(respuesta.has_header('ETag'))
+            self.assertTrue(respuesta.has_header('Last-Modified'))
+
+    def test_etag_vigente_responde_304_sin_consultas(self):
+        etag = self.client.get(reverse('index'))['ETag']
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_if_modified_since_vigente_responde_304(self):
+        ultima = self.client.get(reverse('todos_proyectos'))['Last-Modified']
+        respuesta = self.client.get(reverse('todos_proyectos'), HTTP_IF_MODIFIED_SINCE=ultima)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_cambios_invalidan_los_validadores(self):
+        anterior = self.client.get(reverse('index'))
+        cambios = (
+            lambda: self.proyecto.save(),
+            lambda: self.habilidad.delete(),
+            lambda: self.proyecto.tecnologias.clear(),
+        )
+        for cambio in cambios:
+            with self.captureOnCommitCallbacks(execute=True):
+                cambio()
+            respuesta = self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=anterior['ETag'])
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertNotEqual(respuesta['ETag'], anterior['ETag'])
+            anterior = respuesta
+
+    def test_un_deploy_invalida_el_etag(self):
+        etag = self.client.get(reverse('index'))['ETag']
+        # collectstatic con CSS nuevo: otro manifiesto en el proceso que arranca
+        self.addCleanup(huella_build.cache_clear)
+        huella_build.cache_clear()
+        manifiesto = json.dumps({'paths': {'css/styles.css': 'css/styles.0123456789ab.css'}})
+        with mock.patch.object(staticfiles_storage, 'read_manifest', return_value=manifiesto, create=True):
+            respuesta = self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_sin_cache_usa_la_fecha_de_la_base(self):
+        cache.clear()
+        respuesta = self.client.get(reverse('index'))
+        self.assertEqual(
+            respuesta['Last-Modified'],
+            http_date(self.habilidad.fecha_actualizacion.timestamp()),
+        )
+        self.assertNotEqual(self.habilidad.fecha_actualizacion.time(), time(0))
+
+
+class VistasAsincronasTests(MediaTemporalMixin, TestCase):
+    """index y todos_proyectos async (VISTAS_ASINCRONAS con ASGI)"""
+
+    def setUp(self):
+        super().setUp()
+        Perfil.objects.create(descripcion='Hola')
+        crear_proyecto(titulo='Destacado', destacado=True)
+        crear_proyecto(titulo='Secundario', tecnologias=('Flask',))
+        Habilidad.objects.create(nombre='Django', tipo='tecnica')
+        Habilidad.objects.create(nombre='Paciencia', tipo='personal')
+        self.fabrica = AsyncRequestFactory()
+
+    def pedir(self, vista, url, **extra):
+        return async_to_sync(vista)(self.fabrica.get(url, **extra))
+
+    def test_mismo_html_que_las_vistas_sync(self):
+        casos = (
+            (views.index_async, reverse('index')),
+            (views.todos_proyectos_async, reverse('todos_proyectos')),
+            (views.todos_proyectos_async, reverse('todos_proyectos') + '?tech=flask'),
+            (views.todos_proyectos_async, reverse('todos_proyectos') + '?seccion=otros'),
+        )
+        for vista, url in casos:
+            cache.clear()
+            with mock.patch('main.antispam.crear_marca', return_value='marca'):
+                asincrona = self.pedir(vista, url)
+                cache.clear()
+                sincrona = self.client.get(url)
+            self.assertEqual(asincrona.status_code, 200)
+            self.assertHTMLEqual(
+                asincrona.content.decode().replace(asincrona['ETag'], ''),
+                sincrona.content.decode().replace(sincrona['ETag'], ''),
+            )
+
+    def test_con_fragmentos_en_cache_no_consulta_la_base(self):
+        for vista, url in ((views.index_async, reverse('index')), (views.todos_proyectos_async, reverse('todos_proyectos'))):
+            self.pedir(vista, url)
+            with self.assertNumQueries(0):
+                respuesta = self.pedir(vista, url)
+            self.assertContains(respuesta, 'Destacado')
+
+    def test_etag_vigente_responde_304(self):
+        etag = self.pedir(views.index_async, reverse('index'))['ETag']
+        with self.assertNumQueries(0):
+            respuesta = self.pedir(views.index_async, reverse('index'), headers={'if-none-match': etag})
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_acargar_equivale_a_la_carga_sync(self):
+        esperada = PaginaKeyset(Proyecto.objects.all(), None, 1)
+        bool(esperada)
+        pagina = async_to_sync(PaginaKeyset(Proyecto.objects.all(), None, 1).acargar)()
+        with self.assertNumQueries(0):
+            self.assertEqual(pagina.objetos, esperada.objetos)
+            self.assertEqual(pagina.siguiente_cursor, esperada.siguiente_cursor)
+
+    def test_resumen_de_tiempos(self):
+        self.assertEqual(percentil([0.3, 0.1, 0.2, 0.4], 50), 0.2)
+        self.assertEqual(percentil([0.3, 0.1, 0.2, 0.4], 99), 0.4)
+        resumen = resumir_tiempos([0.01, 0.02, 0.03])
+        self.assertEqual((resumen['peticiones'], resumen['p50_ms'], resumen['max_ms']), (3, 20.0, 30.0))
+        self.assertIsNone(resumir_tiempos([])['p99_ms'])
+
+    def test_consultas_de_server_timing(self):
+        cabecera = 'sql;dur=3.2;desc="7 consulta(s)", plantillas;dur=1.0, total;dur=9.1'
+        self.assertEqual(consultas_server_timing(cabecera), 7)
+        self.assertIsNone(consultas_server_timing('total;dur=1.0'))
+        self.assertIsNone(consultas_server_timing(None))
+
+
+class BenchmarkTests(MediaTemporalMixin, TestCase):
+    """Datos sembrados y mediciones de sembrar_datos / benchmark"""
+
+    def sembrar(self, *argumentos):
+        call_command(
+            'sembrar_datos', '--proyectos', '12', '--capturas', '2', '--habilidades', '5',
+            '--contactos', '30', *argumentos, stdout=io.StringIO(),
+        )
+
+    def test_sembrar_cantidades_y_limpiar(self):
+        Contacto.objects.create(nombre='Real', email='real@example.com', mensaje='Hola')
+        self.sembrar()
+        self.assertEqual(Proyecto.objects.count(), 12)
+        self.assertEqual(ImagenProyecto.objects.count(), 24)
+        self.assertEqual(Habilidad.objects.count(), 5)
+        self.assertEqual(Contacto.objects.count(), 31)
+        self.assertFalse(TareaImagen.objects.exists())
+
+        self.sembrar('--limpiar')
+        self.assertEqual(Proyecto.objects.count(), 12)
+        self.assertEqual(Contacto.objects.count(), 31)
+        self.assertTrue(Contacto.objects.filter(email='real@example.com').exists())
+
+    def test_benchmark_genera_json_comparable(self):
+        self.sembrar()
+        salida = Path(self.media_root) / 'benchmark.json'
+        call_command(
+            'benchmark', '--peticiones', '3', '--concurrencia', '1', '--json', str(salida),
+            '--escenarios', 'index', 'contacto_post', 'admin_contactos', stdout=io.StringIO(),
+        )
+        resultado = json.loads(salida.read_text())
+
+        self.assertEqual(set(resultado['escenarios']), {'index', 'contacto_post', 'admin_contactos'})
+        for datos in resultado['escenarios'].values():
+            self.assertEqual((datos['peticiones'], datos['errores']), (3, 0))
+            self.assertGreater(datos['bytes']['media'], 0)
+            self.assertIsNotNone(datos['latencia']['p99_ms'])
+        # Con los fragmentos en caché el index no consulta; el admin sí
+        self.assertEqual(resultado['escenarios']['index']['consultas']['max'], 0)
+        self.assertGreater(resultado['escenarios']['admin_contactos']['consultas']['media'], 0)
+        self.assertEqual(resultado['datos']['proyectos'], 12)
+
+        # No quedan los mensajes enviados ni el usuario temporal
+        self.assertEqual(Contacto.objects.count(), 30)
+        self.assertFalse(get_user_model().objects.filter(username='benchmark').exists())
+
+        comparacion = io.StringIO()
+        call_command(
+            'benchmark', '--peticiones', '2', '--concurrencia', '1', '--escenarios', 'index',
+            '--comparar', str(salida), stdout=comparacion,
+        )
+        self.assertIn('vs. ', comparacion.getvalue())
+
+
+# El servidor informa Server-Timing en cada petición (como con DEBUG e INSTRUMENTACION_MUESTREO=1)
+@override_settings(INSTRUMENTACION_SERVER_TIMING_PUBLICO=True, INSTRUMENTACION_MUESTREO=1)
+class BenchmarkHttpTests(MediaTemporalMixin, LiveServerTestCase):
+    """benchmark --url: peticiones HTTP reales a un servidor"""
+
+    def test_mide_por_http_con_server_timing(self):
+        call_command(
+            'sembrar_datos', '--proyectos', '5', '--capturas', '0', '--habilidades', '2',
+            '--contactos', '5', stdout=io.StringIO(),
+        )
+        salida = io.StringIO()
+        with self.assertLogs('main.instrumentacion', 'INFO'):
+            call_command(
+                'benchmark', '--url', self.live_server_url, '--peticiones', '4', '--concurrencia', '2',
+                '--escenarios', 'index', 'admin_contactos', '--json', '-', stdout=salida,
+            )
+        resultado = json.loads(salida.getvalue())
+        self.assertEqual(resultado['entorno']['modo'], 'http')
+        for datos in resultado['escenarios'].values():
+            self.assertEqual((datos['peticiones'], datos['errores']), (4, 0))
+            self.assertGreater(datos['bytes']['media'], 0)
+        # Las consultas vienen del Server-Timing del servidor
+        self.assertEqual(resultado['escenarios']['index']['consultas']['max'], 0)
+        self.assertGreater(resultado['escenarios']['admin_contactos']['consultas']['media'], 0)
+        self.assertFalse(get_user_model().objects.filter(username='benchmark').exists())
+
+    def test_url_invalida_o_sin_servidor(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark', '--url', 'localhost:8000', stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command(
+                'benchmark', '--url', 'http://127.0.0.1:1', '--escenarios', 'index', stdout=io.StringIO(),
+            )
+
+
+class InstrumentacionTests(MediaTemporalMixin, TestCase):
+    """InstrumentacionMiddleware: Server-Timing, log muestreado y panel de staff"""
+
+    def setUp(self):
+        super().setUp()
+        Perfil.objects.create(descripcion='Hola')
+        for i in range(3):
+            crear_proyecto(titulo=f'Destacado {i}', destacado=True)
+
+    def registro(self, url, **extra):
+        with self.assertLogs('main.instrumentacion', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = self.client.get(url, **extra)
+        return respuesta, json.loads(logs.records[0].getMessage()), len(consultas)
+
+    def test_sin_muestreo_ni_sesion_no_mide(self):
+        respuesta = self.client.get(reverse('index'))
+        self.assertFalse(respuesta.has_header('Server-Timing'))
+        self.assertNotIn('Cookie', respuesta.get('Vary', ''))
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1, INSTRUMENTACION_SERVER_TIMING_PUBLICO=True)
+    def test_mide_sql_templates_cache_y_bytes(self):
+        respuesta, datos, consultas = self.registro(reverse('index'))
+        self.assertEqual(datos['vista'], 'index')
+        self.assertEqual(datos['sql']['consultas'], consultas)
+        self.assertEqual(datos['bytes'], len(respuesta.content))
+        self.assertEqual(datos['plantillas']['detalle']['partials/_proyecto_card.html']['renders'], 3)
+        self.assertGreater(datos['cache']['fallos'], 0)
+        self.assertIn('sql;dur=', respuesta['Server-Timing'])
+        self.assertIn('partials/_proyecto_card.html x3', respuesta['Server-Timing'])
+
+        # Con los fragmentos guardados: sin SQL ni render de tarjetas
+        respuesta, datos, consultas = self.registro(reverse('index'))
+        self.assertEqual(datos['sql']['consultas'], 0)
+        self.assertNotIn('partials/_proyecto_card.html', datos['plantillas']['detalle'])
+        self.assertGreater(datos['cache']['aciertos'], 0)
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1, INSTRUMENTACION_SERVER_TIMING_PUBLICO=False)
+    def test_server_timing_solo_para_staff(self):
+        respuesta, datos, _ = self.registro(reverse('index'))
+        self.assertFalse(respuesta.has_header('Server-Timing'))
+        self.assertEqual(datos['estado'], 200)
+
+    @override_settings(INSTRUMENTACION_SERVER_TIMING_PUBLICO=False)
+    def test_panel_de_staff(self):
+        staff = get_user_model().objects.create_user('staff', password='x', is_staff=True, is_superuser=True)
+        self.client.force_login(staff)
+        respuesta = self.client.get(reverse('admin:main_proyecto_changelist'), {'rendimiento': '1'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'id="panel-rendimiento"')
+        self.assertIn('admin/change_list.html', respuesta['Server-Timing'])
+        self.assertIn('no-store', respuesta['Cache-Control'])
+
+        self.assertNotContains(self.client.get(reverse('admin:main_proyecto_changelist')), 'panel-rendimiento')
+
+        # Página pública vista por staff: con Server-Timing, pero fuera de las cachés compartidas
+        respuesta = self.client.get(reverse('index'))
+        self.assertTrue(respuesta.has_header('Server-Timing'))
+        self.assertIn('private', respuesta['Cache-Control'])
+        self.assertNotIn('public', respuesta['Cache-Control'])
+        self.assertIn('Cookie', respuesta['Vary'])
+
+        visitante = get_user_model().objects.create_user('visitante', password='x')
+        self.client.force_login(visitante)
+        respuesta = self.client.get(reverse('index'), {'rendimiento': '1'})
+        self.assertNotContains(respuesta, 'panel-rendimiento')
+        self.assertFalse(respuesta.has_header('Server-Timing'))
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1)
+    def test_solo_instrumenta_durante_la_medicion(self):
+        self.registro(reverse('index'))
+        self.assertIs(Template.render, instrumentacion._render_original)
+        self.assertNotIsInstance(caches['default'], instrumentacion.CacheContada)
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1, INSTRUMENTACION_SERVER_TIMING_PUBLICO=True)
+    def test_modo_async_sin_adaptar(self):
+        middleware = instrumentacion.InstrumentacionMiddleware(views.index_async)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.assertLogs('main.instrumentacion', 'INFO') as logs:
+            respuesta = async_to_sync(middleware)(AsyncRequestFactory().get(reverse('index')))
+        datos = json.loads(logs.records[0].getMessage())
+        self.assertGreater(datos['sql']['consultas'], 0)
+        self.assertGreater(datos['cache']['fallos'], 0)
+        self.assertEqual(datos['plantillas']['detalle']['partials/_proyecto_card.html']['renders'], 3)
+        self.assertIn('sql;dur=', respuesta['Server-Timing'])
+
+
+class ModosConexionTests(TransactionTestCase):
+    """DB_MODO_CONEXION y benchmark_conexiones"""
+
+    POSTGRES = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'portafolio_db'}
+
+    def test_modos(self):
+        self.assertEqual(configurar_conexiones(self.POSTGRES, {})['CONN_MAX_AGE'], 60)
+        self.assertTrue(configurar_conexiones(self.POSTGRES, {})['CONN_HEALTH_CHECKS'])
+        persistente = configurar_conexiones(self.POSTGRES, {'DB_MODO_CONEXION': 'persistente', 'DB_CONN_MAX_AGE': '300'})
+        self.assertEqual(persistente['CONN_MAX_AGE'], 300)
+        self.assertEqual(configurar_conexiones(self.POSTGRES, {'DB_MODO_CONEXION': 'por_peticion'})['CONN_MAX_AGE'], 0)
+        with self.assertRaises(ImproperlyConfigured):
+            configurar_conexiones(self.POSTGRES, {'DB_MODO_CONEXION': 'siempre'})
+
+    def test_pool_y_sentencias_preparadas(self):
+        entorno = {'DB_MODO_CONEXION': 'pool', 'DB_POOL_MAX': '8', 'DB_SENTENCIAS_PREPARADAS': '1'}
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            with self.assertRaises(ImproperlyConfigured):
+                configurar_conexiones(self.POSTGRES, entorno)
+        else:
+            configuracion = configurar_conexiones(self.POSTGRES, entorno)
+            self.assertEqual(configuracion['CONN_MAX_AGE'], 0)
+            self.assertEqual(configuracion['OPTIONS']['pool']['max_size'], 8)
+            self.assertTrue(configuracion['OPTIONS']['server_side_binding'])
+            self.assertNotIn('OPTIONS', self.POSTGRES)
+
+        # Fuera de PostgreSQL no hay pool ni binding en el servidor
+        sqlite = configurar_conexiones({'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'x'}, entorno)
+        self.assertEqual(sqlite['OPTIONS'], {})
+
+    def test_pool_se_crea_como_lo_hace_django(self):
+        class PoolFalso:
+            def __init__(self, kwargs, open, configure, check=None, **opciones):
+                self.check, self.opciones = check, opciones
+
+            @staticmethod
+            def check_connection(conexion):
+                pass
+
+        modulo = mock.Mock(ConnectionPool=PoolFalso)
+        with mock.patch.dict('sys.modules', psycopg_pool=modulo):
+            configuracion = configurar_conexiones(self.POSTGRES, {'DB_MODO_CONEXION': 'pool'})
+        # Mismos argumentos que DatabaseWrapper.pool (django/db/backends/postgresql/base.py)
+        pool = PoolFalso(
+            kwargs={}, open=False, configure=None,
+            check=PoolFalso.check_connection if configuracion['CONN_HEALTH_CHECKS'] else None,
+            **configuracion['OPTIONS']['pool'],
+        )
+        self.assertIs(pool.check, PoolFalso.check_connection)
+        self.assertEqual(pool.opciones['max_size'], 4)
+
+    def test_benchmark_cuenta_conexiones_abiertas(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('SQLite en memoria nunca cierra la conexión')
+        abiertas = {}
+        for modo, max_age in (('por_peticion', 0), ('persistente', 60)):
+            with mock.patch.dict(connection.settings_dict, CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=True):
+                salida = io.StringIO()
+                call_command(
+                    'benchmark_conexiones', '--medir', '--peticiones', '6', '--concurrencia', '1',
+                    '--json', '-', stdout=salida,
+                )
+            resultado = json.loads(salida.getvalue())[0]
+            self.assertEqual((resultado['modo'], resultado['errores']), (modo, 0))
+            abiertas[modo] = resultado['conexiones_abiertas']
+        self.assertEqual(abiertas, {'por_peticion': 6, 'persistente': 0})
+
+
+class BusquedaProyectosTests(MediaTemporalMixin, TestCase):
+    """Índice de texto completo (FTS5 en SQLite) y /proyectos/buscar/"""
+
+    def setUp(self):
+        super().setUp()
+        self.tienda = crear_proyecto(
+            titulo='Tienda en línea', descripcion='Carrito de compras y pagos', tecnologias=('Django', 'Stripe'),
+        )
+        self.inventario = crear_proyecto(
+            titulo='Panel de inventario', descripcion='Reportes de la tienda física', tecnologias=('Flask',),
+        )
+        self.api = crear_proyecto(
+            titulo='API de clima', descripcion='Pronósticos por ciudad', tecnologias=('FastAPI',),
+        )
+
+    def test_usa_fts5_en_sqlite(self):
+        self.assertIsInstance(busqueda.backend(), busqueda.BusquedaSqlite)
+
+    def test_titulo_pesa_mas_que_la_descripcion(self):
+        self.assertEqual(busqueda.buscar('tienda'), [self.tienda.pk, self.inventario.pk])
+
+    def test_prefijos_acentos_y_tecnologias(self):
+        self.assertEqual(busqueda.buscar('PRONOSTICO'), [self.api.pk])
+        self.assertEqual(busqueda.buscar('strip'), [self.tienda.pk])
+        self.assertEqual(busqueda.buscar('tienda flask'), [self.inventario.pk])
+        self.assertEqual(busqueda.buscar('" OR *'), [])
+        self.assertEqual(busqueda.buscar('!!!'), [])
+
+    def test_indice_sigue_los_cambios(self):
+        self.api.titulo = 'Tienda del clima'
+        self.api.save()
+        self.assertIn(self.api.pk, busqueda.buscar('tienda'))
+
+        self.inventario.tecnologias.add(*Tecnologia.desde_nombres(['Vue']))
+        self.assertEqual(busqueda.buscar('vue'), [self.inventario.pk])
+        Tecnologia.objects.filter(slug='vue').get().proyectos.clear()
+        self.assertEqual(busqueda.buscar('vue'), [])
+
+        stripe = Tecnologia.objects.get(slug='stripe')
+        stripe.nombre = 'Transbank'
+        stripe.save()
+        self.assertEqual(busqueda.buscar('transbank'), [self.tienda.pk])
+        stripe.delete()
+        self.assertEqual(busqueda.buscar('transbank'), [])
+
+        pk = self.tienda.pk
+        self.tienda.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {busqueda.TABLA_FTS} WHERE rowid = %s', [pk])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_carga_masiva_se_indexa(self):
+        call_command('sembrar_datos', '--proyectos', '5', '--capturas', '0', '--habilidades', '0',
+                     '--contactos', '0', stdout=io.StringIO())
+        self.assertEqual(len(busqueda.buscar('benchmark')), 5)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {busqueda.TABLA_FTS}')
+        salida = io.StringIO()
+        call_command('reindexar_busqueda', stdout=salida)
+        self.assertIn('8 proyecto(s)', salida.getvalue())
+        self.assertEqual(len(busqueda.buscar('benchmark')), 5)
+
+    def test_pagina_ordena_por_relevancia_y_solo_activos(self):
+        Proyecto.objects.filter(pk=self.api.pk).update(activo=False)
+        respuesta = self.client.get(reverse('buscar_proyectos'), {'q': '  Tienda '})
+        self.assertEqual(respuesta.status_code, 200)
+        contenido = respuesta.content.decode()
+        self.assertLess(contenido.index('Tienda en línea'), contenido.index('Panel de inventario'))
+        self.assertEqual(respuesta.context['consulta'], 'tienda')
+
+        respuesta = self.client.get(reverse('buscar_proyectos'), {'q': 'clima'})
+        self.assertContains(respuesta, 'No hay proyectos que coincidan')
+
+    def test_resultados_cacheados_sin_consultas(self):
+        url = reverse('buscar_proyectos')
+        self.client.get(url, {'q': 'tienda'})
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(url, {'q': 'Tienda'})
+        self.assertContains(respuesta, 'Panel de inventario')
+
+    def test_busqueda_simple_sin_indice(self):
+        with mock.patch.object(busqueda, 'backend', return_value=busqueda.BusquedaSimple()):
+            self.assertEqual(busqueda.buscar('tienda'), [self.tienda.pk, self.inventario.pk])
+            self.assertEqual(busqueda.buscar('stripe'), [self.tienda.pk])
+            self.assertEqual(list(busqueda.filtrar(Proyecto.objects.all(), 'reportes')), [self.inventario])
+
+    def test_admin_usa_el_indice(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.force_login(admin)
+        respuesta = self.client.get(reverse('admin:main_proyecto_changelist'), {'q': 'pronosticos'})
+        self.assertEqual(list(respuesta.context['cl'].result_list), [self.api])
+
+
+class BandejaContactosTests(TestCase):
+    """Admin de mensajes con muchas filas: conteo estimado, bandeja por cursor, archivo y CSV"""
+
+    def setUp(self):
+        cache.clear()
+        ahora = timezone.now()
+        Contacto.objects.bulk_create([
+            Contacto(nombre=f'Persona {i}', email=f'p{i}@example.com', mensaje=f'Mensaje {i}', leido=i % 2 == 0)
+            for i in range(12)
+        ])
+        # Fechas distintas (y dos iguales, para que desempate el id)
+        for i, contacto in enumerate(Contacto.objects.order_by('id')):
+            Contacto.objects.filter(pk=contacto.pk).update(fecha_envio=ahora - timedelta(days=30 * min(i, 10)))
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.force_login(admin)
+
+    def test_conteo_estimado_sin_count(self):
+        self.assertEqual(conteo_estimado(Contacto.objects.all()), 12)
+        self.assertIsNone(conteo_estimado(Contacto.objects.filter(leido=True)))
+        with override_settings(ADMIN_CONTEO_EXACTO_HASTA=5), CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(PaginadorEstimado(Contacto.objects.all(), 5).count, 12)
+        self.assertFalse(any('COUNT(' in consulta['sql'] for consulta in consultas.captured_queries))
+
+    def test_listado_sin_date_hierarchy_ni_conteo_total(self):
+        respuesta = self.client.get(reverse('admin:main_contacto_changelist'), {'leido__exact': '0'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNone(respuesta.context['cl'].date_hierarchy)
+        self.assertEqual(respuesta.context['cl'].result_count, 6)
+        self.assertIsNone(respuesta.context['cl'].full_result_count)
+        self.assertContains(respuesta, reverse('admin:main_contacto_bandeja'))
+
+    def test_bandeja_recorre_todo_por_cursor(self):
+        vistos = []
+        parametros = {}
+        with override_settings(CONTACTOS_POR_PAGINA=5):
+            while True:
+                respuesta = self.client.get(reverse('admin:main_contacto_bandeja'), parametros)
+                self.assertEqual(respuesta.status_code, 200)
+                pagina = respuesta.context['pagina']
+                vistos += [contacto.pk for contacto in pagina.objetos]
+                if not pagina.siguiente_cursor:
+                    break
+                parametros = {'cursor': pagina.siguiente_cursor}
+        esperados = list(Contacto.objects.order_by('-fecha_envio', '-id').values_list('pk', flat=True))
+        self.assertEqual(vistos, esperados)
+
+        respuesta = self.client.get(reverse('admin:main_contacto_bandeja'), {'leido': '0'})
+        self.assertTrue(all(not contacto.leido for contacto in respuesta.context['pagina'].objetos))
+        respuesta = self.client.get(reverse('admin:main_contacto_bandeja'), {'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_archivar_por_lotes(self):
+        antiguos = set(
+            Contacto.objects.filter(leido=True, fecha_envio__lt=timezone.now() - timedelta(days=180))
+            .values_list('pk', flat=True)
+        )
+        self.assertTrue(antiguos)
+        salida = io.StringIO()
+        call_command('archivar_contactos', '--dias', '180', '--lote', '2', stdout=salida)
+
+        self.assertEqual(set(ContactoArchivado.objects.values_list('pk', flat=True)), antiguos)
+        self.assertFalse(Contacto.objects.filter(pk__in=antiguos).exists())
+        self.assertEqual(Contacto.objects.count(), 12 - len(antiguos))
+        archivado = ContactoArchivado.objects.first()
+        self.assertEqual(archivado.mensaje, f'Mensaje {archivado.nombre.split()[-1]}')
+        self.assertIn(f'{len(antiguos)} mensaje(s) archivado(s)', salida.getvalue())
+
+    def test_exportar_csv_en_streaming(self):
+        Contacto.objects.filter(pk=Contacto.objects.order_by('id')[0].pk).update(mensaje='=HYPERLINK("x")')
+        with mock.patch('main.exportacion.FILAS_POR_TROZO', 5):
+            respuesta = self.client.post(reverse('admin:main_contacto_changelist'), {
+                'action': 'exportar_csv', 'select_across': '1', 'index': '0',
+                '_selected_action': Contacto.objects.values_list('pk', flat=True)[:1],
+            })
+            self.assertTrue(respuesta.streaming)
+            trozos = list(respuesta.streaming_content)
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertGreater(len(trozos), 1)
+        lineas = b''.join(trozos).decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[0], 'id,nombre,email,mensaje,fecha_envio,leido')
+        self.assertEqual(len(lineas), 13)
+        # Las celdas que una planilla tomaría como fórmula van con ' adelante
+        self.assertIn('"\'=HYPERLINK(""x"")"', lineas[1])
+
+
+@override_settings(IMAGENES_ANCHOS=(320,), IMAGENES_FORMATOS=('webp',), IMAGENES_EN_SEGUNDO_PLANO=False)
+class MediaPorContenidoTests(MediaTemporalMixin, TestCase):
+    """Media con nombre por contenido y conteo de referencias"""
+
+    def test_misma_imagen_un_solo_archivo(self):
+        primero = crear_proyecto(titulo='A', imagen_principal=imagen_de_prueba('a.png'))
+        segundo = crear_proyecto(titulo='B', imagen_principal=imagen_de_prueba('B.PNG'))
+        nombre = primero.imagen_principal.name
+        self.assertEqual(segundo.imagen_principal.name, nombre)
+        self.assertRegex(nombre, r'^contenido/([0-9a-f]{2})/\1[0-9a-f]{62}\.png$')
+        self.assertEqual(len(list(Path(self.media_root).rglob('*.png'))), 1)
+        archivo = ArchivoMedia.objects.get(nombre=nombre)
+        self.assertEqual(archivo.referencias, 2)
+        self.assertEqual(archivo.tamano, default_storage.size(nombre))
+
+    def test_borra_el_archivo_cuando_nadie_lo_usa(self):
+        primero = crear_proyecto(titulo='A', imagen_principal=imagen_de_prueba())
+        segundo = crear_proyecto(titulo='B', imagen_principal=imagen_de_prueba())
+        nombre = primero.imagen_principal.name
+        variantes = list(primero.variantes_imagen['formatos']['webp'].values())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.delete()
+        self.assertEqual(ArchivoMedia.objects.get(nombre=nombre).referencias, 1)
+        self.assertTrue(default_storage.exists(nombre))
+        self.assertTrue(all(default_storage.exists(variante) for variante in variantes))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.imagen_principal = imagen_de_prueba(color='blue')
+            segundo.save()
+        self.assertFalse(ArchivoMedia.objects.filter(nombre=nombre).exists())
+        self.assertFalse(default_storage.exists(nombre))
+        self.assertFalse(any(default_storage.exists(variante) for variante in variantes))
+        self.assertEqual(ArchivoMedia.objects.get().nombre, segundo.imagen_principal.name)
+
+    def test_no_borra_si_se_vuelve_a_usar_antes_del_commit(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        nombre = proyecto.imagen_principal.name
+        with self.captureOnCommitCallbacks(execute=True):
+            proyecto.delete()
+            crear_proyecto(titulo='Otro', imagen_principal=imagen_de_prueba())
+        self.assertTrue(default_storage.exists(nombre))
+        self.assertEqual(ArchivoMedia.objects.get(nombre=nombre).referencias, 1)
+
+    def test_deduplicar_media_unifica_archivos_anteriores(self):
+        contenido = imagen_de_prueba().read()
+        for ruta in ('proyectos/uno.png', 'proyectos/dos.png', 'proyectos/capturas/tres.png'):
+            default_storage.save(ruta, ContentFile(contenido))
+        primero = crear_proyecto(titulo='A')
+        segundo = crear_proyecto(titulo='B')
+        Proyecto.objects.filter(pk=primero.pk).update(imagen_principal='proyectos/uno.png')
+        Proyecto.objects.filter(pk=segundo.pk).update(imagen_principal='proyectos/dos.png')
+        ImagenProyecto.objects.bulk_create([
+            ImagenProyecto(proyecto=primero, imagen='proyectos/capturas/tres.png', descripcion='c')
+        ])
+        # El de crear_proyecto ya no lo usa nadie: sobra
+        sin_uso = ArchivoMedia.objects.get().nombre
+
+        salida = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('deduplicar_media', stdout=salida)
+
+        nombres = set(Proyecto.objects.values_list('imagen_principal', flat=True))
+        nombres |= set(ImagenProyecto.objects.values_list('imagen', flat=True))
+        nombre, = nombres
+        self.assertTrue(default_storage.exists(nombre))
+        self.assertEqual(ArchivoMedia.objects.get(nombre=nombre).referencias, 3)
+        self.assertFalse(default_storage.exists('proyectos/uno.png'))
+        self.assertFalse(default_storage.exists(sin_uso))
+        self.assertIn('3 archivo(s) con nombre anterior, 1 contenido(s) distinto(s): 2 duplicado(s)', salida.getvalue())
+        primero.refresh_from_db()
+        self.assertIn('320', primero.variantes_imagen['formatos']['webp'])
+
+
+class ApiTests(MediaTemporalMixin, TestCase):
+    """API JSON de solo lectura (/api/v1/)"""
+
+    def setUp(self):
+        super().setUp()
+        Perfil.objects.create(descripcion='Hola')
+        self.proyecto = crear_proyecto(titulo='Tienda', tecnologias=('Python', 'Django'), destacado=True)
+        ImagenProyecto.objects.create(proyecto=self.proyecto, imagen=imagen_de_prueba('login.png'), descripcion='Login')
+        crear_proyecto(titulo='Oculto', activo=False)
+        Habilidad.objects.create(nombre='Django', tipo='tecnica', icono='fab fa-python')
+
+    def test_proyectos_con_tecnologias_y_capturas(self):
+        respuesta = self.client.get(reverse('api_proyectos'))
+        self.assertEqual(respuesta['Content-Type'], 'application/json')
+        proyecto, = respuesta.json()['proyectos']
+        self.assertEqual(proyecto['titulo'], 'Tienda')
+        self.assertEqual([t['slug'] for t in proyecto['tecnologias']], ['django', 'python'])
+        self.assertEqual(proyecto['capturas'][0]['descripcion'], 'Login')
+        self.assertTrue(proyecto['imagen']['url'].startswith(settings.MEDIA_URL))
+
+    def test_detalle_habilidades_y_perfil(self):
+        respuesta = self.client.get(reverse('api_proyecto', args=[self.proyecto.pk]))
+        self.assertEqual(respuesta.json()['titulo'], 'Tienda')
+        self.assertEqual(self.client.get(reverse('api_habilidades')).json()['habilidades'][0]['nombre'], 'Django')
+        self.assertEqual(self.client.get(reverse('api_perfil')).json()['descripcion'], 'Hola')
+        oculto = Proyecto.objects.get(titulo='Oculto')
+        self.assertEqual(self.client.get(reverse('api_proyecto', args=[oculto.pk])).status_code, 404)
+
+    def test_cacheado_responde_sin_consultas_y_con_304(self):
+        etag = self.client.get(reverse('api_proyectos'))['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('api_proyectos'))['ETag'], etag)
+            respuesta = self.client.get(reverse('api_proyectos'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_guardar_invalida_y_cambia_el_etag(self):
+        anterior = self.client.get(reverse('api_proyectos'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proyecto.titulo = 'Tienda online'
+            self.proyecto.save()
+        respuesta = self.client.get(reverse('api_proyectos'), HTTP_IF_NONE_MATCH=anterior['ETag'])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['proyectos'][0]['titulo'], 'Tienda online')
+        self.assertNotEqual(respuesta['ETag'], anterior['ETag'])
+
+    def test_seleccion_de_campos(self):
+        respuesta = self.client.get(reverse('api_proyectos'), {'campos': 'id,titulo'})
+        self.assertEqual(respuesta.json(), {'proyectos': [{'id': self.proyecto.pk, 'titulo': 'Tienda'}]})
+        self.assertNotEqual(respuesta['ETag'], self.client.get(reverse('api_proyectos'))['ETag'])
+        respuesta = self.client.get(reverse('api_perfil'), {'campos': 'apodo'})
+        self.assertEqual(respuesta.json(), {'apodo': 'tori'})
+        respuesta = self.client.get(reverse('api_proyectos'), {'campos': 'titulo,clave'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('clave', respuesta.json()['error'])
+
+    def test_solo_lectura(self):
+        self.assertEqual(self.client.post(reverse('api_proyectos')).status_code, 405)
+
+
+class DimensionesImagenTests(MediaTemporalMixin, TestCase):
+    """Ancho, alto y miniatura borrosa guardados al subir la imagen"""
+
+    def test_se_miden_al_subir(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba(ancho=800, alto=500))
+        self.assertEqual((proyecto.imagen_ancho, proyecto.imagen_alto), (800, 500))
+        self.assertRegex(proyecto.imagen_lqip, r'^data:image/(webp|jpeg);base64,')
+        self.assertLess(len(proyecto.imagen_lqip), 1000)
+        captura = ImagenProyecto.objects.create(
+            proyecto=proyecto, imagen=imagen_de_prueba(ancho=300, alto=600), descripcion='Vertical'
+        )
+        self.assertEqual((captura.ancho, captura.alto), (300, 600))
+
+    def test_cargar_la_fila_no_abre_el_archivo(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        Proyecto.objects.filter(pk=proyecto.pk).update(imagen_ancho=None, imagen_alto=None)
+        default_storage.delete(proyecto.imagen_principal.name)
+        with mock.patch('main.models.medir_imagen') as medir:
+            proyecto = Proyecto.objects.get(pk=proyecto.pk)
+            proyecto.refresh_from_db()
+            proyecto.save()
+        medir.assert_not_called()
+        self.assertIsNone(proyecto.imagen_ancho)
+
+    def test_transparencia_sin_miniatura(self):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (40, 40), (0, 0, 0, 0)).save(buffer, 'PNG')
+        proyecto = crear_proyecto(imagen_principal=SimpleUploadedFile('logo.png', buffer.getvalue()))
+        self.assertEqual((proyecto.imagen_ancho, proyecto.imagen_lqip), (40, ''))
+
+    def test_templates_con_dimensiones_y_lqip(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba(ancho=800, alto=500), destacado=True)
+        ImagenProyecto.objects.create(proyecto=proyecto, imagen=imagen_de_prueba(ancho=640, alto=480), descripcion='a')
+        tarjeta = self.client.get(reverse('todos_proyectos')).content.decode()
+        self.assertIn('width="800" height="500" style="background: center / cover no-repeat url(data:image/', tarjeta)
+        modal = self.client.get(reverse('proyecto_modal', args=[proyecto.pk])).content.decode()
+        self.assertRegex(modal, r'width="640" height="480"\s+style="background: [^"]*url\(data:image/')
+
+    def test_completar_dimensiones_de_imagenes_anteriores(self):
+        primero = crear_proyecto(titulo='A', imagen_principal=imagen_de_prueba(ancho=320, alto=200))
+        segundo = crear_proyecto(titulo='B', imagen_principal=imagen_de_prueba(ancho=320, alto=200))
+        sin_archivo = crear_proyecto(titulo='C', imagen_principal=imagen_de_prueba(color='blue'))
+        Proyecto.objects.update(imagen_ancho=None, imagen_alto=None, imagen_lqip='')
+        default_storage.delete(sin_archivo.imagen_principal.name)
+
+        salida, errores = io.StringIO(), io.StringIO()
+        with self.assertLogs('main.imagenes', 'WARNING'):
+            call_command('completar_dimensiones', procesos=0, stdout=salida, stderr=errores)
+        for proyecto in (primero, segundo):
+            proyecto.refresh_from_db()
+            self.assertEqual((proyecto.imagen_ancho, proyecto.imagen_alto), (320, 200))
+            self.assertTrue(proyecto.imagen_lqip)
+        # Los dos primeros comparten el archivo: se mide una vez
+        self.assertIn('Proyectos: 1/2 archivo(s) medido(s)', salida.getvalue())
+        self.assertIn(sin_archivo.imagen_principal.name, errores.getvalue())
+
+
+class ExportarSitioTests(MediaTemporalMixin, TestCase):
+    """Exportación del sitio a HTML estático"""
+
+    def setUp(self):
+        super().setUp()
+        self.destino = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.destino, ignore_errors=True)
+        Perfil.objects.create(descripcion='Hola')
+        Habilidad.objects.create(nombre='Django', tipo='tecnica')
+        self.proyectos = [crear_proyecto(titulo=f'Proyecto {i}', destacado=i == 0) for i in range(12)]
+        for proyecto in self.proyectos[:2]:
+            ImagenProyecto.objects.create(
+                proyecto=proyecto, imagen=imagen_de_prueba('captura.png', 40, 30), descripcion='Captura'
+            )
+
+    def exportar(self, *args):
+        salida = io.StringIO()
+        call_command('exportar_sitio', str(self.destino), *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_exporta_paginas_estaticos_y_media(self):
+        self.assertIn('Páginas: 4 generada(s)', self.exportar())
+
+        index = (self.destino / 'index.html').read_text()
+        proyectos = (self.destino / 'proyectos' / 'index.html').read_text()
+        modal = self.destino / 'proyectos' / str(self.proyectos[0].pk) / 'modal' / 'index.html'
+        self.assertTrue(modal.exists())
+        self.assertTrue((self.destino / 'index.html.gz').exists())
+
+        # Sin paginación: todos los proyectos en una sola página estática
+        self.assertEqual(proyectos.count('class="card project-card"'), 12)
+        self.assertNotIn('data-cargar-mas', proyectos)
+
+        # Estáticos y media con huella, y presentes en el directorio exportado
+        hoja = re.search(r'/static/(css/styles\.[0-9a-f]{12}\.css)', index).group(1)
+        self.assertTrue((self.destino / 'static' / hoja).exists())
+        self.assertTrue((self.destino / 'static' / (hoja + '.gz')).exists())
+        imagenes = re.findall(r'/media/([^\s"]+\.[0-9a-f]{12}\.png)', proyectos)
+        self.assertTrue(imagenes)
+        for imagen in imagenes:
+            self.assertTrue((self.destino / 'media' / imagen).exists())
+        self.assertNotRegex(proyectos, r'/media/proyectos/prueba[^.]*\.png')
+
+    @override_settings(DEBUG=True)
+    def test_estaticos_con_huella_aunque_debug_este_activo(self):
+        self.exportar()
+        index = (self.destino / 'index.html').read_text()
+        self.assertRegex(index, r'/static/css/styles\.[0-9a-f]{12}\.css')
+        self.assertRegex(index, r'/static/js/script\.[0-9a-f]{12}\.js')
+        self.assertNotIn('/static/css/styles.css', index)
+
+    def test_incremental(self):
+        self.exportar()
+        self.assertIn('0 generada(s), 4 sin cambios', self.exportar())
+
+        # Editar un proyecto regenera las listas y su modal, no el modal del otro
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proyectos[0].descripcion = 'Nueva descripción'
+            self.proyectos[0].save()
+        self.assertIn('3 generada(s), 1 sin cambios', self.exportar())
+        self.assertIn('Nueva descripción', (self.destino / 'index.html').read_text())
+
+        # Sin capturas, el modal del proyecto desaparece
+        self.proyectos[1].imagenes.all().delete()
+        self.assertIn('2 generada(s), 1 sin cambios, 1 eliminada(s)', self.exportar())
+        self.assertFalse((self.destino / 'proyectos' / str(self.proyectos[1].pk)).exists())
+
+        self.assertIn('3 generada(s)', self.exportar('--completo'))
+
+    def test_index_se_regenera_antes_de_que_venza_la_marca(self):
+        self.exportar()
+        marca = re.search(r'name="marca" value="([^"]+)"', (self.destino / 'index.html').read_text()).group(1)
+        with mock.patch(
+            'main.management.commands.exportar_sitio.periodo_marca', return_value=periodo_marca() + 1
+        ):
+            salida = self.exportar()
+        self.assertIn('1 generada(s), 3 sin cambios', salida)
+        self.assertIn('/contacto/', salida)
+        nueva = re.search(r'name="marca" value="([^"]+)"', (self.destino / 'index.html').read_text()).group(1)
+        self.assertNotEqual(nueva, marca)
+
+
+@override_settings(STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'])
+class EstaticosTests(TestCase):
+    """collectstatic con huella, minificación y versiones precomprimidas"""
+
+    def setUp(self):
+        cache.clear()
+        self.raiz = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.raiz, ignore_errors=True)
+        ajustes = override_settings(STATIC_ROOT=self.raiz)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.manifiesto = json.loads((self.raiz / 'staticfiles.json').read_text())['paths']
+
+    def test_hojas_minificadas_con_huella_y_comprimidas(self):
+        for original in ('css/styles.css', 'js/script.js'):
+            final = self.raiz / self.manifiesto[original]
+            self.assertRegex(final.name, r'\.[0-9a-f]{12}\.(css|js)$')
+            self.assertLess(final.stat().st_size, (self.raiz / original).stat().st_size)
+            self.assertEqual(gzip.decompress(final.with_name(final.name + '.gz').read_bytes()), final.read_bytes())
+        self.assertNotIn('/*', (self.raiz / self.manifiesto['css/styles.css']).read_text())
+
+    def test_templates_usan_el_nombre_con_huella(self):
+        respuesta = self.client.get(reverse('index'))
+        self.assertContains(respuesta, settings.STATIC_URL + self.manifiesto['css/styles.css'])
+        self.assertContains(respuesta, settings.STATIC_URL + self.manifiesto['js/script.js'])
+
+    def test_sirve_version_comprimida_con_cache_inmutable(self):
+        url = settings.STATIC_URL + self.manifiesto['css/styles.css']
+        respuesta = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(respuesta['Content-Type'], 'text/css')
+        self.assertIn('immutable', respuesta['Cache-Control'])
+        self.assertEqual(respuesta['Vary'], 'Accept-Encoding')
+        cuerpo = gzip.decompress(b''.join(respuesta.streaming_content))
+        self.assertEqual(cuerpo, (self.raiz / self.manifiesto['css/styles.css']).read_bytes())
+
+        sin_compresion = self.client.get(url)
+        self.assertFalse(sin_compresion.has_header('Content-Encoding'))
+
+    def test_respeta_las_codificaciones_rechazadas(self):
+        url = settings.STATIC_URL + self.manifiesto['css/styles.css']
+        for cabecera in ('gzip;q=0', 'gzip; q=0.0, deflate', 'x-gzip', '*;q=0', 'identity'):
+            respuesta = self.client.get(url, HTTP_ACCEPT_ENCODING=cabecera)
+            self.assertFalse(respuesta.has_header('Content-Encoding'), cabecera)
+        for cabecera in ('GZIP;q=0.5', 'deflate, *', 'br;q=0, gzip;q=1'):
+            respuesta = self.client.get(url, HTTP_ACCEPT_ENCODING=cabecera)
+            self.assertIn(respuesta['Content-Encoding'], ('gzip', 'br'), cabecera)
+
+    def test_nombre_sin_huella_se_revalida(self):
+        respuesta = self.client.get(settings.STATIC_URL + 'css/styles.css')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('immutable', respuesta['Cache-Control'])
+        repetida = self.client.get(
+            settings.STATIC_URL + 'css/styles.css', HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']
+        )
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(self.client.get(settings.STATIC_URL + 'css/no-existe.css').status_code, 404)
+        self.assertEqual(self.client.get(settings.STATIC_URL + '../manage.py').status_code, 400)
+
+    def test_minificadores_respetan_textos(self):
+        css = 'a::after {\n  content: "a  ,  b"; /* nota */\n  margin: 0 auto;\n}\n'
+        self.assertEqual(minificar_css(css), 'a::after{content: "a  ,  b";margin: 0 auto;}')
+        js = 'const a = 1;\n  // comentario\nconst b = `uno\n    dos`;\n'
+        self.assertEqual(minificar_js(js), 'const a = 1;\nconst b = `uno\n    dos`;\n')
+
+
+class PesoBloqueante(HTMLParser):
+    """Bytes de CSS que el navegador debe tener antes del primer pintado"""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes = 0
+        self.hojas = []
+        self.en_noscript = self.en_style = False
+
+    def handle_starttag(self, tag, attrs):
+        atributos = dict(attrs)
+        if tag == 'noscript':
+            self.en_noscript = True
+        elif tag == 'style':
+            self.en_style = True
+        elif tag == 'link' and atributos.get('rel') == 'stylesheet' and not self.en_noscript:
+            self.hojas.append(atributos['href'])
+            ruta = finders.find(atributos['href'].removeprefix(settings.STATIC_URL))
+            if ruta:
+                self.bytes += Path(ruta).stat().st_size
+
+    def handle_endtag(self, tag):
+        if tag == 'noscript':
+            self.en_noscript = False
+        elif tag == 'style':
+            self.en_style = False
+
+    def handle_data(self, data):
+        if self.en_style:
+            self.bytes += len(data.encode('utf-8'))
+
+
+@override_settings(CSS_CRITICO_FUENTES=['css/styles.css'])
+class CssCriticoTests(MediaTemporalMixin, TestCase):
+    """CSS de la primera pantalla en línea y hojas completas diferidas"""
+
+    def setUp(self):
+        super().setUp()
+        self.directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        self.salida = self.directorio / 'partials' / '_css_critico.html'
+        for i in range(6):
+            crear_proyecto(titulo=f'Proyecto {i}', destacado=i < 4)
+
+    def generar(self, *args):
+        call_command(
+            'generar_css_critico', '--salida', str(self.salida), *args,
+            stdout=io.StringIO(), stderr=io.StringIO()
+        )
+        return self.salida.read_text()
+
+    def peso_bloqueante(self, parcial):
+        """Renderiza el index con el parcial dado y mide el CSS que bloquea el primer pintado"""
+        self.salida.parent.mkdir(parents=True, exist_ok=True)
+        self.salida.write_text(parcial)
+        plantillas = [{**settings.TEMPLATES[0], 'DIRS': [self.directorio, *settings.TEMPLATES[0]['DIRS']]}]
+        with override_settings(TEMPLATES=plantillas):
+            cache.clear()
+            cabecera = self.client.get(reverse('index')).content.decode().split('</head>')[0]
+        lector = PesoBloqueante()
+        lector.feed(cabecera)
+        return lector
+
+    def test_extrae_solo_lo_visible(self):
+        parcial = self.generar()
+        critico = re.search(r'<style>(.*)</style>', parcial).group(1)
+        for selector in ('.navbar-personalizado{', '.hero-section{', '.project-card{', '.form-control{', '@keyframes spinBlob'):
+            self.assertIn(selector, critico)
+        # Habilidades, contacto y footer quedan bajo el pliegue (el buscador de
+        # /proyectos/ sí está arriba: .form-control es crítico)
+        for selector in ('.skill-card', '.social-link', 'footer{', '.contacto-ilustracion'):
+            self.assertNotIn(selector, critico)
+        self.assertIn('<link rel="preload" as="style" href="{% static \'css/styles.css\' %}"', parcial)
+        self.assertIn('<noscript>', parcial)
+
+    def test_menos_bytes_bloqueantes_en_el_primer_pintado(self):
+        fuentes = settings.CSS_CRITICO_FUENTES + settings.CSS_DIFERIDAS
+        antes = self.peso_bloqueante('{% load static %}' + ''.join(
+            f'<link rel="stylesheet" href="{href(fuente)}">' for fuente in fuentes
+        ))
+        despues = self.peso_bloqueante(self.generar())
+
+        self.assertIn(static('css/styles.css'), antes.hojas)
+        self.assertEqual(despues.hojas, [])
+        self.assertLess(despues.bytes, antes.bytes)
+
+    def test_comprobar(self):
+        self.generar()
+        self.generar('--comprobar')
+        self.salida.write_text(self.salida.read_text().replace('.hero-section', '.otro'))
+        with self.assertRaises(CommandError):
+            self.generar('--comprobar')
+
+
+class ContactoTests(TestCase):
+    """Formulario de contacto separado del index cacheable"""
+
+    def setUp(self):
+        cache.clear()
+        # Marca de un formulario cargado hace un minuto (pasa la trampa de tiempo)
+        self.datos = {
+            'nombre': 'Ana', 'email': 'ana@example.com', 'mensaje': 'Hola',
+            'marca': crear_marca(timezone.now().timestamp() - 60),
+        }
+
+    def enviar(self, **cambios):
+        return self.client.post(
+            reverse('contacto'), {**self.datos, **cambios}, headers={'Accept': 'application/json'}
+        )
+
+    def test_index_no_usa_sesion_ni_cookies(self):
+        respuesta = self.client.get(reverse('index'))
+        self.assertEqual(len(respuesta.cookies), 0)
+        self.assertNotIn('Cookie', respuesta.get('Vary', ''))
+        self.assertIn('public', respuesta['Cache-Control'])
+
+    def test_index_rechaza_post(self):
+        respuesta = self.client.post(reverse('index'), self.datos)
+        self.assertEqual(respuesta.status_code, 405)
+
+    def test_post_normal_redirige_con_mensaje(self):
+        respuesta = self.client.post(reverse('contacto'), self.datos, follow=True)
+        self.assertEqual(Contacto.objects.count(), 1)
+        self.assertContains(respuesta, 'Mensaje enviado correctamente')
+
+    def test_post_normal_invalido_muestra_error(self):
+        respuesta = self.client.post(reverse('contacto'), {'nombre': 'Ana', 'marca': self.datos['marca']})
+        self.assertContains(respuesta, 'Hubo un error', status_code=400)
+        self.assertEqual(Contacto.objects.count(), 0)
+
+    def test_index_incluye_la_marca(self):
+        respuesta = self.client.get(reverse('index'))
+        marca = re.search(r'name="marca" value="([^"]+)"', respuesta.content.decode()).group(1)
+        self.assertLess(edad_marca(marca), 5)
+        self.assertEqual(self.client.get(reverse('contacto')).status_code, 405)
+
+    def test_etag_del_index_cambia_con_el_periodo_de_la_marca(self):
+        etag = self.client.get(reverse('index'))['ETag']
+        with mock.patch('main.antispam.periodo_marca', return_value=0):
+            respuesta = self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(f'value="{respuesta.context["marca"]}"', respuesta.content.decode())
+
+    def test_envio_json_sin_token_csrf(self):
+        cliente = Client(enforce_csrf_checks=True)
+        respuesta = cliente.post(reverse('contacto'), json.dumps(self.datos), content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.json()['ok'])
+        self.assertEqual(Contacto.objects.count(), 1)
+
+    def test_post_normal_sin_javascript_ni_cookies(self):
+        # El index no entrega cookie ni token: el POST del navegador llega sin ellos
+        respuesta = Client(enforce_csrf_checks=True).post(reverse('contacto'), self.datos)
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(Contacto.objects.count(), 1)
+
+    def test_json_que_no_es_objeto(self):
+        for cuerpo in ('[1, 2]', '"hola"', '3', 'null', '{'):
+            respuesta = self.client.post(reverse('contacto'), cuerpo, content_type='application/json')
+            self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(Contacto.objects.count(), 0)
+
+    def test_envio_json_invalido_devuelve_errores(self):
+        respuesta = self.enviar(email='')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('email', respuesta.json()['errores'])
+
+    def test_trampa_descarta_sin_avisar(self):
+        with self.assertNumQueries(0):
+            respuesta = self.enviar(sitio_web='https://spam.example')
+        self.assertTrue(respuesta.json()['ok'])
+        self.assertEqual(Contacto.objects.count(), 0)
+
+    def test_envio_muy_rapido_se_puede_reintentar(self):
+        # Autocompletado + Enter apenas cargó la página: error, no un falso éxito
+        marca = crear_marca()
+        with self.assertNumQueries(0):
+            respuesta = self.enviar(marca=marca)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(respuesta.json()['ok'])
+        self.assertNotIn('marca', respuesta.json())
+
+        # Sin JavaScript vuelve el formulario con lo escrito y la misma marca
+        respuesta = self.client.post(reverse('contacto'), {**self.datos, 'marca': marca, 'mensaje': 'Hola Tori'})
+        self.assertContains(respuesta, 'demasiado rápido', status_code=400)
+        self.assertContains(respuesta, 'Hola Tori', status_code=400)
+        self.assertEqual(respuesta.context['marca'], marca)
+        self.assertEqual(Contacto.objects.count(), 0)
+
+        with mock.patch('main.antispam.timezone.now', return_value=timezone.now() + timedelta(seconds=60)):
+            self.assertTrue(self.enviar(marca=marca).json()['ok'])
+        self.assertEqual(Contacto.objects.count(), 1)
+
+    def test_marca_falsa_o_expirada(self):
+        vieja = crear_marca(timezone.now().timestamp() - settings.CONTACTO_MARCA_MAX_EDAD - 1)
+        for marca in ('', 'inventada', vieja, self.datos['marca'][:-2] + 'xx'):
+            respuesta = self.enviar(marca=marca)
+            self.assertEqual(respuesta.status_code, 400)
+            # La respuesta trae una marca nueva para reenviar
+            self.assertIsNotNone(edad_marca(respuesta.json()['marca']))
+        self.assertEqual(Contacto.objects.count(), 0)
+
+    def test_sin_javascript_marca_expirada_devuelve_el_formulario(self):
+        vieja = crear_marca(timezone.now().timestamp() - settings.CONTACTO_MARCA_MAX_EDAD - 1)
+        respuesta = self.client.post(reverse('contacto'), {**self.datos, 'marca': vieja})
+        self.assertContains(respuesta, 'expiró', status_code=400)
+        self.assertContains(respuesta, 'ana@example.com', status_code=400)
+        self.assertNotEqual(respuesta.context['marca'], vieja)
+        self.assertLess(edad_marca(respuesta.context['marca']), 5)
+
+    def test_duplicado_se_guarda_una_vez(self):
+        self.enviar()
+        with self.assertNumQueries(0):
+            respuesta = self.enviar(mensaje='  hola\n')
+        self.assertTrue(respuesta.json()['ok'])
+        self.assertEqual(Contacto.objects.count(), 1)
+
+    @override_settings(CONTACTO_LIMITE_IP=(2, 600))
+    def test_limite_por_ip(self):
+        self.enviar(mensaje='Uno')
+        self.enviar(mensaje='Dos', email='otra@example.com')
+        # Se corta antes de leer el formulario y sin tocar la base
+        with self.assertNumQueries(0):
+            respuesta = self.enviar(mensaje='Tres', email='tercera@example.com')
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertGreater(int(respuesta['Retry-After']), 0)
+        self.assertEqual(Contacto.objects.count(), 2)
+
+        # Otra IP no se ve afectada
+        respuesta = self.client.post(
+            reverse('contacto'), {**self.datos, 'mensaje': 'Cuatro'}, REMOTE_ADDR='10.0.0.2'
+        )
+        self.assertEqual(respuesta.status_code, 302)
+
+    @override_settings(CONTACTO_LIMITE_EMAIL=(1, 3600))
+    def test_limite_por_email(self):
+        self.enviar(mensaje='Uno')
+        respuesta = self.enviar(mensaje='Dos', email='ANA@example.com')
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertEqual(Contacto.objects.count(), 1)
+
+    @override_settings(CONTACTO_MENSAJE_MAX=50, CONTACTO_MAX_BYTES=1024)
+    def test_tamano_acotado(self):
+        self.assertIn('mensaje', self.enviar(mensaje='x' * 51).json()['errores'])
+        self.assertEqual(self.enviar(mensaje='x' * 2000).status_code, 413)
+        self.assertEqual(Contacto.objects.count(), 0)
+
+
+class BackendCaido(BaseEmailBackend):
+    """Servidor de correo que nunca responde"""
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP no disponible')
+
+
+class BackendSinConexion(BaseEmailBackend):
+    """Servidor de correo al que ni siquiera se puede conectar"""
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP inalcanzable')
+
+    def send_messages(self, email_messages):
+        return len(email_messages)
+
+
+@override_settings(NOTIFICACIONES_DESTINATARIOS=['tori@example.com'], NOTIFICACIONES_ESPERA=0)
+class NotificacionesContactoTests(TestCase):
+    """Avisos por email de mensajes nuevos, fuera del request"""
+
+    def setUp(self):
+        cache.clear()
+
+    def crear_mensajes(self, cantidad):
+        return [
+            Contacto.objects.create(nombre=f'Persona {i}', email=f'p{i}@example.com', mensaje=f'Mensaje {i}')
+            for i in range(cantidad)
+        ]
+
+    def enviar(self):
+        call_command('enviar_notificaciones', una_vez=True, stdout=io.StringIO())
+
+    def test_el_formulario_no_envia_emails(self):
+        datos = {
+            'nombre': 'Ana', 'email': 'ana@example.com', 'mensaje': 'Hola',
+            'marca': crear_marca(timezone.now().timestamp() - 60),
+        }
+        self.client.post(reverse('contacto'), datos)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(NotificacionContacto.objects.get().estado, 'pendiente')
+
+    def test_un_resumen_por_lote(self):
+        self.crear_mensajes(3)
+        self.enviar()
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, ['tori@example.com'])
+        self.assertIn('3 mensaje(s)', email.subject)
+        for i in range(3):
+            self.assertIn(f'Mensaje {i}', email.body)
+        self.assertEqual(NotificacionContacto.objects.filter(estado='enviada').count(), 3)
+
+        # Lo enviado no se vuelve a enviar
+        self.enviar()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_un_mensaje_responde_al_remitente(self):
+        self.crear_mensajes(1)
+        self.enviar()
+        self.assertEqual(mail.outbox[0].reply_to, ['p0@example.com'])
+
+    @override_settings(NOTIFICACIONES_ESPERA=60, NOTIFICACIONES_MAX_POR_RESUMEN=5)
+    def test_espera_para_juntar_mensajes(self):
+        self.crear_mensajes(2)
+        self.enviar()
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Pasada la espera sale todo junto; con el lote lleno no se espera
+        NotificacionContacto.objects.update(disponible_desde=timezone.now() - timedelta(seconds=61))
+        self.enviar()
+        self.assertEqual(len(mail.outbox), 1)
+        self.crear_mensajes(5)
+        self.enviar()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_no_devuelve_avisos_que_reclamo_otro_envio(self):
+        self.crear_mensajes(2)
+        primero = NotificacionContacto.objects.order_by('pk').first()
+
+        def otro_envio_gana_el_primero(modelo, ids):
+            ids = list(ids)
+            modelo.objects.filter(pk=primero.pk).update(estado='procesando')
+            return marcar_procesando(modelo, ids)
+
+        with mock.patch('main.notificaciones.marcar_procesando', otro_envio_gana_el_primero):
+            reclamados = reclamar_notificaciones(10)
+        self.assertEqual(len(reclamados), 1)
+        self.assertNotEqual(reclamados[0].pk, primero.pk)
+
+    @override_settings(EMAIL_BACKEND='main.tests.BackendCaido', NOTIFICACIONES_MAX_INTENTOS=2)
+    def test_reintenta_y_luego_marca_fallida(self):
+        self.crear_mensajes(2)
+        with self.assertLogs('main.notificaciones', 'WARNING'):
+            self.enviar()
+        for notificacion in NotificacionContacto.objects.all():
+            self.assertEqual((notificacion.estado, notificacion.intentos), ('pendiente', 1))
+            self.assertGreater(notificacion.disponible_desde, timezone.now())
+            self.assertIn('SMTP no disponible', notificacion.error)
+
+        NotificacionContacto.objects.update(disponible_desde=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('main.notificaciones', 'WARNING'):
+            self.enviar()
+        self.assertEqual(NotificacionContacto.objects.filter(estado='fallida', intentos=2).count(), 2)
+
+    @override_settings(EMAIL_BACKEND='main.tests.BackendSinConexion')
+    def test_reintenta_si_no_puede_abrir_la_conexion(self):
+        self.crear_mensajes(2)
+        with self.assertLogs('main.notificaciones', 'WARNING'):
+            self.enviar()
+        for notificacion in NotificacionContacto.objects.all():
+            self.assertEqual((notificacion.estado, notificacion.intentos), ('pendiente', 1))
+            self.assertGreater(notificacion.disponible_desde, timezone.now())
+            self.assertIn('SMTP inalcanzable', notificacion.error)
+
+    @override_settings(NOTIFICACIONES_DESTINATARIOS=[])
+    def test_sin_destinatarios_no_encola(self):
+        self.crear_mensajes(1)
+        self.assertFalse(NotificacionContacto.objects.exists())
+
+
+@override_settings(
+    IMAGENES_ANCHOS=(320, 640, 1280), IMAGENES_FORMATOS=('webp',), IMAGENES_EN_SEGUNDO_PLANO=False
+)
+class VariantesImagenTests(MediaTemporalMixin, TestCase):
+    """Versiones redimensionadas de las imágenes subidas"""
+
+    def test_genera_variantes_al_guardar(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        variantes = proyecto.variantes_imagen
+        # 1280 supera el original de 800: se usa el ancho original
+        self.assertEqual(sorted(variantes['formatos']['webp'], key=int), ['320', '640', '800'])
+        for nombre in variantes['formatos']['webp'].values():
+            self.assertIn(variantes['huella'], nombre)
+            self.assertTrue(default_storage.exists(nombre))
+
+    def test_fuentes_listas_para_srcset(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        fuente, = proyecto.fuentes_imagen_principal()
+        self.assertEqual(fuente['tipo'], 'image/webp')
+        self.assertRegex(fuente['srcset'], r'^/media/\S+-320w\.webp 320w, \S+ 640w, \S+ 800w$')
+
+    def test_reemplazar_imagen_elimina_variantes_anteriores(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        anteriores = list(proyecto.variantes_imagen['formatos']['webp'].values())
+        proyecto.imagen_principal = imagen_de_prueba('otra.png', color='blue')
+        # El original y sus variantes se borran al confirmar, si ya nadie los usa
+        with self.captureOnCommitCallbacks(execute=True):
+            proyecto.save()
+        for nombre in anteriores:
+            self.assertFalse(default_storage.exists(nombre))
+        self.assertNotEqual(proyecto.variantes_imagen['formatos']['webp']['320'], anteriores[0])
+
+    def test_captura_en_el_carrusel_usa_picture(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba(), activo=True)
+        captura = ImagenProyecto.objects.create(
+            proyecto=proyecto, imagen=imagen_de_prueba('detalle.png'), descripcion='Detalle'
+        )
+        self.assertTrue(captura.fuentes())
+        respuesta = self.client.get(reverse('proyecto_modal', args=[proyecto.pk]))
+        self.assertContains(respuesta, '<source type="image/webp"', count=1)
+
+
+@override_settings(IMAGENES_ANCHOS=(320, 640), IMAGENES_FORMATOS=('webp',), IMAGENES_MAX_INTENTOS=2)
+class ColaImagenesTests(MediaTemporalMixin, TestCase):
+    """Cola de procesamiento de imágenes en segundo plano"""
+
+    def procesar(self):
+        call_command('procesar_imagenes', una_vez=True, procesos=0, stdout=io.StringIO())
+
+    def test_guardar_solo_encola(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        ImagenProyecto.objects.create(proyecto=proyecto, imagen=imagen_de_prueba(), descripcion='a')
+        self.assertEqual(proyecto.variantes_imagen, {})
+        self.assertEqual(TareaImagen.objects.filter(estado='pendiente').count(), 2)
+
+    def test_no_duplica_tareas_pendientes(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        proyecto.titulo = 'Cambiado'
+        proyecto.save()
+        self.assertEqual(TareaImagen.objects.count(), 1)
+
+    def test_worker_genera_variantes(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        self.procesar()
+        proyecto.refresh_from_db()
+        self.assertIn('320', proyecto.variantes_imagen['formatos']['webp'])
+        self.assertEqual(TareaImagen.objects.get().estado, 'completada')
+
+    def test_pool_de_procesos(self):
+        for i in range(4):
+            crear_proyecto(titulo=f'P{i}', imagen_principal=imagen_de_prueba(color=(i * 40, 0, 0)))
+        with ProcessPoolExecutor(max_workers=2) as ejecutor:
+            completadas = procesar_lote(reclamar_tareas(10), ejecutor)
+        self.assertEqual(completadas, 4)
+        self.assertFalse(Proyecto.objects.filter(variantes_imagen={}).exists())
+
+    def test_no_devuelve_tareas_que_reclamo_otro_worker(self):
+        for i in range(2):
+            crear_proyecto(titulo=f'P{i}', imagen_principal=imagen_de_prueba())
+        primera, segunda = TareaImagen.objects.order_by('pk')
+        # Otro worker ganó la primera entre la lectura de ids y el update
+        TareaImagen.objects.filter(pk=primera.pk).update(estado='procesando', intentos=1)
+
+        self.assertEqual(marcar_procesando(TareaImagen, [primera.pk, segunda.pk]), [segunda.pk])
+        primera.refresh_from_db()
+        self.assertEqual(primera.intentos, 1)
+        self.assertEqual(reclamar_tareas(10), [])
+
+    def test_reintenta_y_luego_marca_fallida(self):
+        proyecto = crear_proyecto(imagen_principal=imagen_de_prueba())
+        default_storage.delete(proyecto.imagen_principal.name)
+
+        with self.assertLogs('main.tareas', 'WARNING'):
+            self.procesar()
+        tarea = TareaImagen.objects.get()
+        self.assertEqual((tarea.estado, tarea.intentos), ('pendiente', 1))
+        self.assertGreater(tarea.disponible_desde, timezone.now())
+
+        TareaImagen.objects.update(disponible_desde=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('main.tareas', 'WARNING'):
+            self.procesar()
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.estado, tarea.intentos), ('fallida', 2))
+        self.assertTrue(tarea.error)
+
+
+class ImportarProyectosTests(MediaTemporalMixin, TestCase):
+    """Importación masiva desde un manifiesto"""
+
+    def setUp(self):
+        super().setUp()
+        self.origen = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.origen, ignore_errors=True)
+        for nombre, color in (('inicio.png', 'red'), ('login.png', 'green'), ('detalle.png', 'blue')):
+            Image.new('RGB', (60, 40), color).save(self.origen / nombre)
+        self.manifiesto = {'proyectos': [{
+            'titulo': 'Tienda',
+            'descripcion': 'Catálogo y carrito',
+            'imagen_principal': 'inicio.png',
+            'url_codigo': 'https://github.com/too0oori/tienda',
+            'tecnologias': ['Python', 'Django'],
+            'destacado': True,
+            'capturas': [
+                {'imagen': 'login.png', 'descripcion': 'Login'},
+                {'imagen': 'detalle.png', 'descripcion': 'Detalle'},
+            ],
+        }]}
+
+    def importar(self):
+        (self.origen / 'manifiesto.json').write_text(json.dumps(self.manifiesto), encoding='utf-8')
+        salida = io.StringIO()
+        call_command('importar_proyectos', str(self.origen), stdout=salida)
+        return salida.getvalue()
+
+    def test_importa_proyectos_y_capturas(self):
+        self.importar()
+        proyecto = Proyecto.objects.get()
+        self.assertEqual(
+            sorted(proyecto.tecnologias.values_list('slug', flat=True)), ['django', 'python']
+        )
+        self.assertTrue(proyecto.destacado)
+        self.assertEqual(proyecto.imagenes.count(), 2)
+        self.assertTrue(default_storage.exists(proyecto.imagen_principal.name))
+        self.assertEqual(TareaImagen.objects.count(), 3)
+
+    def test_reimportar_no_duplica(self):
+        self.importar()
+        salida = self.importar()
+        self.assertIn('0 creado(s), 0 actualizado(s)', salida)
+        self.assertIn('Archivos copiados: 0', salida)
+        self.assertEqual(Proyecto.objects.count(), 1)
+        self.assertEqual(ImagenProyecto.objects.count(), 2)
+
+    def test_reimportar_agrega_solo_lo_nuevo(self):
+        self.importar()
+        Image.new('RGB', (60, 40), 'white').save(self.origen / 'carrito.png')
+        self.manifiesto['proyectos'][0]['capturas'].append({'imagen': 'carrito.png', 'descripcion': 'Carrito'})
+        self.manifiesto['proyectos'][0]['descripcion'] = 'Nueva descripción'
+        self.importar()
+        proyecto = Proyecto.objects.get()
+        self.assertEqual(proyecto.descripcion, 'Nueva descripción')
+        self.assertEqual(proyecto.imagenes.count(), 3)
+
+    def test_error_en_la_transaccion_no_deja_archivos_huerfanos(self):
+        self.importar()
+        previos = {archivo for archivo in Path(self.media_root).rglob('*') if archivo.is_file()}
+        Image.new('RGB', (60, 40), 'white').save(self.origen / 'nuevo.png')
+        self.manifiesto['proyectos'].append({
+            **self.manifiesto['proyectos'][0], 'titulo': 'Otra tienda', 'imagen_principal': 'nuevo.png',
+        })
+        with mock.patch(
+            'main.management.commands.importar_proyectos.recontar', side_effect=RuntimeError('falla')
+        ), self.assertRaises(RuntimeError):
+            self.importar()
+        self.assertEqual(Proyecto.objects.count(), 1)
+        # nuevo.png se borra; las capturas compartidas con la primera tienda se conservan
+        actuales = {archivo for archivo in Path(self.media_root).rglob('*') if archivo.is_file()}
+        self.assertEqual(actuales, previos)
+
+    def test_reimportar_solo_tecnologias_reindexa(self):
+        self.importar()
+        proyecto = Proyecto.objects.get()
+        self.manifiesto['proyectos'][0]['tecnologias'] = ['Kubernetes']
+        salida = self.importar()
+        self.assertIn('0 creado(s), 0 actualizado(s)', salida)
+        self.assertEqual(busqueda.buscar('kubernetes'), [proyecto.pk])
+        self.assertEqual(busqueda.buscar('python'), [])
+
+
+class TecnologiasTests(MediaTemporalMixin, TestCase):
+    """Tecnologías normalizadas y filtro ?tech="""
+
+    def setUp(self):
+        super().setUp()
+        crear_proyecto(titulo='Tienda Django', destacado=True, tecnologias=['Python', 'Django'])
+        crear_proyecto(titulo='Juego en C++', tecnologias=['C++'])
+        crear_proyecto(titulo='Librería C#', tecnologias=['C#'])
+
+    def test_slugs_distintos_para_cpp_y_csharp(self):
+        self.assertEqual(
+            sorted(Tecnologia.objects.values_list('slug', flat=True)),
+            ['c-plus-plus', 'c-sharp', 'django', 'python']
+        )
+
+    def test_desde_nombres_no_duplica(self):
+        Tecnologia.desde_nombres(['django', ' Django ', 'Bootstrap'])
+        self.assertEqual(Tecnologia.objects.count(), 5)
+
+    def test_filtro_por_tecnologia(self):
+        respuesta = self.client.get(reverse('todos_proyectos'), {'tech': 'c-plus-plus'})
+        self.assertContains(respuesta, 'Juego en C++')
+        self.assertNotContains(respuesta, 'Tienda Django')
+        self.assertNotContains(respuesta, 'Librería C#')
+
+    def test_filtro_usa_el_slug(self):
+        respuesta = self.client.get(reverse('todos_proyectos'), {'tech': 'django'})
+        consulta = str(respuesta.context['otros_proyectos'].queryset.query)
+        self.assertIn('"main_tecnologia"."slug" = django', consulta)
+        self.assertContains(respuesta, 'Tienda Django')
+
+    def test_filtro_sin_resultados(self):
+        respuesta = self.client.get(reverse('todos_proyectos'), {'tech': 'cobol'})
+        self.assertContains(respuesta, 'No hay proyectos con esa tecnología')
+
+    def test_badges_enlazan_al_filtro(self):
+        respuesta = self.client.get(reverse('index'))
+        self.assertContains(respuesta, '/proyectos/?tech=python')
+
+
+class ModalesProyectoTests(MediaTemporalMixin, TestCase):
+    """Modales de proyecto pedidos bajo demanda"""
+
+    def setUp(self):
+        super().setUp()
+        self.proyecto = crear_proyecto(titulo='Con capturas', destacado=True)
+        for orden in range(3):
+            ImagenProyecto.objects.create(
+                proyecto=self.proyecto, imagen=f'proyectos/capturas/{orden}.png',
+                descripcion=f'Captura {orden}', orden=orden,
+            )
+        self.sin_capturas = crear_proyecto(titulo='Sin capturas')
+
+    def test_paginas_sin_modales(self):
+        for url in (reverse('index'), reverse('todos_proyectos')):
+            respuesta = self.client.get(url)
+            self.assertNotContains(respuesta, 'class="modal')
+            self.assertNotContains(respuesta, 'proyectos/capturas/')
+            self.assertContains(respuesta, reverse('proyecto_modal', args=[self.proyecto.pk]))
+            self.assertNotContains(respuesta, reverse('proyecto_modal', args=[self.sin_capturas.pk]))
+
+    def test_modal_con_carrusel_perezoso(self):
+        respuesta = self.client.get(reverse('proyecto_modal', args=[self.proyecto.pk]))
+        self.assertContains(respuesta, f'id="modal{self.proyecto.pk}"')
+        self.assertContains(respuesta, 'class="carousel-item', count=3)
+        self.assertContains(respuesta, 'loading="eager"', count=1)
+        self.assertContains(respuesta, 'loading="lazy"', count=2)
+
+    def test_modal_de_proyecto_inactivo(self):
+        self.proyecto.activo = False
+        self.proyecto.save()
+        respuesta = self.client.get(reverse('proyecto_modal', args=[self.proyecto.pk]))
+        self.assertEqual(respuesta.status_code, 404)
+
+
+@override_settings(PROYECTOS_POR_PAGINA=4)
+class PaginacionProyectosTests(TestCase):
+    """Paginación por cursor y fragmentos de /proyectos/pagina/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Muchos empates en orden y fecha: el id debe desempatar sin saltos ni repetidos
+        Proyecto.objects.bulk_create([
+            Proyecto(
+                titulo=f'Proyecto {i}', descripcion='...', imagen_principal=f'proyectos/{i}.png',
+                url_codigo='https://github.com/too0oori', orden=i % 2, destacado=i < 3,
+            )
+            for i in range(15)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def siguiente_url(self, contenido):
+        encontrado = re.search(r'data-url="([^"]+)"', contenido)
+        return html.unescape(encontrado.group(1)) if encontrado else None
+
+    def test_primera_pagina_acotada(self):
+        respuesta = self.client.get(reverse('todos_proyectos'))
+        contenido = respuesta.content.decode()
+        self.assertEqual(contenido.count('class="card project-card"'), 3 + 4)
+        self.assertIn('seccion=otros', self.siguiente_url(contenido))
+
+    def test_recorre_todas_las_paginas_en_orden(self):
+        esperados = list(
+            Proyecto.objects.filter(destacado=False)
+            .order_by('orden', '-fecha_creacion', 'id')
+            .values_list('titulo', flat=True)
+        )
+        contenido = self.client.get(reverse('todos_proyectos')).content.decode()
+        contenido = contenido[contenido.index('id="lista-otros"'):]
+        vistos = re.findall(r'card-title[^>]*>([^<]+)<', contenido)
+
+        url = self.siguiente_url(contenido)
+        paginas = 1
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            contenido = respuesta.content.decode()
+            vistos += re.findall(r'card-title[^>]*>([^<]+)<', contenido)
+            url = self.siguiente_url(contenido)
+            paginas += 1
+
+        self.assertEqual(vistos, esperados)
+        self.assertEqual(paginas, 3)
+
+    def test_fragmento_en_cache_no_consulta_la_base(self):
+        url = self.siguiente_url(self.client.get(reverse('todos_proyectos')).content.decode())
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(url)
+        self.assertContains(respuesta, 'data-tarjetas')
+
+    def test_parametros_invalidos(self):
+        for url in (reverse('proyectos_pagina'), reverse('todos_proyectos')):
+            self.assertEqual(self.client.get(url, {'seccion': 'otros', 'cursor': 'no-es-un-cursor'}).status_code, 400)
+            self.assertEqual(self.client.get(url, {'seccion': 'todas'}).status_code, 400)
+
+    def test_sin_javascript_el_enlace_recorre_todas_las_paginas(self):
+        esperados = list(
+            Proyecto.objects.filter(destacado=False)
+            .order_by('orden', '-fecha_creacion', 'id')
+            .values_list('titulo', flat=True)
+        )
+        contenido = self.client.get(reverse('todos_proyectos')).content.decode()
+        contenido = contenido[contenido.index('id="lista-otros"'):]
+        vistos = re.findall(r'card-title[^>]*>([^<]+)<', contenido)
+
+        enlace = re.search(r'rel="next"\s+href="([^"]+)"', contenido)
+        while enlace:
+            respuesta = self.client.get(html.unescape(enlace.group(1)))
+            self.assertEqual(respuesta.status_code, 200)
+            contenido = respuesta.content.decode()
+            # Página completa, solo con la sección pedida
+            self.assertIn('Todos mis proyectos', contenido)
+            self.assertNotIn('id="lista-destacados"', contenido)
+            vistos += re.findall(r'card-title[^>]*>([^<]+)<', contenido)
+            enlace = re.search(r'rel="next"\s+href="([^"]+)"', contenido)
+
+        self.assertEqual(vistos, esperados)
+
+
+class AdminConsultasTests(TestCase):
+    """Los listados del admin hacen las mismas consultas con 10 o 1000 filas"""
+
+    def setUp(self):
+        usuario = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.force_login(usuario)
+        self.tecnologias = Tecnologia.desde_nombres(['Python', 'Django', 'JavaScript'])
+
+    def poblar(self, cantidad):
+        """Agrega proyectos con capturas y tecnologías, y mensajes, tareas y habilidades"""
+        proyectos = Proyecto.objects.bulk_create([
+            Proyecto(
+                titulo=f'Proyecto {i}', descripcion='...', imagen_principal=f'proyectos/{i}.png',
+                url_codigo='https://github.com/too0oori', destacado=i % 3 == 0,
+            )
+            for i in range(cantidad)
+        ])
+        ImagenProyecto.objects.bulk_create([
+            ImagenProyecto(proyecto=proyecto, imagen=f'proyectos/capturas/{i}.png', descripcion='...', orden=i)
+            for proyecto in proyectos
+            for i in range(2)
+        ])
+        Proyecto.tecnologias.through.objects.bulk_create([
+            Proyecto.tecnologias.through(proyecto=proyecto, tecnologia=tecnologia)
+            for proyecto in proyectos
+            for tecnologia in self.tecnologias
+        ])
+        Habilidad.objects.bulk_create([Habilidad(nombre=f'Habilidad {i}', tipo='tecnica') for i in range(cantidad)])
+        Contacto.objects.bulk_create([
+            Contacto(nombre=f'Persona {i}', email='ana@example.com', mensaje='Hola') for i in range(cantidad)
+        ])
+        TareaImagen.objects.bulk_create([
+            TareaImagen(modelo='main.proyecto', objeto_id=proyecto.pk) for proyecto in proyectos
+        ])
+        return proyectos
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(consultas)
+
+    def test_listados_con_consultas_constantes(self):
+        modelos = (Proyecto, Tecnologia, Habilidad, Contacto, TareaImagen)
+        urls = [reverse(f'admin:main_{modelo._meta.model_name}_changelist') for modelo in modelos]
+
+        self.poblar(10)
+        pocas = [self.consultas(url) for url in urls]
+        self.poblar(990)
+        muchas = [self.consultas(url) for url in urls]
+
+        self.assertEqual(dict(zip(urls, pocas)), dict(zip(urls, muchas)))
+
+    def test_cantidad_de_imagenes_anotada(self):
+        self.poblar(3)
+        respuesta = self.client.get(reverse('admin:main_proyecto_changelist'))
+        self.assertContains(respuesta, '📸 2', count=3)
+
+    def test_edicion_con_capturas_en_consultas_constantes(self):
+        pocas, muchas = self.poblar(2)
+        ImagenProyecto.objects.bulk_create([
+            ImagenProyecto(proyecto=muchas, imagen=f'proyectos/capturas/extra{i}.png', descripcion='...', orden=i)
+            for i in range(20)
+        ])
+        # La primera visita llena la caché de ContentType
+        self.consultas(reverse('admin:main_proyecto_change', args=[pocas.pk]))
+        self.assertEqual(
+            self.consultas(reverse('admin:main_proyecto_change', args=[pocas.pk])),
+            self.consultas(reverse('admin:main_proyecto_change', args=[muchas.pk])),
+        )
+
+
+class PlanConsultasTests(TestCase):
+    """
+    Las consultas de las vistas públicas deben usar índices con la tabla
+    poblada: nada de recorrer la tabla completa y además ordenar.
+    Corre con PostgreSQL o con SQLite como sustituto local.
+    """
+
+    PROYECTOS = 3000
+    HABILIDADES = 400
+    TABLAS = ('main_proyecto', 'main_habilidad', 'main_imagenproyecto', 'main_tecnologia')
+
+    @classmethod
+    def setUpTestData(cls):
+        tecnologias = Tecnologia.desde_nombres([f'Tecnologia {i}' for i in range(50)])
+        proyectos = Proyecto.objects.bulk_create([
+            Proyecto(
+                titulo=f'Proyecto {i}', descripcion='...', imagen_principal=f'proyectos/{i}.png',
+                url_codigo='https://github.com/too0oori', orden=i % 50,
+                destacado=i % 20 == 0, activo=i % 10 != 0,
+            )
+            for i in range(cls.PROYECTOS)
+        ])
+        ImagenProyecto.objects.bulk_create([
+            ImagenProyecto(proyecto=proyecto, imagen=f'proyectos/capturas/{i}.png', descripcion='...', orden=i)
+            for proyecto in proyectos
+            for i in range(3)
+        ])
+        Proyecto.tecnologias.through.objects.bulk_create([
+            Proyecto.tecnologias.through(proyecto=proyecto, tecnologia=tecnologias[i % 50])
+            for i, proyecto in enumerate(proyectos)
+        ])
+        Habilidad.objects.bulk_create([
+            Habilidad(
+                nombre=f'Habilidad {i}', tipo='tecnica' if i % 2 else 'personal',
+                orden=i, activo=i % 5 != 0,
+            )
+            for i in range(cls.HABILIDADES)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def plan(self, sql):
+        """Plan de ejecución como texto, según el motor"""
+        prefijo = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefijo + sql)
+            return '\n'.join(' '.join(str(columna) for columna in fila) for fila in cursor.fetchall())
+
+    def problemas(self, plan):
+        """Recorridos completos de tablas pobladas combinados con un ordenamiento"""
+        if connection.vendor == 'sqlite':
+            recorridos = [
+                tabla for tabla in self.TABLAS
+                if re.search(rf'SCAN {tabla}\b(?! USING (COVERING )?INDEX)', plan)
+            ]
+            ordena = 'USE TEMP B-TREE FOR ORDER BY' in plan
+        else:
+            recorridos = [tabla for tabla in self.TABLAS if f'Seq Scan on {tabla}' in plan]
+            ordena = re.search(r'\bSort\b', plan) is not None
+        return recorridos if ordena else []
+
+    def assertUsaIndices(self, url, **params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        selects = [c['sql'] for c in consultas.captured_queries if c['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            plan = self.plan(sql)
+            self.assertFalse(self.problemas(plan), f'Recorrido completo + orden:\n{sql[:500]}\n{plan}')
+
+    def test_index(self):
+        self.assertUsaIndices(reverse('index'))
+
+    def test_todos_proyectos(self):
+        self.assertUsaIndices(reverse('todos_proyectos'))
+
+    def test_todos_proyectos_filtrados(self):
+        self.assertUsaIndices(reverse('todos_proyectos'), tech='tecnologia-7')
+
+    def test_modal(self):
+        proyecto = Proyecto.objects.filter(activo=True).order_by('pk').last()
+        self.assertUsaIndices(reverse('proyecto_modal', args=[proyecto.pk]))
+
+    def test_pagina_siguiente(self):
+        ultimo = Proyecto.objects.filter(activo=True, destacado=False).order_by('orden', '-fecha_creacion', 'id')[40]
+        self.assertUsaIndices(reverse('proyectos_pagina'), seccion='otros', cursor=codificar_cursor(ultimo))
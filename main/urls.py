@@ -1,7 +1,23 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# Bajo ASGI las páginas públicas usan las vistas async (consultas a la vez)
+if settings.VISTAS_ASINCRONAS:
+    index, todos_proyectos = views.index_async, views.todos_proyectos_async
+else:
+    index, todos_proyectos = views.index, views.todos_proyectos
 
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('proyectos/', views.todos_proyectos, name='todos_proyectos'),
-]
\ No newline at end of file
+    path('', index, name='index'),
+    path('contacto/', views.contacto, name='contacto'),
+    path('proyectos/', todos_proyectos, name='todos_proyectos'),
+    path('proyectos/buscar/', views.buscar_proyectos, name='buscar_proyectos'),
+    path('proyectos/pagina/', views.proyectos_pagina, name='proyectos_pagina'),
+    path('proyectos/<int:pk>/modal/', views.proyecto_modal, name='proyecto_modal'),
+    # API JSON de solo lectura (main.api)
+    path('api/v1/proyectos/', api.proyectos, name='api_proyectos'),
+    path('api/v1/proyectos/<int:pk>/', api.proyecto, name='api_proyecto'),
+    path('api/v1/habilidades/', api.habilidades, name='api_habilidades'),
+    path('api/v1/perfil/', api.perfil, name='api_perfil'),
+]
@@ -1,75 +1,540 @@
-from django.shortcuts import render, redirect
-from django.contrib import messages
-from .models import Proyecto, Habilidad, Perfil, Contacto
+import asyncio
+import json
+import mimetypes
+from functools import partial, wraps
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotModified, JsonResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.functional import SimpleLazyObject
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import slugify
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST, require_safe
+from django.views.static import was_modified_since
+from . import antispam, busqueda
+from .models import Proyecto, Habilidad, Perfil, Tecnologia, ImagenProyecto
 from .forms import ContactoForm
+from .cache import afragmentos_en_cache, contexto_cache, etag_contenido, ultima_modificacion
+from .paginacion import PaginaKeyset, decodificar_cursor
 
+# Las tarjetas solo necesitan saber si hay capturas; el carrusel se pide aparte
+# (proyecto_modal) y lo resuelve el índice (proyecto, orden)
+TIENE_CAPTURAS = Exists(ImagenProyecto.objects.filter(proyecto=OuterRef('pk')))
 
-def index(request):
-    """Vista principal del portafolio - Solo proyectos destacados"""
+# Sin ORDER BY: get_tecnologias_list ordena en Python las pocas de cada tarjeta
+PREFETCH_TECNOLOGIAS = Prefetch('tecnologias', queryset=Tecnologia.objects.order_by())
+
+# GET condicional para las páginas públicas: responde 304 si el contenido no cambió
+# desde la copia del cliente, sin renderizar ni consultar la base
+contenido_condicional = condition(
+    etag_func=lambda request, *args, **kwargs: etag_contenido(),
+    last_modified_func=lambda request, *args, **kwargs: ultima_modificacion(),
+)
+
+
+def etag_index():
+    """El index lleva la marca del formulario: su ETag cambia también con el periodo de la marca"""
+    return etag_contenido(antispam.periodo_marca())
+
+
+index_condicional = condition(
+    etag_func=lambda request, *args, **kwargs: etag_index(),
+    last_modified_func=lambda request, *args, **kwargs: ultima_modificacion(),
+)
+
+# Bloques {% cache %} del index (incluido el pie de base.html)
+FRAGMENTOS_INDEX = ('index_hero', 'index_proyectos', 'index_habilidades', 'index_ilustracion', 'pie')
+
+MENSAJE_CONTACTO_OK = '¡Mensaje enviado correctamente! Te responderé pronto.'
+MENSAJE_CONTACTO_ERROR = 'Hubo un error al enviar el mensaje. Por favor, verifica los datos.'
+MENSAJE_CONTACTO_LIMITE = 'Demasiados mensajes seguidos. Por favor, inténtalo más tarde.'
+MENSAJE_CONTACTO_EXPIRADO = 'El formulario expiró. Por favor, vuelve a enviarlo.'
+MENSAJE_CONTACTO_MUY_RAPIDO = 'El formulario se envió demasiado rápido. Espera unos segundos y vuelve a enviarlo.'
+
+
+def _contexto_index(form, mensaje_contacto=None, marca=None):
+    """Contexto de la página principal (compartido con la vista de contacto)"""
     
-    # Obtener perfil (solo uno)
-    perfil = Perfil.objects.first()
+    # Las consultas son perezosas: solo se ejecutan si el fragmento
+    # correspondiente no está en caché
+    perfil = SimpleLazyObject(Perfil.objects.first)
     
     # Solo proyectos destacados (máximo 6 para la página principal)
     proyectos_destacados = Proyecto.objects.filter(
         activo=True, 
         destacado=True
-    ).prefetch_related('imagenes')[:6]
+    ).annotate(tiene_capturas=TIENE_CAPTURAS).prefetch_related(PREFETCH_TECNOLOGIAS)[:6]
     
-    # Contar proyectos no destacados para mostrar el botón "Ver más"
-    otros_proyectos_count = Proyecto.objects.filter(
+    # Proyectos no destacados, para el contador del botón "Ver más"
+    otros_proyectos = Proyecto.objects.filter(
         activo=True, 
         destacado=False
-    ).count()
+    )
+    otros_proyectos_count = SimpleLazyObject(otros_proyectos.count)
     
     # Obtener habilidades por tipo
     habilidades_tecnicas = Habilidad.objects.filter(tipo='tecnica', activo=True)
     habilidades_personales = Habilidad.objects.filter(tipo='personal', activo=True)
     
-    # Procesar formulario de contacto
-    if request.method == 'POST':
-        form = ContactoForm(request.POST)
-        if form.is_valid():
-            form.save()
-            messages.success(request, '¡Mensaje enviado correctamente! Te responderé pronto.')
-            return redirect('index')
-        else:
-            messages.error(request, 'Hubo un error al enviar el mensaje. Por favor, verifica los datos.')
-    else:
-        form = ContactoForm()
-    
-    context = {
+    return {
         'perfil': perfil,
         'proyectos_destacados': proyectos_destacados,
+        'otros_proyectos': otros_proyectos,
         'otros_proyectos_count': otros_proyectos_count,
         'habilidades_tecnicas': habilidades_tecnicas,
         'habilidades_personales': habilidades_personales,
         'form': form,
+        'mensaje_contacto': mensaje_contacto,
+        # Fuera de los fragmentos cacheados: cuenta desde que se cargó la página
+        'marca': marca or antispam.crear_marca(),
+        **contexto_cache(),
     }
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+@index_condicional
+def index(request):
+    """Vista principal del portafolio - Solo proyectos destacados"""
+    
+    # Tras un envío sin JavaScript se vuelve aquí con ?enviado=1
+    mensaje_contacto = None
+    if request.GET.get('enviado') == '1':
+        mensaje_contacto = {'tipo': 'alert-success', 'texto': MENSAJE_CONTACTO_OK}
+    
+    context = _contexto_index(ContactoForm(), mensaje_contacto)
     
     return render(request, 'index.html', context)
 
 
+def _es_peticion_json(request):
+    """Indica si el formulario llegó por fetch/JSON en vez de un POST normal"""
+    return (
+        request.content_type == 'application/json'
+        or 'application/json' in request.headers.get('Accept', '')
+    )
+
+
+def _respuesta_contacto_ok(es_json):
+    if es_json:
+        return JsonResponse({'ok': True, 'mensaje': MENSAJE_CONTACTO_OK})
+    return redirect(f"{reverse('index')}?enviado=1")
+
+
+def _respuesta_contacto_limite(es_json, espera):
+    """429 sin renderizar el index: bajo abuso la respuesta tiene que ser barata"""
+    if es_json:
+        respuesta = JsonResponse({'ok': False, 'mensaje': MENSAJE_CONTACTO_LIMITE, 'errores': {}}, status=429)
+    else:
+        respuesta = HttpResponse(MENSAJE_CONTACTO_LIMITE, status=429, content_type='text/plain; charset=utf-8')
+    respuesta['Retry-After'] = str(espera)
+    return respuesta
+
+
+def _respuesta_contacto_reintentar(request, es_json, datos, mensaje, marca=None):
+    """
+    400 que se corrige reenviando el mismo formulario. Con `marca` se entrega
+    una nueva (la anterior expiró); sin ella se conserva la enviada.
+    """
+    if es_json:
+        cuerpo = {'ok': False, 'mensaje': mensaje, 'errores': {}}
+        if marca:
+            cuerpo['marca'] = marca
+        return JsonResponse(cuerpo, status=400)
+    
+    mensaje_contacto = {'tipo': 'alert-danger', 'texto': mensaje}
+    context = _contexto_index(ContactoForm(datos), mensaje_contacto, marca or datos.get(antispam.CAMPO_MARCA))
+    return render(request, 'index.html', context, status=400)
+
+
+# Sin CSRF: el index se cachea sin cookies, así que un POST sin JavaScript no
+# tendría token. Lo reemplazan las comprobaciones de main.antispam (marca
+# firmada, trampa y límites), y el formulario solo crea un mensaje nuevo.
+@csrf_exempt
+@never_cache
+@require_POST
+def contacto(request):
+    """Recibe el formulario de contacto (POST normal o fetch/JSON)"""
+    
+    es_json = _es_peticion_json(request)
+    
+    # Lo más barato primero: tamaño del cuerpo y límite por IP, antes de leerlo
+    try:
+        largo = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        largo = 0
+    if largo > settings.CONTACTO_MAX_BYTES:
+        return HttpResponse(status=413)
+    espera = antispam.supera_limite('ip', antispam.ip_cliente(request), settings.CONTACTO_LIMITE_IP)
+    if espera:
+        return _respuesta_contacto_limite(es_json, espera)
+    
+    if request.content_type == 'application/json':
+        try:
+            datos = json.loads(request.body)
+        except ValueError:
+            datos = None
+        # Un JSON válido puede ser una lista o un número: solo sirve un objeto
+        if not isinstance(datos, dict):
+            return JsonResponse(
+                {'ok': False, 'mensaje': MENSAJE_CONTACTO_ERROR, 'errores': {}},
+                status=400
+            )
+    else:
+        datos = request.POST
+    
+    try:
+        motivo = antispam.revisar_trampas(datos)
+    except ValueError:
+        # Marca falsa o expirada (una pestaña abierta hace horas): se devuelve
+        # el formulario con una marca nueva para reenviarlo
+        return _respuesta_contacto_reintentar(
+            request, es_json, datos, MENSAJE_CONTACTO_EXPIRADO, antispam.crear_marca()
+        )
+    if motivo == antispam.MUY_RAPIDO:
+        # Puede ser una persona con autocompletado: se avisa en vez de fingir el envío
+        return _respuesta_contacto_reintentar(request, es_json, datos, MENSAJE_CONTACTO_MUY_RAPIDO)
+    if motivo:
+        # Trampa para bots: se responde como si nada para no darles pistas
+        return _respuesta_contacto_ok(es_json)
+    
+    form = ContactoForm(datos)
+    if form.is_valid():
+        espera = antispam.supera_limite('email', form.cleaned_data['email'].lower(), settings.CONTACTO_LIMITE_EMAIL)
+        if espera:
+            return _respuesta_contacto_limite(es_json, espera)
+        # Un reenvío idéntico (doble clic, reintento) no vuelve a escribir en la base
+        if not antispam.es_duplicado(form.cleaned_data):
+            # El mensaje y su aviso pendiente se guardan juntos; el email sale
+            # después con enviar_notificaciones
+            with transaction.atomic():
+                form.save()
+        return _respuesta_contacto_ok(es_json)
+    
+    if es_json:
+        return JsonResponse(
+            {'ok': False, 'mensaje': MENSAJE_CONTACTO_ERROR, 'errores': form.errors.get_json_data()},
+            status=400
+        )
+    
+    mensaje_contacto = {'tipo': 'alert-danger', 'texto': MENSAJE_CONTACTO_ERROR}
+    context = _contexto_index(form, mensaje_contacto)
+    return render(request, 'index.html', context, status=400)
+
+
+# Secciones de /proyectos/ que se paginan por separado
+SECCIONES_PROYECTOS = {'destacados': True, 'otros': False}
+
+
+def _proyectos_seccion(seccion, tech):
+    """Queryset de una sección de /proyectos/, con el filtro opcional por tecnología"""
+    proyectos = Proyecto.objects.filter(
+        activo=True,
+        destacado=SECCIONES_PROYECTOS[seccion]
+    ).annotate(tiene_capturas=TIENE_CAPTURAS).prefetch_related(PREFETCH_TECNOLOGIAS)
+    
+    # Filtro por tecnología: se busca por slug (indexado), no por texto
+    if tech:
+        proyectos = proyectos.filter(tecnologias__slug=tech)
+    return proyectos
+
+
+def _pagina_pedida(request):
+    """(sección, cursor, posición) de ?seccion=&cursor=; ValueError si no son válidos"""
+    seccion = request.GET.get('seccion')
+    if seccion not in SECCIONES_PROYECTOS:
+        raise ValueError('Sección inválida')
+    cursor = request.GET.get('cursor', '')
+    return seccion, cursor, decodificar_cursor(cursor, Proyecto)
+
+
+def _contexto_proyectos(tech, seccion=None, cursor='', posicion=None):
+    """
+    Contexto de /proyectos/ (perezoso, como el del index). Normalmente, la
+    primera página de cada sección; el resto llega por proyectos_pagina. Con
+    `seccion` (el enlace "Cargar más" sin JavaScript), solo esa sección desde
+    `posicion`.
+    """
+    
+    perfil = SimpleLazyObject(Perfil.objects.first)
+    
+    paginas = {
+        nombre: PaginaKeyset(
+            _proyectos_seccion(nombre, tech), posicion if nombre == seccion else None,
+            settings.PROYECTOS_POR_PAGINA
+        )
+        for nombre in SECCIONES_PROYECTOS
+        if seccion in (None, nombre)
+    }
+    
+    tecnologia = None
+    if tech:
+        tecnologia = SimpleLazyObject(lambda: Tecnologia.objects.filter(slug=tech).first())
+    
+    return {
+        'perfil': perfil,
+        'proyectos_destacados': paginas.get('destacados'),
+        'otros_proyectos': paginas.get('otros'),
+        'seccion': seccion,
+        'cursor': cursor,
+        'tech': tech,
+        'tecnologia': tecnologia,
+        **contexto_cache(),
+    }
+
+
+def _argumentos_proyectos(request):
+    """Argumentos de _contexto_proyectos según la URL; ValueError si la página pedida no es válida"""
+    tech = slugify(request.GET.get('tech', ''))
+    if 'seccion' not in request.GET:
+        return (tech,)
+    return (tech, *_pagina_pedida(request))
+
+
+@contenido_condicional
 def todos_proyectos(request):
-    """Vista de todos los proyectos (destacados + otros)"""
+    """Vista de todos los proyectos (destacados + otros), con filtro opcional ?tech="""
     
-    perfil = Perfil.objects.first()
+    try:
+        argumentos = _argumentos_proyectos(request)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    context = _contexto_proyectos(*argumentos)
     
-    # Todos los proyectos activos ordenados
-    proyectos_destacados = Proyecto.objects.filter(
-        activo=True, 
-        destacado=True
-    ).prefetch_related('imagenes')
+    return render(request, 'proyectos.html', context)
+
+
+def _resultados_busqueda(consulta):
+    """Proyectos que coinciden con la consulta, en el orden de relevancia del índice"""
+    ids = busqueda.buscar(consulta)
+    proyectos = Proyecto.objects.annotate(tiene_capturas=TIENE_CAPTURAS).prefetch_related(PREFETCH_TECNOLOGIAS)
+    por_id = proyectos.in_bulk(ids)
+    return [por_id[pk] for pk in ids if pk in por_id]
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+@contenido_condicional
+def buscar_proyectos(request):
+    """Búsqueda por título, descripción y tecnologías (?q=), de más a menos relevante"""
     
-    otros_proyectos = Proyecto.objects.filter(
-        activo=True, 
-        destacado=False
-    ).prefetch_related('imagenes')
+    # Normalizada, para que "Django" y "django " compartan el fragmento cacheado
+    consulta = ' '.join(busqueda.palabras(request.GET.get('q', '')))
     
     context = {
-        'perfil': perfil,
-        'proyectos_destacados': proyectos_destacados,
-        'otros_proyectos': otros_proyectos,
+        'perfil': SimpleLazyObject(Perfil.objects.first),
+        'consulta': consulta,
+        'resultados': SimpleLazyObject(lambda: _resultados_busqueda(consulta)),
+        **contexto_cache(),
+    }
+    return render(request, 'proyectos_buscar.html', context)
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+@contenido_condicional
+def proyectos_pagina(request):
+    """Fragmento HTML con la siguiente página de tarjetas de una sección (carga progresiva)"""
+    
+    try:
+        seccion, cursor, posicion = _pagina_pedida(request)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    
+    tech = slugify(request.GET.get('tech', ''))
+    pagina = PaginaKeyset(
+        _proyectos_seccion(seccion, tech), posicion, settings.PROYECTOS_POR_PAGINA
+    )
+    
+    context = {
+        'pagina': pagina,
+        'seccion': seccion,
+        'cursor': cursor,
+        'tech': tech,
+        **contexto_cache(),
+    }
+    
+    return render(request, 'partials/_proyectos_pagina.html', context)
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+@contenido_condicional
+def proyecto_modal(request, pk):
+    """Fragmento HTML con el modal y el carrusel de un proyecto (se pide al abrirlo)"""
+    
+    proyecto = get_object_or_404(Proyecto, pk=pk, activo=True)
+    
+    context = {
+        'proyecto': proyecto,
+        **contexto_cache(),
     }
     
-    return render(request, 'proyectos.html', context)
\ No newline at end of file
+    return render(request, 'partials/_proyecto_modal.html', context)
+
+
+# Vistas async: con ASGI (VISTAS_ASINCRONAS) reemplazan a index y todos_proyectos
+
+def condicional_async(vista, calcular_etag=etag_contenido):
+    """contenido_condicional para vistas async: ETag y fecha se calculan fuera del event loop"""
+    
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        # ultima_modificacion puede consultar la base si la caché está vacía
+        etag, fecha = await sync_to_async(lambda: (calcular_etag(), ultima_modificacion()))()
+        ultima = int(fecha.timestamp())
+        respuesta = get_conditional_response(request, etag=etag, last_modified=ultima)
+        if respuesta is None:
+            respuesta = await vista(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            respuesta.headers.setdefault('Last-Modified', http_date(ultima))
+            respuesta.headers.setdefault('ETag', etag)
+        return respuesta
+    
+    return envoltura
+
+
+async def _alista(queryset):
+    return [objeto async for objeto in queryset]
+
+
+async def _resolver_contexto(context, fragmentos, consultas):
+    """
+    Si falta algún fragmento en caché, ejecuta a la vez las consultas
+    {clave: corrutina} y reemplaza en el contexto los valores perezosos.
+    Con los fragmentos en caché no se consulta nada (como en las vistas sync).
+    """
+    if await afragmentos_en_cache(fragmentos):
+        for consulta in consultas.values():
+            consulta.close()  # corrutinas que no se van a esperar
+        return context
+    resultados = await asyncio.gather(*consultas.values())
+    context.update(zip(consultas, resultados))
+    return context
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.CACHE_PAGINA_MAX_AGE)
+@partial(condicional_async, calcular_etag=etag_index)
+async def index_async(request):
+    """Versión async de index: perfil, proyectos, contador y habilidades a la vez"""
+    
+    mensaje_contacto = None
+    if request.GET.get('enviado') == '1':
+        mensaje_contacto = {'tipo': 'alert-success', 'texto': MENSAJE_CONTACTO_OK}
+    
+    context = await sync_to_async(_contexto_index)(ContactoForm(), mensaje_contacto)
+    version = [context['version_contenido']]
+    fragmentos = [(nombre, version) for nombre in FRAGMENTOS_INDEX]
+    context = await _resolver_contexto(context, fragmentos, {
+        'perfil': Perfil.objects.afirst(),
+        'proyectos_destacados': _alista(context['proyectos_destacados']),
+        'otros_proyectos_count': context['otros_proyectos'].acount(),
+        'habilidades_tecnicas': _alista(context['habilidades_tecnicas']),
+        'habilidades_personales': _alista(context['habilidades_personales']),
+    })
+    
+    # El render no consulta la base, pero se deja fuera del event loop por si
+    # un fragmento expiró entre la comprobación y el render
+    return await sync_to_async(render)(request, 'index.html', context)
+
+
+@condicional_async
+async def todos_proyectos_async(request):
+    """Versión async de todos_proyectos: perfil, ambas secciones y la tecnología a la vez"""
+    
+    try:
+        argumentos = _argumentos_proyectos(request)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    context = await sync_to_async(_contexto_proyectos)(*argumentos)
+    version, tech = context['version_contenido'], context['tech']
+    vary_on = [version, tech, context['seccion'], context['cursor']]
+    fragmentos = [('proyectos_lista', vary_on), ('pie', [version])]
+    consultas = {'perfil': Perfil.objects.afirst()}
+    for clave in ('proyectos_destacados', 'otros_proyectos'):
+        if context[clave] is not None:
+            consultas[clave] = context[clave].acargar()
+    if tech:
+        consultas['tecnologia'] = Tecnologia.objects.filter(slug=tech).afirst()
+    context = await _resolver_contexto(context, fragmentos, consultas)
+    
+    return await sync_to_async(render)(request, 'proyectos.html', context)
+
+
+# Preferencia de codificación para los estáticos precomprimidos
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _codificaciones_aceptadas(cabecera):
+    """
+    Accept-Encoding como {codificación: q}. "gzip;q=0" es un rechazo
+    explícito, y "*" cubre las codificaciones que no se nombran.
+    """
+    aceptadas = {}
+    for parte in cabecera.split(','):
+        nombre, *parametros = [trozo.strip() for trozo in parte.split(';')]
+        if not nombre:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            clave, _, valor = parametro.partition('=')
+            if clave.strip().lower() == 'q':
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        aceptadas[nombre.lower()] = q
+    return aceptadas
+
+
+@require_safe
+def servir_estatico(request, ruta):
+    """
+    Sirve STATIC_ROOT cuando no hay un servidor web delante: la versión .br/.gz
+    si el navegador la acepta, y caché inmutable para los nombres con huella.
+    """
+    # safe_join rechaza las rutas que salen de STATIC_ROOT (responde 400)
+    archivo = Path(safe_join(settings.STATIC_ROOT, ruta))
+    if not archivo.is_file():
+        raise Http404
+    
+    con_huella = ruta in getattr(staticfiles_storage, 'hashed_files', {}).values()
+    estado = archivo.stat()
+    if not con_huella and not was_modified_since(
+        request.headers.get('If-Modified-Since'), estado.st_mtime
+    ):
+        return HttpResponseNotModified()
+    
+    aceptadas = _codificaciones_aceptadas(request.headers.get('Accept-Encoding', ''))
+    codificacion, servido = None, archivo
+    for nombre, extension in CODIFICACIONES:
+        comprimido = archivo.with_name(archivo.name + extension)
+        if aceptadas.get(nombre, aceptadas.get('*', 0)) > 0 and comprimido.is_file():
+            codificacion, servido = nombre, comprimido
+            break
+    
+    tipo, _ = mimetypes.guess_type(archivo.name)
+    respuesta = FileResponse(servido.open('rb'), content_type=tipo or 'application/octet-stream')
+    # FileResponse lo agrega a partir del nombre del .gz/.br
+    respuesta.headers.pop('Content-Disposition', None)
+    respuesta['Vary'] = 'Accept-Encoding'
+    respuesta['Last-Modified'] = http_date(estado.st_mtime)
+    if codificacion:
+        respuesta['Content-Encoding'] = codificacion
+    if con_huella:
+        respuesta['Cache-Control'] = f'public, max-age={settings.ESTATICOS_MAX_AGE}, immutable'
+    else:
+        respuesta['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return respuesta
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portafolio.settings')
+# Con un servidor ASGI (uvicorn, daphne) el index y /proyectos/ usan las vistas async
+os.environ.setdefault('VISTAS_ASINCRONAS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,59 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+MODOS_CONEXION = ('por_peticion', 'persistente', 'pool')
+
+
+def configurar_conexiones(base, entorno=os.environ):
+    """
+    Copia de la configuración de la base con el modo de DB_MODO_CONEXION:
+    por_peticion (una conexión por request), persistente (CONN_MAX_AGE con
+    health checks) o pool (psycopg 3, por proceso).
+    """
+    modo = entorno.get('DB_MODO_CONEXION', 'persistente')
+    if modo not in MODOS_CONEXION:
+        raise ImproperlyConfigured(f'DB_MODO_CONEXION debe ser uno de: {", ".join(MODOS_CONEXION)}')
+
+    configuracion = {**base, 'OPTIONS': dict(base.get('OPTIONS', {}))}
+    es_postgres = configuracion['ENGINE'] == 'django.db.backends.postgresql'
+
+    if modo == 'persistente':
+        configuracion['CONN_MAX_AGE'] = int(entorno.get('DB_CONN_MAX_AGE', 60))
+        configuracion['CONN_HEALTH_CHECKS'] = True
+    else:
+        # Con pool, cerrar la conexión al final del request la devuelve al pool
+        configuracion['CONN_MAX_AGE'] = 0
+
+    if modo == 'pool' and es_postgres:
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured(
+                'DB_MODO_CONEXION=pool necesita psycopg 3 con su pool: pip install "psycopg[binary,pool]"'
+            )
+        configuracion['OPTIONS']['pool'] = {
+            'min_size': int(entorno.get('DB_POOL_MIN', 2)),
+            'max_size': int(entorno.get('DB_POOL_MAX', 4)),
+            'timeout': float(entorno.get('DB_POOL_TIMEOUT', 10)),  # espera por una conexión libre
+            'max_idle': float(entorno.get('DB_POOL_MAX_IDLE', 5 * 60)),
+            'max_lifetime': float(entorno.get('DB_POOL_MAX_LIFETIME', 30 * 60)),
+        }
+        # Django le pasa al pool check=ConnectionPool.check_connection (SELECT 1
+        # antes de entregar una conexión, así se descartan las que murieron con
+        # un reinicio de la base). No va en OPTIONS['pool']: repetiría el argumento
+        configuracion['CONN_HEALTH_CHECKS'] = True
+
+    if es_postgres and entorno.get('DB_SENTENCIAS_PREPARADAS') == '1':
+        configuracion['OPTIONS']['server_side_binding'] = True
+
+    return configuracion
+
+
+def describir_modo(configuracion):
+    """Modo de conexión de una configuración ya armada"""
+    if configuracion.get('OPTIONS', {}).get('pool'):
+        return 'pool'
+    if configuracion.get('CONN_MAX_AGE'):
+        return 'persistente'
+    return 'por_peticion'
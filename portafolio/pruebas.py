@@ -0,0 +1,28 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Caché propia de los tests (la vacían en cada setUp): nunca la de desarrollo
+# o producción, aunque REDIS_URL esté definida
+CACHES_PRUEBAS = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pruebas',
+    }
+}
+
+
+class EjecutorPruebas(DiscoverRunner):
+    """
+    DiscoverRunner con la caché de CACHES_PRUEBAS. Los tests que necesitan una
+    caché compartida entre procesos la configuran con override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # LocMemCache es por proceso a propósito: main.W001 no aplica aquí
+        self.ajustes = override_settings(CACHES=CACHES_PRUEBAS, SILENCED_SYSTEM_CHECKS=['main.W001'])
+        self.ajustes.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.ajustes.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from .conexiones import configurar_conexiones
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # -------------------------
@@ -32,6 +34,8 @@ INSTALLED_APPS = [
 # -------------------------
 
 MIDDLEWARE = [
+    # Primero, para que sus tiempos incluyan al resto de los middlewares
+    'main.instrumentacion.InstrumentacionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,20 +67,153 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'portafolio.wsgi.application'
+ASGI_APPLICATION = 'portafolio.asgi.application'
+
+# Vistas async para index y /proyectos/. asgi.py la activa por defecto;
+# con WSGI conviene dejarla apagada (cada request async crearía su event loop)
+VISTAS_ASINCRONAS = os.environ.get('VISTAS_ASINCRONAS') == '1'
 
 # -------------------------
 # DATABASE (LOCAL)
 # -------------------------
 
+# Modo de conexión por worker (DB_MODO_CONEXION):
+# - por_peticion: conexión nueva en cada request
+# - persistente (por defecto): reutiliza la conexión DB_CONN_MAX_AGE segundos, revisándola antes
+# - pool: pool de psycopg 3 (DB_POOL_MIN / DB_POOL_MAX por proceso); pip install "psycopg[binary,pool]"
+# DB_SENTENCIAS_PREPARADAS=1 prepara las consultas repetidas (psycopg 3, sin PgBouncer en modo transacción)
 DATABASES = {
-    'default': {
+    'default': configurar_conexiones({
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'portafolio_db',
-        'USER': 'postgres',
-        'PASSWORD': 'root',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'portafolio_db'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'root'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+    })
+}
+
+# -------------------------
+# CACHÉ
+# -------------------------
+
+# La versión de contenido que invalida los fragmentos y los ETags (main.cache)
+# se incrementa en el proceso que guarda (un worker de gunicorn,
+# procesar_imagenes, un comando) y el resto debe verla. Los contadores y
+# huellas del formulario de contacto (main.antispam) usan add/incr, que solo
+# son atómicos entre procesos en Redis o Memcached. Por eso, con más de un
+# proceso (gunicorn con varios workers, procesar_imagenes) hay que definir
+# REDIS_URL (pip install redis). Sin ella, una caché en memoria por proceso:
+# sirve para desarrollo con runserver, y main.W001 avisa si DEBUG está apagado.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'portafolio',
+        }
     }
+
+# Los tests usan su propia caché, fijada por el runner (no por la línea de
+# comandos): ver portafolio.pruebas
+TEST_RUNNER = 'portafolio.pruebas.EjecutorPruebas'
+
+# Duración de los fragmentos cacheados (se invalidan al guardar en el admin)
+CACHE_CONTENIDO_TIMEOUT = 60 * 60 * 24
+
+# Cache-Control público del index (lo pueden guardar proxies y CDNs)
+CACHE_PAGINA_MAX_AGE = 60
+
+# Tarjetas por página en /proyectos/ (el resto se carga al hacer scroll)
+PROYECTOS_POR_PAGINA = 9
+
+# Búsqueda de proyectos (/proyectos/buscar/): máximo de resultados y
+# configuración de texto de PostgreSQL (idioma de la raíz de las palabras).
+# Si se cambia: python manage.py reindexar_busqueda
+BUSQUEDA_MAX_RESULTADOS = 30
+BUSQUEDA_CONFIGURACION = 'spanish'
+
+# -------------------------
+# API JSON (/api/v1/, main.api)
+# -------------------------
+
+# Origen que puede leer la API desde otro front end (CORS). '*' = cualquiera;
+# vacío = solo el mismo sitio
+API_ORIGEN_PERMITIDO = '*'
+
+# -------------------------
+# CONTACTO (protección contra abuso)
+# -------------------------
+
+# Los contadores y huellas viven en CACHES: con varias instancias debe ser
+# compartida (Redis, Memcached o DatabaseCache)
+CONTACTO_LIMITE_IP = (5, 60 * 10)  # intentos por IP cada 10 minutos
+CONTACTO_LIMITE_EMAIL = (3, 60 * 60)  # mensajes por email cada hora
+CONTACTO_TIEMPO_MINIMO = 3  # segundos entre cargar el formulario y enviarlo
+CONTACTO_MARCA_MAX_EDAD = 60 * 60 * 2
+CONTACTO_DUPLICADOS_VENTANA = 60 * 60 * 24  # mismo email y mensaje: se guarda una vez
+CONTACTO_MAX_BYTES = 16 * 1024  # cuerpo máximo del POST
+CONTACTO_MENSAJE_MAX = 5000  # caracteres
+CONTACTO_IP_CABECERA = None  # p. ej. 'HTTP_X_FORWARDED_FOR' detrás de un proxy confiable
+
+# Mensajes en el admin: bandeja por cursor, archivo de los leídos antiguos
+# (python manage.py archivar_contactos) y conteos estimados en tablas grandes
+CONTACTOS_POR_PAGINA = 50
+CONTACTOS_ARCHIVAR_DIAS = 180
+ADMIN_CONTEO_EXACTO_HASTA = 10000  # bajo esta estimación se cuenta con COUNT(*)
+
+# -------------------------
+# EMAIL Y NOTIFICACIONES
+# -------------------------
+
+# Por defecto los emails se muestran en la consola. Para probar con SMTP local:
+# python -m aiosmtpd -n -l localhost:1025 y EMAIL_BACKEND=...smtp.EmailBackend, EMAIL_PORT=1025
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_TIMEOUT = 10
+EMAIL_SUBJECT_PREFIX = '[Portafolio] '
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'portafolio@localhost')
+
+# Avisos de mensajes de contacto (python manage.py enviar_notificaciones).
+# Sin destinatarios no se encola nada
+NOTIFICACIONES_DESTINATARIOS = [
+    email for email in os.environ.get('NOTIFICACIONES_DESTINATARIOS', '').split(',') if email
+]
+NOTIFICACIONES_ESPERA = 60  # segundos que espera el primer aviso para juntar otros en un resumen
+NOTIFICACIONES_MAX_POR_RESUMEN = 50
+NOTIFICACIONES_MAX_INTENTOS = 5
+NOTIFICACIONES_REINTENTO_BASE = 60  # segundos; se duplica en cada reintento
+NOTIFICACIONES_TIMEOUT = 10 * 60  # avisos 'procesando' más antiguos vuelven a la cola
+
+# -------------------------
+# INSTRUMENTACIÓN
+# -------------------------
+
+# Fracción de las peticiones que se miden y se registran en el log
+# 'main.instrumentacion' (una línea JSON por petición). 0 = ninguna
+INSTRUMENTACION_MUESTREO = float(os.environ.get('INSTRUMENTACION_MUESTREO', 0))
+# Server-Timing en las peticiones medidas de cualquier visitante; si no, solo staff
+INSTRUMENTACION_SERVER_TIMING_PUBLICO = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'main.instrumentacion': {'handlers': ['consola'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 # -------------------------
@@ -118,9 +255,57 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic minifica CSS/JS, agrega la huella al nombre y escribe .gz/.br
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Imágenes de proyectos, capturas y perfil: un archivo por contenido (main.media)
+    'media': {
+        'BACKEND': 'main.storage.MediaPorContenido',
+    },
+    'staticfiles': {
+        'BACKEND': 'main.storage.EstaticosComprimidos',
+    },
+}
+
+# Sin nginx/CDN delante, Django sirve STATIC_ROOT (los nombres con huella
+# con caché inmutable de un año)
+SERVIR_ESTATICOS = True
+ESTATICOS_MAX_AGE = 60 * 60 * 24 * 365
+
+# CSS crítico (python manage.py generar_css_critico): lo que usan la navbar,
+# el hero y las primeras tarjetas va en línea; las hojas completas se cargan
+# sin bloquear el primer pintado
+CSS_CRITICO_FUENTES = [
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'css/styles.css',
+]
+CSS_DIFERIDAS = [  # no afectan al primer pintado: fuentes web (display=swap) e íconos
+    'https://fonts.googleapis.com/css2?family=Montserrat:wght@400;600;700&family=Prata&display=swap',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css',
+]
+CSS_CRITICO_TARJETAS = 3
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Versiones redimensionadas de las imágenes subidas (se generan al guardar)
+IMAGENES_ANCHOS = (320, 640, 960, 1280, 1600)
+IMAGENES_FORMATOS = ('avif', 'webp')  # en orden de preferencia para <picture>
+IMAGENES_CALIDAD = {'avif': 60, 'webp': 80}
+
+# Miniatura borrosa que se muestra en línea mientras carga la imagen (se
+# genera al subirla, junto con el ancho y el alto)
+IMAGENES_LQIP_LADO = 16  # px del lado mayor
+IMAGENES_LQIP_CALIDAD = 40
+
+# Cola de procesamiento (python manage.py procesar_imagenes)
+IMAGENES_EN_SEGUNDO_PLANO = True  # False: se generan durante el guardado
+IMAGENES_MAX_INTENTOS = 3
+IMAGENES_REINTENTO_BASE = 30  # segundos; se duplica en cada reintento
+IMAGENES_TAREA_TIMEOUT = 15 * 60  # tareas 'procesando' más antiguas vuelven a la cola
+
 # -------------------------
 # MENSAJES
 # -------------------------
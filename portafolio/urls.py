@@ -1,8 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from main.views import servir_estatico
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('main.urls')),
@@ -11,4 +13,10 @@ urlpatterns = [
 # Servir archivos media en desarrollo
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+# Estáticos con huella y precomprimidos, cuando Django es el servidor
+if settings.SERVIR_ESTATICOS and not settings.DEBUG:
+    urlpatterns += [
+        re_path(rf'^{settings.STATIC_URL.strip("/")}/(?P<ruta>.+)$', servir_estatico, name='estatico'),
+    ]
@@ -61,4 +61,156 @@ document.querySelectorAll('a[href^="#"]').forEach(anchor => {
       });
     }
   });
-});
\ No newline at end of file
+});
+
+// Formulario de contacto: envío con fetch (la marca de tiempo ya viene en el HTML)
+const formContacto = document.getElementById('form-contacto');
+const mensajesContacto = document.getElementById('mensajes-contacto');
+const MENSAJE_CONTACTO_FALLO = 'No se pudo enviar el mensaje. Por favor, inténtalo de nuevo en unos minutos.';
+
+if (formContacto) {
+  const mostrarMensaje = (texto, tipo) => {
+    if (!mensajesContacto) return;
+    mensajesContacto.className = 'container-aligned mb-4';
+    mensajesContacto.innerHTML = '';
+
+    const alerta = document.createElement('div');
+    alerta.className = `alert ${tipo} alert-dismissible fade show`;
+    alerta.setAttribute('role', 'alert');
+    alerta.textContent = texto;
+
+    const cerrar = document.createElement('button');
+    cerrar.type = 'button';
+    cerrar.className = 'btn-close';
+    cerrar.setAttribute('data-bs-dismiss', 'alert');
+    alerta.appendChild(cerrar);
+
+    mensajesContacto.appendChild(alerta);
+    if (mainWrapper) {
+      mainWrapper.scrollTo({ top: 0, behavior: 'smooth' });
+    }
+  };
+
+  formContacto.addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    let respuesta;
+    try {
+      respuesta = await fetch(formContacto.action, {
+        method: 'POST',
+        body: new FormData(formContacto),
+        headers: { 'Accept': 'application/json' },
+        credentials: 'same-origin'
+      });
+    } catch (error) {
+      // Sin conexión con el servidor: se envía el formulario de forma tradicional
+      formContacto.submit();
+      return;
+    }
+
+    let datos;
+    try {
+      datos = await respuesta.json();
+    } catch (error) {
+      // Respuesta que no es del formulario (413, página de error de un proxy):
+      // reenviarla sin JavaScript solo repetiría el fallo
+      mostrarMensaje(MENSAJE_CONTACTO_FALLO, 'alert-danger');
+      return;
+    }
+
+    if (datos.ok) {
+      formContacto.reset();
+      mostrarMensaje(datos.mensaje, 'alert-success');
+    } else {
+      // La marca expiró: la respuesta trae una nueva para el próximo envío
+      if (datos.marca) {
+        formContacto.elements.marca.value = datos.marca;
+      }
+      mostrarMensaje(datos.mensaje, 'alert-danger');
+    }
+  });
+}
+
+// Proyectos: carga progresiva de las páginas siguientes de cada sección
+const cargarPagina = async (marcador) => {
+  if (marcador.dataset.cargando) return;
+  marcador.dataset.cargando = '1';
+
+  const enlace = marcador.querySelector('a');
+  if (enlace) enlace.setAttribute('aria-disabled', 'true');
+
+  try {
+    const respuesta = await fetch(marcador.dataset.url, { credentials: 'same-origin' });
+    if (!respuesta.ok) throw new Error(respuesta.statusText);
+
+    const pagina = new DOMParser().parseFromString(await respuesta.text(), 'text/html');
+    const destino = document.querySelector(marcador.dataset.destino);
+
+    pagina.querySelectorAll('[data-tarjetas] > *').forEach((tarjeta) => destino.appendChild(tarjeta));
+
+    // El marcador nuevo (si hay otra página) reemplaza al actual
+    const siguiente = pagina.querySelector('[data-cargar-mas]');
+    if (siguiente) {
+      marcador.replaceWith(siguiente);
+      observarMarcador(siguiente);
+    } else {
+      marcador.remove();
+    }
+  } catch (error) {
+    // Se deja el enlace para reintentar a mano
+    delete marcador.dataset.cargando;
+    if (enlace) enlace.removeAttribute('aria-disabled');
+  }
+};
+
+// El scroll ocurre dentro de .main-wrapper, así que ese es el root del observer
+const observadorPaginas = 'IntersectionObserver' in window
+  ? new IntersectionObserver((entradas) => {
+      entradas.forEach((entrada) => {
+        if (entrada.isIntersecting) {
+          observadorPaginas.unobserve(entrada.target);
+          cargarPagina(entrada.target);
+        }
+      });
+    }, { root: mainWrapper, rootMargin: '600px 0px' })
+  : null;
+
+function observarMarcador(marcador) {
+  // Sin JavaScript el enlace abre /proyectos/ desde esa página; aquí se agregan las tarjetas
+  const enlace = marcador.querySelector('a');
+  if (enlace) {
+    enlace.addEventListener('click', (e) => {
+      e.preventDefault();
+      cargarPagina(marcador);
+    });
+  }
+  if (observadorPaginas) observadorPaginas.observe(marcador);
+}
+
+document.querySelectorAll('[data-cargar-mas]').forEach(observarMarcador);
+
+// Modales de proyectos: el carrusel se pide recién cuando se abre
+document.addEventListener('click', async (e) => {
+  const disparador = e.target.closest('[data-modal-url]');
+  if (!disparador || disparador.dataset.cargando) return;
+
+  let modal = document.getElementById(disparador.dataset.modal);
+  if (!modal) {
+    disparador.dataset.cargando = '1';
+    try {
+      const respuesta = await fetch(disparador.dataset.modalUrl, { credentials: 'same-origin' });
+      if (!respuesta.ok) return;
+
+      const fragmento = new DOMParser().parseFromString(await respuesta.text(), 'text/html');
+      modal = fragmento.querySelector('.modal');
+      if (!modal) return;
+      document.body.appendChild(modal);
+    } catch (error) {
+      return;
+    } finally {
+      delete disparador.dataset.cargando;
+    }
+  }
+
+  bootstrap.Modal.getOrCreateInstance(modal).show();
+});